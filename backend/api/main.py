@@ -1,6 +1,6 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from typing import List, Optional, Tuple
 import os
 import sys
@@ -10,13 +10,14 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 from dotenv import load_dotenv
 import base64
+import json
 
 from backend.reader.pdf_reader import PDFReader
 
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from backend.api.models import QueryRequest, QueryResponse, DocumentResponse
+from backend.api.models import QueryRequest, QueryResponse, BatchQueryRequest, BatchQueryResponse, DocumentResponse
 from backend.api.dependencies import get_rag_system
 from backend.core.rag_system import RAGSystem
 from backend.api.auth import router as auth_router, get_current_user
@@ -50,6 +51,12 @@ queries_collection = db["queries"]
 
 BACKEND_DIR = Path(__file__).parent.parent
 
+@app.on_event("shutdown")
+async def close_generator():
+    # The pooled LLM client is bound to the server's event loop, so it is closed with it
+    if get_rag_system.cache_info().currsize:
+        await get_rag_system().generator.aclose()
+
 @app.get("/")
 async def root():
     return {"message": "AskMyDocs API is running!"}
@@ -70,6 +77,7 @@ async def query_documents(
             query=request.query,
             top_k=request.top_k,
             use_self_rag=request.use_self_rag,
+            filters=request.filters.to_search_filter() if request.filters else None,
         )
         duration = t.time() - start
         # Save query analytics
@@ -78,6 +86,8 @@ async def query_documents(
             "query": request.query,
             "processing_time": duration,
             "self_rag_score": self_rag_info["final_score"] if self_rag_info and "final_score" in self_rag_info else None,
+            "self_rag_path": result.get("self_rag_path"),
+            "self_rag_signals": result.get("self_rag_signals"),
             "created_at": datetime.utcnow(),
             "username": current_user["username"]
         }
@@ -85,6 +95,92 @@ async def query_documents(
         return QueryResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sse_event(event: str, data) -> str:
+    # default=float covers numpy scores
+    return f"event: {event}\ndata: {json.dumps(data, default=float)}\n\n"
+
+@app.post("/api/query/stream")
+async def query_documents_stream(
+    request: QueryRequest,
+    rag_system: RAGSystem = Depends(get_rag_system),
+    current_user=Depends(get_current_user)
+):
+    """
+    Process a query and stream the result as Server-Sent Events: `chunks` when reranking
+    is done, `token` events while the answer is generated, `self_rag` with the evaluation,
+    then `done` (or `error`)
+    """
+    async def events():
+        start = time.time()
+        self_rag_info = None
+        done = {}
+        try:
+            async for event, data in rag_system.stream_query(
+                query=request.query,
+                top_k=request.top_k,
+                use_self_rag=request.use_self_rag,
+                filters=request.filters.to_search_filter() if request.filters else None,
+            ):
+                if event == "self_rag":
+                    self_rag_info = data
+                elif event == "done":
+                    done = data
+                yield _sse_event(event, data)
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        # Save query analytics
+        await queries_collection.insert_one({
+            "query": request.query,
+            "processing_time": time.time() - start,
+            "self_rag_score": self_rag_info.get("final_score") if self_rag_info else None,
+            "self_rag_path": done.get("self_rag_path"),
+            "self_rag_signals": done.get("self_rag_signals"),
+            "created_at": datetime.utcnow(),
+            "username": current_user["username"]
+        })
+
+    # No caching or proxy buffering, so every event reaches the client as soon as it is sent
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/api/query/batch", response_model=BatchQueryResponse)
+async def query_documents_batch(
+    request: BatchQueryRequest,
+    rag_system: RAGSystem = Depends(get_rag_system),
+    current_user=Depends(get_current_user)
+):
+    """
+    Process many queries in one request (batched embedding, search and reranking)
+    """
+    start = time.time()
+    try:
+        results = await rag_system.process_query_batch(
+            queries=request.queries,
+            top_k=request.top_k,
+            use_self_rag=request.use_self_rag,
+            filters=request.filters.to_search_filter() if request.filters else None,
+        )
+        duration = time.time() - start
+        # Save query analytics
+        created_at = datetime.utcnow()
+        query_docs = [
+            {
+                "query": query,
+                "processing_time": result["processing_time"],
+                "self_rag_score": result["self_rag_info"]["final_score"] if result.get("self_rag_info") else None,
+                "self_rag_path": result.get("self_rag_path"),
+                "self_rag_signals": result.get("self_rag_signals"),
+                "created_at": created_at,
+                "username": current_user["username"]
+            }
+            for query, result in zip(request.queries, results)
+        ]
+        await queries_collection.insert_many(query_docs)
+        return BatchQueryResponse(results=[QueryResponse(**result) for result in results], processing_time=duration)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     
 @app.post("/api/documents/upload")
 async def upload_documents(files: List[UploadFile] = File(...), current_user=Depends(get_current_user)):
@@ -106,10 +202,11 @@ async def upload_documents(files: List[UploadFile] = File(...), current_user=Dep
                 content = await file.read()
                 buffer.write(content)
             uploaded_files.append(file.filename)
-        # Trigger index rebuild
+        # Queue only the uploaded files; bursts of uploads are indexed together in one build
         rag_system = get_rag_system()
-        await rag_system.rebuild_index()
-        return {"message": f"Uploaded {len(uploaded_files)} files", "files": uploaded_files}
+        for filename in uploaded_files:
+            rag_system.scheduler.schedule_add(str(data_dir / filename))
+        return {"message": f"Uploaded {len(uploaded_files)} files", "files": uploaded_files, "status": "indexing scheduled"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -145,10 +242,12 @@ async def delete_document(filename: str, current_user=Depends(get_current_user))
         if not file_path.exists():
             raise HTTPException(404, "File not found")
         file_path.unlink()
-        # Trigger index rebuild
+        # Queries exclude the document from now on; removal from the index and compaction
+        # run in the next scheduled build
         rag_system = get_rag_system()
-        await rag_system.rebuild_index()
-        return {"message": f"Deleted {filename}"}
+        rag_system.scheduler.schedule_remove(filename)
+        return {"message": f"Deleted {filename}", "status": "removal scheduled", "searchable": False,
+                "index_removal": "pending"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -164,11 +263,19 @@ async def get_query_analytics(current_user=Depends(get_current_user)):
     else:
         avg_processing_time = 0
         avg_self_rag_score = 0
+    # Latency per Self-RAG path, to measure what the adaptive policy saves
+    times_by_path = {}
+    for q in queries:
+        if q.get("self_rag_path"):
+            times_by_path.setdefault(q["self_rag_path"], []).append(q.get("processing_time", 0))
+    processing_time_by_path = {path: {"count": len(times), "avg_processing_time": sum(times) / len(times)}
+                               for path, times in times_by_path.items()}
     recent_queries = [
         {
             "query": q["query"],
             "processing_time": q.get("processing_time", 0),
             "self_rag_score": q.get("self_rag_score"),
+            "self_rag_path": q.get("self_rag_path"),
             "created_at": q["created_at"].isoformat() if q.get("created_at") else None
         }
         for q in queries[:10]
@@ -177,6 +284,7 @@ async def get_query_analytics(current_user=Depends(get_current_user)):
         "total_queries": total_queries,
         "avg_processing_time": avg_processing_time,
         "avg_self_rag_score": avg_self_rag_score,
+        "processing_time_by_path": processing_time_by_path,
         "recent_queries": recent_queries
     }
 
@@ -187,14 +295,29 @@ async def get_system_status():
     pdf_files = list(data_dir.glob("*.pdf"))
     rag_system = get_rag_system()
     chunk_count = len(getattr(rag_system.vectorstore, "documents", []))
+    index_status = rag_system.scheduler.status()
     return {
         "status": "ok",
         "vectorstore": {
             "has_documents": len(pdf_files) > 0,
             "document_count": len(pdf_files),
             "chunk_count": chunk_count,
-            "index_ready": True
+            "index_ready": not rag_system.scheduler.busy,
+            "snapshot_id": rag_system.index_manager.current_snapshot.snapshot_id
+        },
+        "indexing": index_status,
+        "caches": {
+            "query_embeddings": rag_system.embedder.query_cache.stats(),
+            "answers": rag_system.answer_cache.stats(),
+            "rerank_scores": rag_system.reranker.stats()
+        },
+        "micro_batching": {
+            "embed": rag_system.embed_batcher.stats(),
+            "rerank": rag_system.rerank_batcher.stats(),
+            "judge": rag_system.judge_batcher.stats() if rag_system.judge_batcher else None
         },
+        "generator": rag_system.generator.stats(),
+        "self_rag_policy": rag_system.self_rag_policy.stats(),
         "data_directory": {
             "path": str(data_dir.resolve()),
             "exists": data_dir.exists(),
@@ -212,10 +335,10 @@ async def get_system_status():
 
 # --- Rebuild Index Endpoint ---
 @app.post("/api/system/rebuild-index")
-async def rebuild_index(background_tasks: BackgroundTasks):
+async def rebuild_index():
     data_dir = BACKEND_DIR / "data"
     rag_system = get_rag_system()
-    background_tasks.add_task(rag_system.rebuild_index)
+    rag_system.scheduler.schedule_rebuild()
     pdf_files = list(data_dir.glob("*.pdf"))
     return {
         "message": "Index rebuild started",
@@ -1,11 +1,29 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional, Dict
 from datetime import datetime
+from backend.models.search_filter import SearchFilter
+
+class QueryFilters(BaseModel):
+    source_files: Optional[List[str]] = None
+    page_min: Optional[int] = None
+    page_max: Optional[int] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+
+    def to_search_filter(self) -> SearchFilter:
+        return SearchFilter(
+            source_files=self.source_files,
+            page_min=self.page_min,
+            page_max=self.page_max,
+            uploaded_after=self.uploaded_after.timestamp() if self.uploaded_after else None,
+            uploaded_before=self.uploaded_before.timestamp() if self.uploaded_before else None,
+        )
 
 class QueryRequest(BaseModel):
     query: str
     top_k: int = 5
     use_self_rag: bool = True
+    filters: Optional[QueryFilters] = None
 
 class ChunkInfo(BaseModel):
     text: str
@@ -19,12 +37,26 @@ class SelfRAGInfo(BaseModel):
     generation_confidence: float
     final_score: float
     reflection_notes: List[str]
+    judge: Optional[Dict[str, Any]] = None  # Local grounding judge: strategy, score, and whether it or the LLM gave the verdict
 
 class QueryResponse(BaseModel):
     answer: str
     chunks: List[ChunkInfo]
     processing_time: float
     self_rag_info: Optional[SelfRAGInfo] = None
+    self_rag_path: Optional[str] = None  # Self-RAG path taken: "off", "skip", "single" or "full"
+    self_rag_signals: Optional[Dict[str, Optional[float]]] = None  # Retrieval signals the path was chosen from
+    cached: bool = False  # Served from the semantic answer cache
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=256)
+    top_k: int = 5
+    use_self_rag: bool = False
+    filters: Optional[QueryFilters] = None
+
+class BatchQueryResponse(BaseModel):
+    results: List[QueryResponse]
+    processing_time: float
 
 class DocumentResponse(BaseModel):
     filename: str
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 from backend.models.chunk_document import ChunkDocument
 
 class BaseChunker(ABC):
@@ -12,4 +12,15 @@ class BaseChunker(ABC):
         :param source_file: The source file from which the text is extracted.
         :return: List of ChunkDocument objects representing the chunks.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]], source_file: str) -> Iterator[ChunkDocument]:
+        """
+        Stream chunks as pages arrive instead of materializing the whole document.
+        Chunkers that work page by page should override this.
+
+        :param pages: Iterable of tuples containing (page_number, text_content).
+        :param source_file: The source file from which the text is extracted.
+        :return: Iterator over ChunkDocument objects, in the same order as chunk().
+        """
+        yield from self.chunk(list(pages), source_file)
@@ -1,5 +1,5 @@
 from transformers import AutoTokenizer
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 from backend.chunker.base_chunker import BaseChunker
 from backend.models.chunk_document import ChunkDocument
 
@@ -17,7 +17,9 @@ class HFTokenChunker(BaseChunker):
         self.overlap = overlap
         
     def chunk(self, pages: List[Tuple[int, str]], source_file: str) -> List[ChunkDocument]:
-        chunks = []
+        return list(self.iter_chunks(pages, source_file))
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]], source_file: str) -> Iterator[ChunkDocument]:
         global_chunk_id = 0
 
         for page_number, text in pages:
@@ -28,14 +30,11 @@ class HFTokenChunker(BaseChunker):
                 end = start + self.max_tokens
                 chunk_ids = input_ids[start:end]
                 chunk_text = self.tokenizer.decode(chunk_ids)
-                chunk = ChunkDocument(
+                yield ChunkDocument(
                     text=chunk_text,
                     page=page_number,
                     chunk_id=global_chunk_id,
                     source_file=source_file
                 )
-                chunks.append(chunk)
                 global_chunk_id += 1
-                start += self.max_tokens - self.overlap
-
-        return chunks
\ No newline at end of file
+                start += self.max_tokens - self.overlap
\ No newline at end of file
@@ -1,6 +1,7 @@
 from transformers import AutoTokenizer
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 from backend.chunker.base_chunker import BaseChunker
+from backend.chunker.token_packer import TokenPacker
 from backend.models.chunk_document import ChunkDocument
 
 class RecursiveChunker(BaseChunker):
@@ -8,6 +9,7 @@ class RecursiveChunker(BaseChunker):
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.max_tokens = max_tokens
         self.overlap = overlap
+        self.packer = TokenPacker(self.tokenizer, max_tokens)
 
     def _split_recursive(self, text: str, level: int = 0) -> List[str]:
         """
@@ -22,52 +24,61 @@ class RecursiveChunker(BaseChunker):
         delimiter = delimiters[level]
 
         parts = text.split(delimiter)
+        # Tokenize every part (and the delimiter) once and pack by summing token counts
+        part_tokens = self.packer.count_tokens(parts)
+        delimiter_tokens = self.packer.count_tokens([delimiter])[0]
         chunks = []
-        current_chunk = ""
+        current_parts = []  # current_chunk == delimiter.join(current_parts)
+        current_tokens = 0
 
-        for part in parts:
-            if current_chunk:
-                combined = current_chunk + delimiter + part
+        for part, token_count in zip(parts, part_tokens):
+            # delimiter is never empty, so only a lone empty part makes current_chunk falsy
+            has_current = len(current_parts) > 1 or (current_parts and current_parts[0] != "")
+            if has_current:
+                combined_tokens = current_tokens + delimiter_tokens + token_count
             else:
-                combined = part
+                combined_tokens = token_count
 
-            token_count = len(self.tokenizer.encode(combined, add_special_tokens=False))
-            if token_count <= self.max_tokens:
-                current_chunk = combined
+            if combined_tokens <= self.max_tokens:
+                if has_current:
+                    current_parts.append(part)
+                else:
+                    current_parts = [part]
+                current_tokens = combined_tokens
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                if len(self.tokenizer.encode(part, add_special_tokens=False)) > self.max_tokens:
+                if has_current:
+                    chunks.append(delimiter.join(current_parts).strip())
+                if token_count > self.max_tokens:
                     if level < len(delimiters) - 1:
                         # recurse on too-long part
                         sub_chunks = self._split_recursive(part, level + 1)
                         chunks.extend(sub_chunks)
                     else:
                         chunks.append(part.strip())  # give up, add as-is
-                    current_chunk = ""
+                    current_parts, current_tokens = [], 0
                 else:
-                    current_chunk = part
+                    current_parts, current_tokens = [part], token_count
 
+        current_chunk = delimiter.join(current_parts)
         if current_chunk:
             chunks.append(current_chunk.strip())
 
         return chunks
 
     def chunk(self, pages: List[Tuple[int, str]], source_file: str) -> List[ChunkDocument]:
-        all_chunks = []
+        return list(self.iter_chunks(pages, source_file))
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]], source_file: str) -> Iterator[ChunkDocument]:
         global_chunk_id = 0
 
         for page_number, text in pages:
             semantic_chunks = self._split_recursive(text)
 
             for chunk_text in semantic_chunks:
-                chunk_doc = ChunkDocument(
+                yield ChunkDocument(
                     text=chunk_text,
                     page=page_number,
                     chunk_id=global_chunk_id,
                     source_file=source_file
                 )
-                all_chunks.append(chunk_doc)
                 global_chunk_id += 1
-
-        return all_chunks
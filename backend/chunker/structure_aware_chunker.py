@@ -1,21 +1,26 @@
 from transformers import AutoTokenizer
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 import re
 
 from backend.chunker.base_chunker import BaseChunker
+from backend.chunker.token_packer import TokenPacker
 from backend.models.chunk_document import ChunkDocument
 
+HEADING_PATTERN = re.compile(r"^\s*(I\.|II\.|III\.|[A-Z]\.|[0-9]+\.)")
+LIST_ITEM_PATTERN = re.compile(r"^\s*(-|\•|\d+\.)")
+
 
 class StructureAwareChunker(BaseChunker):
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", max_tokens: int = 480):
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.max_tokens = max_tokens
+        self.packer = TokenPacker(self.tokenizer, max_tokens)
 
     def _is_heading(self, line: str) -> bool:
-        return bool(re.match(r"^\s*(I\.|II\.|III\.|[A-Z]\.|[0-9]+\.)", line.strip()))
+        return bool(HEADING_PATTERN.match(line.strip()))
 
     def _is_list_item(self, line: str) -> bool:
-        return bool(re.match(r"^\s*(-|\•|\d+\.)", line.strip()))
+        return bool(LIST_ITEM_PATTERN.match(line.strip()))
 
     def _is_json_start(self, line: str) -> bool:
         return "{" in line
@@ -24,7 +29,8 @@ class StructureAwareChunker(BaseChunker):
         return "}" in line
 
     def _is_code_line(self, line: str) -> bool:
-        return line.startswith("    ") or line.strip().startswith("def ") or line.strip().endswith(":")  # Python-style
+        stripped = line.strip()
+        return line.startswith("    ") or stripped.startswith("def ") or stripped.endswith(":")  # Python-style
 
     def _group_lines_into_blocks(self, text: str) -> List[str]:
         lines = text.splitlines()
@@ -66,48 +72,15 @@ class StructureAwareChunker(BaseChunker):
         return [b for b in blocks if b]
 
     def _combine_blocks(self, blocks: List[str]) -> List[str]:
-        chunks = []
-        current = ""
-
-        for block in blocks:
-            candidate = f"{current}\n\n{block}".strip() if current else block
-            token_count = len(self.tokenizer.encode(candidate, add_special_tokens=False))
-
-            if token_count <= self.max_tokens:
-                current = candidate
-            else:
-                if current:
-                    chunks.append(current.strip())
-                block_tokens = len(self.tokenizer.encode(block, add_special_tokens=False))
-                if block_tokens > self.max_tokens:
-                    chunks.extend(self._hard_split(block))
-                    current = ""
-                else:
-                    current = block
-
-        if current:
-            chunks.append(current.strip())
-
-        return chunks
+        return self.packer.combine_blocks(blocks)
 
     def _hard_split(self, text: str) -> List[str]:
-        words = text.split(" ")
-        chunks = []
-        current = ""
-        for word in words:
-            candidate = f"{current} {word}".strip()
-            if len(self.tokenizer.encode(candidate, add_special_tokens=False)) > self.max_tokens:
-                if current:
-                    chunks.append(current.strip())
-                current = word
-            else:
-                current = candidate
-        if current:
-            chunks.append(current.strip())
-        return chunks
+        return self.packer.hard_split(text)
 
     def chunk(self, pages: List[Tuple[int, str]], source_file: str) -> List[ChunkDocument]:
-        all_chunks = []
+        return list(self.iter_chunks(pages, source_file))
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]], source_file: str) -> Iterator[ChunkDocument]:
         global_chunk_id = 0
 
         for page_number, text in pages:
@@ -115,13 +88,10 @@ class StructureAwareChunker(BaseChunker):
             grouped = self._combine_blocks(blocks)
 
             for chunk_text in grouped:
-                chunk_doc = ChunkDocument(
+                yield ChunkDocument(
                     text=chunk_text,
                     page=page_number,
                     chunk_id=global_chunk_id,
                     source_file=source_file
                 )
-                all_chunks.append(chunk_doc)
                 global_chunk_id += 1
-
-        return all_chunks
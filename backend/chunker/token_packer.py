@@ -0,0 +1,121 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+class TokenPacker:
+    def __init__(self, tokenizer, max_tokens: int):
+        """
+        Shared token-budget packing engine for the chunkers.
+
+        Every block or word is tokenized once (blocks in one batch call, words through the
+        offsets of their block) and candidates are packed by summing token counts, instead of
+        re-encoding the whole growing candidate string on every step.
+
+        Summing is exact for tokenizers that never merge tokens across whitespace or
+        punctuation (the BERT WordPiece tokenizer of the default MiniLM models), so the
+        chunk boundaries are the same as with re-encoding.
+
+        :param tokenizer: Hugging Face tokenizer; fast tokenizers also provide offsets.
+        :param max_tokens: Maximum number of tokens per chunk.
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        encoded = self.tokenizer(texts, add_special_tokens=False, return_attention_mask=False, return_token_type_ids=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def _encode_with_offsets(self, texts: List[str]) -> Tuple[List[int], Optional[List[Sequence[Tuple[int, int]]]]]:
+        if not texts:
+            return [], []
+        if not getattr(self.tokenizer, "is_fast", False):
+            return self.count_tokens(texts), None
+        encoded = self.tokenizer(texts, add_special_tokens=False, return_attention_mask=False,
+                                 return_token_type_ids=False, return_offsets_mapping=True)
+        return [len(ids) for ids in encoded["input_ids"]], encoded["offset_mapping"]
+
+    def _word_token_counts(self, text: str, words: List[str], offsets: Optional[Sequence[Tuple[int, int]]] = None) -> List[int]:
+        if offsets is None and getattr(self.tokenizer, "is_fast", False):
+            _, batch_offsets = self._encode_with_offsets([text])
+            offsets = batch_offsets[0]
+        if offsets is None:
+            return self.count_tokens(words)
+        # Tokens never span a space, so each token belongs to the word its first character is in
+        word_starts = np.cumsum([0] + [len(word) + 1 for word in words[:-1]])
+        token_starts = np.fromiter((start for start, _ in offsets), dtype=np.int64, count=len(offsets))
+        word_index = np.searchsorted(word_starts, token_starts, side="right") - 1
+        return np.bincount(word_index, minlength=len(words)).tolist()
+
+    def hard_split(self, text: str, offsets: Optional[Sequence[Tuple[int, int]]] = None) -> List[str]:
+        """
+        Split text on single spaces into chunks of at most max_tokens tokens.
+        A single word longer than the budget becomes its own chunk.
+
+        :param text: Text to split.
+        :param offsets: Token offsets of text, if already computed.
+        :return: List of chunk strings.
+        """
+        words = text.split(" ")
+        counts = self._word_token_counts(text, words, offsets)
+        chunks = []
+        # current == " ".join(parts); after an overflow current is the raw (unstripped) word
+        parts: List[str] = []
+        raw = False
+        current_tokens = 0
+        for word, word_tokens in zip(words, counts):
+            if current_tokens + word_tokens > self.max_tokens:
+                current = " ".join(parts)
+                if current:
+                    chunks.append(current.strip())
+                parts, raw, current_tokens = [word], True, word_tokens
+                continue
+            # Same text as f"{current} {word}".strip()
+            if raw:
+                first = parts[0].lstrip()
+                parts = [first] if first else []
+                raw = False
+            if not parts:
+                stripped = word.strip()
+                parts = [stripped] if stripped else []
+            elif word.rstrip():
+                parts.append(word.rstrip())
+            else:
+                parts[-1] = parts[-1].rstrip()
+            current_tokens += word_tokens
+        current = " ".join(parts)
+        if current:
+            chunks.append(current.strip())
+        return chunks
+
+    def combine_blocks(self, blocks: List[str], separator: str = "\n\n") -> List[str]:
+        """
+        Greedily pack stripped blocks into chunks of at most max_tokens tokens, joined by
+        separator. Blocks that exceed the budget on their own are hard-split on spaces.
+
+        :param blocks: Already stripped text blocks, in document order.
+        :param separator: Whitespace string placed between blocks of the same chunk.
+        :return: List of chunk strings.
+        """
+        counts, offsets = self._encode_with_offsets(blocks)
+        chunks = []
+        parts: List[str] = []
+        current_tokens = 0
+        for i, (block, block_tokens) in enumerate(zip(blocks, counts)):
+            if current_tokens + block_tokens <= self.max_tokens:
+                if not parts:
+                    parts = [block] if block else []
+                elif block:
+                    parts.append(block)
+                current_tokens += block_tokens
+                continue
+            if parts:
+                chunks.append(separator.join(parts).strip())
+            if block_tokens > self.max_tokens:
+                chunks.extend(self.hard_split(block, offsets[i] if offsets is not None else None))
+                parts, current_tokens = [], 0
+            else:
+                parts, current_tokens = [block], block_tokens
+        if parts:
+            chunks.append(separator.join(parts).strip())
+        return chunks
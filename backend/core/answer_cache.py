@@ -0,0 +1,132 @@
+import copy
+import faiss
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+LOOKUP_NEIGHBORS = 8  # Nearest cached queries checked for a matching snapshot and parameters
+
+def default_answer_cache_size() -> int:
+    """Maximum number of cached answers, from ANSWER_CACHE_SIZE (0 disables the cache)."""
+    return int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+
+def default_answer_cache_threshold() -> float:
+    """Cosine similarity above which a cached answer is reused, from ANSWER_CACHE_THRESHOLD."""
+    return float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+
+class _CachedAnswer:
+    def __init__(self, snapshot_id: str, params: Hashable, result: Dict[str, Any]):
+        self.snapshot_id = snapshot_id
+        self.params = params
+        self.result = result
+
+class AnswerCache:
+    def __init__(self, max_size: int = None, threshold: float = None):
+        """
+        Semantic cache of final query results (answer, chunks and Self-RAG info).
+
+        A query is served from the cache when a previous query's embedding has cosine
+        similarity of at least `threshold` with it, was answered on the same index
+        snapshot and with the same parameters (top_k, Self-RAG, filters). Cached query
+        embeddings are searched with a small exact FAISS index. Entries are evicted in
+        LRU order, and entries of older snapshots are dropped when a new snapshot is
+        published (see retain_snapshot).
+
+        :param max_size: Maximum number of entries (defaults to ANSWER_CACHE_SIZE).
+        :param threshold: Minimum cosine similarity (defaults to ANSWER_CACHE_THRESHOLD).
+        """
+        self.max_size = max_size if max_size is not None else default_answer_cache_size()
+        self.threshold = threshold if threshold is not None else default_answer_cache_threshold()
+        self._index: Optional[faiss.IndexIDMap2] = None  # Created with the dimension of the first query
+        self._entries: "OrderedDict[int, _CachedAnswer]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _normalized(self, query_vector: np.ndarray) -> np.ndarray:
+        vector = np.array(query_vector, dtype="float32", ndmin=2)  # Copy: normalized in place
+        faiss.normalize_L2(vector)
+        return vector
+
+    def get(self, query_vector: np.ndarray, snapshot_id: str, params: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        :param query_vector: Embedding of the new query.
+        :param snapshot_id: Index snapshot the query would be answered on.
+        :param params: Hashable summary of the query parameters that change the result.
+        :return: A copy of the cached result, or None.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                self.misses += 1
+                return None
+            scores, ids = self._index.search(self._normalized(query_vector), min(LOOKUP_NEIGHBORS, self._index.ntotal))
+            for score, entry_id in zip(scores[0].tolist(), ids[0].tolist()):
+                if score < self.threshold:
+                    break
+                entry = self._entries.get(entry_id)
+                if entry is not None and entry.snapshot_id == snapshot_id and entry.params == params:
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return copy.deepcopy(entry.result)
+            self.misses += 1
+            return None
+
+    def put(self, query_vector: np.ndarray, snapshot_id: str, params: Hashable, result: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        vector = self._normalized(query_vector)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = _CachedAnswer(snapshot_id, params, copy.deepcopy(result))
+            evicted = []
+            while len(self._entries) > self.max_size:
+                evicted.append(self._entries.popitem(last=False)[0])
+            if evicted:
+                self._index.remove_ids(np.array(evicted, dtype="int64"))
+                self.evictions += len(evicted)
+
+    def retain_snapshot(self, snapshot_id: str) -> None:
+        """Drop every entry answered on another snapshot (called whenever a snapshot is published)."""
+        with self._lock:
+            stale = [entry_id for entry_id, entry in self._entries.items() if entry.snapshot_id != snapshot_id]
+            for entry_id in stale:
+                del self._entries[entry_id]
+            if stale and self._index is not None:
+                self._index.remove_ids(np.array(stale, dtype="int64"))
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._index = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+class IndexScheduler:
+    def __init__(self, rag_system, debounce_seconds: float = None, max_retry_delay: float = 300.0):
+        """
+        Single index-maintenance worker. Document changes requested by the API are merged
+        while they keep arriving within the debounce window, then applied in one build;
+        at most one build runs at a time and changes arriving meanwhile wait for the next one.
+        A failed build's changes are queued again and retried with exponential backoff.
+
+        :param rag_system: The RAGSystem whose index is maintained.
+        :param debounce_seconds: Quiet period after the last change before a build starts
+                                 (defaults to INDEX_DEBOUNCE_SECONDS or 2 seconds).
+        :param max_retry_delay: Upper bound, in seconds, on the wait before retrying a failed build.
+        """
+        if debounce_seconds is None:
+            debounce_seconds = float(os.getenv("INDEX_DEBOUNCE_SECONDS", "2"))
+        self.rag_system = rag_system
+        self.debounce_seconds = debounce_seconds
+        self.max_retry_delay = max_retry_delay
+        self._full_rebuild = False
+        self._pending: Dict[str, Optional[str]] = {}  # source_file -> path to (re-)index, or None to remove
+        self._deleted: Set[str] = set()  # Deleted sources still in the published index
+        self._last_change = 0.0
+        self._retry_at = 0.0
+        self.consecutive_failures = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.current_build: Optional[Dict[str, Any]] = None
+        self.last_build: Optional[Dict[str, Any]] = None
+        self.builds_completed = 0
+
+    def schedule_add(self, file_path: str) -> None:
+        """Queue a PDF to be (re-)indexed."""
+        self._pending[os.path.basename(file_path)] = file_path
+        self._deleted.discard(os.path.basename(file_path))
+        self._kick()
+
+    def schedule_remove(self, source_file: str) -> None:
+        """Queue a document to be removed from the index; queries stop seeing it right away."""
+        self._pending[source_file] = None
+        self._deleted.add(source_file)
+        self._kick()
+
+    def schedule_rebuild(self) -> None:
+        """Queue a full rebuild from the data directory; it supersedes pending file changes."""
+        self._full_rebuild = True
+        self._pending.clear()
+        self._kick()
+
+    @property
+    def pending_removals(self) -> List[str]:
+        """Deleted documents a build has not removed from the published index yet, for queries to exclude."""
+        return sorted(self._deleted)
+
+    @property
+    def has_pending(self) -> bool:
+        return self._full_rebuild or bool(self._pending)
+
+    @property
+    def busy(self) -> bool:
+        return self.has_pending or self.current_build is not None
+
+    def _kick(self) -> None:
+        self._last_change = time.monotonic()
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Debounce: wait until no new change has arrived for debounce_seconds (and,
+            # after a failed build, until its retry delay has passed)
+            while (delay := max(self._last_change + self.debounce_seconds, self._retry_at) - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            self._wakeup.clear()
+            if not self.has_pending:
+                continue
+            full_rebuild, pending = self._full_rebuild, self._pending
+            self._full_rebuild, self._pending = False, {}
+            await self._build(full_rebuild, pending)
+
+    async def _build(self, full_rebuild: bool, pending: Dict[str, Optional[str]]) -> None:
+        add_paths = [path for path in pending.values() if path is not None]
+        remove_sources = [source for source, path in pending.items() if path is None]
+        progress: Dict[str, Any] = {}
+        self.current_build = {
+            "kind": "rebuild" if full_rebuild else "update",
+            "add": [os.path.basename(path) for path in add_paths],
+            "remove": remove_sources,
+            "started_at": time.time(),
+            "progress": progress,
+        }
+        # A rebuild reads the data directory, where deleted files no longer are
+        removing = set(self._deleted) if full_rebuild else set(remove_sources)
+        status, error = "succeeded", None
+        try:
+            if full_rebuild:
+                await self.rag_system.rebuild_index(progress=progress)
+            else:
+                await self.rag_system.apply_changes(add_paths, remove_sources, progress=progress)
+        except Exception as e:
+            status, error = "failed", str(e)
+            self._requeue(full_rebuild, pending)
+            print(f"❌ Index build failed: {e}; retrying in {self._retry_at - time.monotonic():.0f}s")
+        finally:
+            build = self.current_build
+            self.current_build = None
+            build.update(status=status, error=error, finished_at=time.time(),
+                         duration=time.time() - build["started_at"])
+            self.last_build = build
+            self.builds_completed += 1
+            if status == "succeeded":
+                self.consecutive_failures = 0
+                self._deleted -= removing
+
+    def _requeue(self, full_rebuild: bool, pending: Dict[str, Optional[str]]) -> None:
+        # Put a failed build's changes back; changes scheduled since it started are newer and win
+        if full_rebuild:
+            self._full_rebuild = True
+            self._pending.clear()
+        elif not self._full_rebuild:
+            self._pending = {**pending, **self._pending}
+        self.consecutive_failures += 1
+        delay = min(max(self.debounce_seconds, 1.0) * 2 ** self.consecutive_failures, self.max_retry_delay)
+        self._retry_at = time.monotonic() + delay
+        self._wakeup.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Queue state and progress of the index-maintenance worker, for /api/system/status."""
+        if self.current_build is not None:
+            state = "building"
+        elif self.has_pending and self._retry_at > time.monotonic():
+            state = "retrying"
+        elif self.has_pending:
+            state = "debouncing"
+        else:
+            state = "idle"
+        return {
+            "state": state,
+            "debounce_seconds": self.debounce_seconds,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": max(self._retry_at - time.monotonic(), 0.0),
+            "pending": {
+                "full_rebuild": self._full_rebuild,
+                "add": sorted(source for source, path in self._pending.items() if path is not None),
+                "remove": sorted(source for source, path in self._pending.items() if path is None),
+                "hidden_from_queries": self.pending_removals,
+            },
+            "current_build": self.current_build,
+            "last_build": self.last_build,
+            "builds_completed": self.builds_completed,
+        }
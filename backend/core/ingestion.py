@@ -0,0 +1,229 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+
+from backend.chunker.base_chunker import BaseChunker
+from backend.embedder.base_embedder import BaseEmbedder
+from backend.models.chunk_document import ChunkDocument
+from backend.reader.base_reader import BaseReader
+from backend.vectorstore.base_vectorstore import BaseVectorStore
+
+# Per-process state set once by _init_worker: copies of the pipeline's configured reader and
+# chunker (so every worker owns its tokenizer), the result queues and the stop flag
+_worker_reader = None
+_worker_chunker = None
+_worker_results = None
+_worker_stop = None
+
+def _init_worker(reader: BaseReader, chunker: BaseChunker, results: List[Any], stop: Any) -> None:
+    global _worker_reader, _worker_chunker, _worker_results, _worker_stop
+    _worker_reader = reader
+    _worker_chunker = chunker
+    _worker_results = results
+    _worker_stop = stop
+    for result_queue in results:
+        # Batches left unread when the pipeline stops early must not block the worker's exit
+        result_queue.cancel_join_thread()
+
+def _worker_put(result_queue: Any, item: Any) -> bool:
+    while not _worker_stop.is_set():
+        try:
+            result_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _read_and_chunk(path: str, slot: int, batch_size: int) -> None:
+    # Stream the file's chunks to the slot's result queue in batches, then an end marker (None)
+    result_queue = _worker_results[slot]
+    try:
+        chunks = _worker_chunker.iter_chunks(_worker_reader.iter_pages(path), os.path.basename(path))
+        while True:
+            chunk_docs = list(itertools.islice(chunks, batch_size))
+            if not chunk_docs or not _worker_put(result_queue, chunk_docs):
+                return
+    finally:
+        _worker_put(result_queue, None)
+
+def default_ingest_workers() -> int:
+    # Every worker holds its own tokenizer and reader, so the default stays small on many-core
+    # hosts; INGEST_WORKERS raises it explicitly
+    return int(os.getenv("INGEST_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+_DONE = object()
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def _put(out_queue: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    # Blocking put that gives up once the pipeline is being torn down
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _drain(in_queue: queue.Queue, stop: threading.Event) -> Iterator[Any]:
+    while not stop.is_set():
+        try:
+            item = in_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
+
+def _run_stage(source: Iterator[Any], out_queue: queue.Queue, stop: threading.Event) -> None:
+    try:
+        for item in source:
+            if not _put(out_queue, item, stop):
+                return
+        _put(out_queue, _DONE, stop)
+    except BaseException as e:
+        _put(out_queue, _StageError(e), stop)
+    finally:
+        # Release the stage's resources (e.g. the process pool) when stopped early
+        source.close()
+
+class IngestionPipeline:
+    def __init__(self, reader: BaseReader, chunker: BaseChunker, embedder: BaseEmbedder, workers: int = None, embed_batch_size: int = 256, queue_size: int = 4):
+        """
+        Streaming ingestion: read -> chunk -> embed -> index, with the stages running
+        concurrently and connected by bounded queues, so peak memory depends on the
+        batch and queue sizes rather than on the corpus.
+
+        With more than one worker, reading and chunking run in a process pool: each worker
+        gets a copy of the configured reader and chunker (and so its own tokenizer), and
+        streams a file's chunks back in batches through a bounded queue of its own. Files
+        are processed in sorted order and consumed in that order, so chunk order (and
+        therefore the global chunk IDs) is the same for any worker count.
+
+        :param reader: Reader used in-process and copied to each worker.
+        :param chunker: Chunker used in-process and copied to each worker.
+        :param embedder: Embedder for the single embedding stage.
+        :param workers: Number of reader/chunker processes (defaults to INGEST_WORKERS, or the CPU count capped at 4).
+        :param embed_batch_size: Number of chunks per embedding batch and per vectorstore.add call.
+        :param queue_size: Capacity, in batches, of each queue between stages.
+        """
+        self.reader = reader
+        self.chunker = chunker
+        self.embedder = embedder
+        self.workers = workers if workers is not None else default_ingest_workers()
+        self.embed_batch_size = embed_batch_size
+        self.queue_size = queue_size
+
+    def _iter_chunk_lists(self, pdf_files: List[str]) -> Iterator[List[ChunkDocument]]:
+        workers = min(self.workers, len(pdf_files))
+        if workers <= 1:
+            for path in pdf_files:
+                chunks = self.chunker.iter_chunks(self.reader.iter_pages(path), os.path.basename(path))
+                while True:
+                    chunk_docs = list(itertools.islice(chunks, self.embed_batch_size))
+                    if not chunk_docs:
+                        break
+                    yield chunk_docs
+            return
+        # spawn: forking a parent that already holds torch/tokenizer threads can deadlock
+        context = multiprocessing.get_context("spawn")
+        # One bounded result queue per in-flight file, so at most workers * queue_size
+        # batches are held in memory however large the files are
+        slots = [context.Queue(maxsize=self.queue_size) for _ in range(workers)]
+        stop = context.Event()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(self.reader, self.chunker, slots, stop)) as executor:
+            try:
+                futures = {}
+                for i in range(workers):
+                    futures[i] = executor.submit(_read_and_chunk, pdf_files[i], i, self.embed_batch_size)
+                for i in range(len(pdf_files)):
+                    yield from self._receive(slots[i % workers], futures.pop(i))
+                    # The file's slot is free again: start the next file in it
+                    if i + workers < len(pdf_files):
+                        futures[i + workers] = executor.submit(_read_and_chunk, pdf_files[i + workers], i % workers, self.embed_batch_size)
+            finally:
+                stop.set()
+
+    @staticmethod
+    def _receive(result_queue: Any, future: Any) -> Iterator[List[ChunkDocument]]:
+        # A file's batches from its worker, up to the end marker
+        while True:
+            try:
+                chunk_docs = result_queue.get(timeout=0.1)
+            except queue.Empty:
+                # A worker process that died never sends the end marker
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+                continue
+            if chunk_docs is None:
+                future.result()  # Raises if reading or chunking failed
+                return
+            yield chunk_docs
+
+    def iter_batches(self, pdf_files: List[str]) -> Iterator[Tuple[List[ChunkDocument], np.ndarray]]:
+        """
+        Yield (chunks, float32 embeddings) batches of at most embed_batch_size chunks for
+        the given files, in deterministic order. Reading/chunking and embedding run in
+        background threads while the caller consumes batches.
+
+        :param pdf_files: Paths of the PDF files to ingest.
+        """
+        stop = threading.Event()
+        chunk_lists: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        chunk_stream = itertools.chain.from_iterable(_drain(chunk_lists, stop))
+        stages = [
+            threading.Thread(target=_run_stage, args=(self._iter_chunk_lists(sorted(pdf_files)), chunk_lists, stop), daemon=True),
+            threading.Thread(target=_run_stage, args=(self.embedder.embed_stream(chunk_stream, self.embed_batch_size), embedded, stop), daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        try:
+            yield from _drain(embedded, stop)
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join()
+
+    def run(self, pdf_files: List[str], vectorstore: BaseVectorStore, progress: Dict[str, Any] = None) -> Dict[str, float]:
+        """
+        Ingest the given files into the vector store and report throughput.
+
+        :param pdf_files: Paths of the PDF files to ingest.
+        :param vectorstore: Vector store the chunks are added to.
+        :param progress: Optional dict updated in place with files_total, files_started and chunks_indexed.
+        :return: Ingestion statistics.
+        """
+        start_time = time.time()
+        num_chunks = 0
+        sources_seen = set()
+        if progress is not None:
+            progress.update(files_total=len(pdf_files), files_started=0, chunks_indexed=0)
+        for chunk_docs, embeddings in self.iter_batches(pdf_files):
+            vectorstore.add(embeddings, chunk_docs)
+            num_chunks += len(chunk_docs)
+            if progress is not None:
+                sources_seen.update(doc.source_file for doc in chunk_docs)
+                progress.update(files_started=len(sources_seen), chunks_indexed=num_chunks)
+        elapsed = time.time() - start_time
+        stats = {
+            "files": len(pdf_files),
+            "chunks": num_chunks,
+            "workers": min(self.workers, max(len(pdf_files), 1)),
+            "seconds": elapsed,
+            "chunks_per_second": num_chunks / elapsed if elapsed > 0 else 0.0,
+        }
+        print(f"⚡ Ingested {stats['chunks']} chunks from {stats['files']} files in {elapsed:.2f}s "
+              f"({stats['chunks_per_second']:.1f} chunks/s, {stats['workers']} workers)")
+        return stats
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_STOP = object()
+
+def default_micro_batch_size() -> int:
+    """Most requests merged into one model call, from MICRO_BATCH_SIZE (1 disables batching)."""
+    return int(os.getenv("MICRO_BATCH_SIZE", "32"))
+
+def default_micro_batch_wait_ms() -> float:
+    """Milliseconds a batch waits for more requests after its first one, from MICRO_BATCH_WAIT_MS."""
+    return float(os.getenv("MICRO_BATCH_WAIT_MS", "5"))
+
+def _bucket(n: int) -> int:
+    # Power-of-two histogram bucket: 1, 2, 4, 8, ...
+    return 1 << max(n - 1, 0).bit_length()
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(self, process_batch: Callable[[List[T]], List[R]], max_batch_size: int = None,
+                 max_wait_ms: float = None, name: str = "batch"):
+        """
+        Dynamic micro-batching for model calls made by concurrent requests.
+
+        Coroutines submit single items; a worker thread collects the items that arrive
+        within `max_wait_ms` of the first one (up to `max_batch_size`) and runs them
+        through `process_batch` in one call, off the event loop. Under load, batches fill
+        up immediately and many small forward passes become a few large ones; a lone
+        request waits at most `max_wait_ms`.
+
+        :param process_batch: Maps a list of items to a list of results in the same order.
+        :param max_batch_size: Most items per call (defaults to MICRO_BATCH_SIZE).
+        :param max_wait_ms: Longest wait for a batch to fill (defaults to MICRO_BATCH_WAIT_MS).
+        :param name: Name of the worker thread.
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size if max_batch_size is not None else default_micro_batch_size())
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else default_micro_batch_wait_ms()) / 1000
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes: Counter = Counter()   # Histogram of items per model call
+        self.queue_depths: Counter = Counter()  # Histogram of items already waiting when one is submitted
+        self.max_queue_depth = 0
+        self.busy_seconds = 0.0
+
+    async def submit(self, item: T) -> R:
+        """Process one item as part of the next batch and return its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        depth = self._queue.qsize()
+        with self._lock:
+            self.queue_depths[_bucket(depth + 1)] += 1
+            self.max_queue_depth = max(self.max_queue_depth, depth + 1)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"micro-batcher-{self.name}", daemon=True)
+                self._worker.start()
+        self._queue.put((item, future, loop))
+        return await future
+
+    def _collect(self, first: Tuple) -> Tuple[List[Tuple], bool]:
+        # Gather what arrives within the wait window after the first item
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                remaining = deadline - time.monotonic()
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stop = self._collect(first)
+            # Requests cancelled while queued (e.g. client disconnects) are not computed
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                results = self.process_batch([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: got {len(results)} results for a batch of {len(batch)}")
+                outcomes = [(result, None) for result in results]
+            except Exception as e:
+                outcomes = [(None, e)] * len(batch)
+            with self._lock:
+                self.busy_seconds += time.perf_counter() - start
+                self.batches += 1
+                self.items += len(batch)
+                self.batch_sizes[_bucket(len(batch))] += 1
+            for (_, future, loop), (result, error) in zip(batch, outcomes):
+                try:
+                    loop.call_soon_threadsafe(self._resolve, future, result, error)
+                except RuntimeError:
+                    pass  # The submitting event loop has been closed
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any, error: Optional[Exception]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def close(self) -> None:
+        """Stop the worker thread after the batches already queued."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "busy_seconds": self.busy_seconds,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+                "queue_depth_histogram": {str(depth): count for depth, count in sorted(self.queue_depths.items())},
+            }
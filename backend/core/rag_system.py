@@ -1,46 +1,169 @@
 import time
 import asyncio
-from typing import Dict, List, Any
+import functools
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import os
-import shutil
 import numpy as np
 
 from backend.reader.pdf_reader import PDFReader
 from backend.chunker.structure_aware_chunker import StructureAwareChunker
 from backend.embedder.hf_embedder import HuggingFaceEmbedder
+from backend.embedder.cached_embedder import CachedEmbedder
 from backend.vectorstore.faiss_store import FaissVectorStore
-from backend.generator.cohere_generator import CohereGenerator
-from backend.reranker.hf_reranker import HuggingFaceReranker
+from backend.vectorstore.sharded_store import create_vector_store
+from backend.generator.base_generator import BaseGenerator
+from backend.generator.async_cohere_generator import AsyncCohereGenerator
+from backend.reranker.cascade_reranker import CascadeReranker, default_rerank_max_length
+from backend.judge.base_judge import BaseJudge
+from backend.judge.embedding_judge import EmbeddingJudge
+from backend.judge.cross_encoder_judge import CrossEncoderJudge
 from backend.utils.index_manager import IndexManager
+from backend.core.ingestion import IngestionPipeline
+from backend.core.index_scheduler import IndexScheduler
+from backend.core.answer_cache import AnswerCache
+from backend.core.micro_batcher import MicroBatcher
+from backend.core.self_rag_policy import SelfRAGPolicy
 from backend.models.chunk_document import ChunkDocument
+from backend.models.search_filter import SearchFilter
+from backend.models.grounding_score import GroundingScore
 
 BACKEND_DIR = Path(__file__).parent.parent
 
+INFERENCE_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+def default_inference_backend() -> str:
+    """Backend the embedder and reranker run on, from INFERENCE_BACKEND (one of INFERENCE_BACKENDS)."""
+    return os.getenv("INFERENCE_BACKEND", "torch").lower()
+
+GENERATOR_BACKENDS = ("cohere", "stub")
+
+def default_generator_backend() -> str:
+    """LLM backend for answers and Self-RAG, from GENERATOR_BACKEND (one of GENERATOR_BACKENDS)."""
+    return os.getenv("GENERATOR_BACKEND", "cohere").lower()
+
+JUDGE_STRATEGIES = ("embedding", "cross-encoder", "llm")
+
+def default_judge_strategy() -> str:
+    """How Self-RAG judges answers, from JUDGE_STRATEGY (one of JUDGE_STRATEGIES)."""
+    return os.getenv("JUDGE_STRATEGY", "embedding").lower()
+
+def default_judge_band(judge: BaseJudge) -> Tuple[float, float]:
+    """Local judge scores that are referred to the LLM, from JUDGE_UNCERTAIN_LOW and JUDGE_UNCERTAIN_HIGH (judge's own band when unset)."""
+    return (float(os.getenv("JUDGE_UNCERTAIN_LOW", judge.uncertain_low)),
+            float(os.getenv("JUDGE_UNCERTAIN_HIGH", judge.uncertain_high)))
+
+def default_hybrid_search() -> bool:
+    """Fuse BM25 keyword results with dense results, from HYBRID_SEARCH."""
+    return os.getenv("HYBRID_SEARCH", "true").lower() in ("1", "true", "yes")
+
+def default_rerank_candidates(hybrid_search: bool) -> int:
+    """Retrieved chunks passed to the cross-encoder, from RERANK_CANDIDATES."""
+    # Keyword matches cover the exact-term questions dense search ranks poorly, so
+    # hybrid retrieval needs a smaller pool for the same recall
+    return int(os.getenv("RERANK_CANDIDATES", "0")) or (30 if hybrid_search else 50)
+
+def default_search_workers() -> int:
+    """Threads running index searches for queries, from SEARCH_WORKERS."""
+    return int(os.getenv("SEARCH_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+
+def default_llm_concurrency() -> int:
+    """LLM requests in flight at once across all queries, from LLM_CONCURRENCY."""
+    return int(os.getenv("LLM_CONCURRENCY", "8"))
+
 class RAGSystem:
-    def __init__(self):
+    def __init__(self, ingest_workers: int = None):
         self.reader = PDFReader()
         self.chunker = StructureAwareChunker()
-        self.embedder = HuggingFaceEmbedder()
-        self.vectorstore = FaissVectorStore()
-        self.generator = CohereGenerator()
-        self.reranker = HuggingFaceReranker()
+        self.inference_backend = default_inference_backend()
+        self.embedder, cross_encoder = self._create_inference_models(self.inference_backend)
+        self.document_embedder = CachedEmbedder(self.embedder)  # Ingest path, backed by the on-disk embedding cache
+        self.generator = self._create_generator(default_generator_backend())  # Shared by answers, Self-RAG judging and refinement
+        self.reranker = CascadeReranker(model=cross_encoder)
+        self.judge_strategy = default_judge_strategy()
+        self.judge = self._create_judge(self.judge_strategy, self.document_embedder, self.reranker.model)  # None: the LLM judges every answer
+        self.judge_band = default_judge_band(self.judge) if self.judge else None
+        self.self_rag_policy = SelfRAGPolicy()  # Skips or shortens Self-RAG when retrieval is clearly good
         self.index_manager = IndexManager()
-        self.llm = CohereGenerator()  # LLM değerlendirme ve refine için de kullanılacak
+        self.llm = self.generator  # LLM değerlendirme ve refine için de kullanılacak
+        self.ingestion = IngestionPipeline(self.reader, self.chunker, self.document_embedder, workers=ingest_workers)
+        self._index_lock = asyncio.Lock()  # One index build or update at a time
+        self.scheduler = IndexScheduler(self)  # Coalesces API-driven index updates into debounced builds
+        self.hybrid_search = default_hybrid_search()
+        self.rerank_candidates = default_rerank_candidates(self.hybrid_search)
+        self.answer_cache = AnswerCache()  # Final results of similar earlier queries, per index snapshot
+        self.index_manager.add_publish_listener(lambda snapshot: self.answer_cache.retain_snapshot(snapshot.snapshot_id))
+        # Concurrent single queries share embedding and cross-encoder forward passes
+        self.embed_batcher = MicroBatcher(self.embedder.embed_queries, name="embed")
+        self.rerank_batcher = MicroBatcher(self._rerank_requests, name="rerank")
+        self.judge_batcher = MicroBatcher(self.judge.score_batch, name="judge") if self.judge else None
+        # CPU stages run off the event loop with bounded parallelism: the models through their
+        # single batcher threads, index searches on this pool; LLM calls are async and capped
+        self.search_executor = ThreadPoolExecutor(max_workers=default_search_workers(), thread_name_prefix="rag-search")
+        self.llm_slots = asyncio.Semaphore(default_llm_concurrency())
         
         # Initialize with existing documents
         self._initialize_index()
+
+    @staticmethod
+    def _create_inference_models(backend: str):
+        """Embedder and cross-encoder for an inference backend (None selects CascadeReranker's own CrossEncoder)"""
+        if backend == "torch":
+            return HuggingFaceEmbedder(), None
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend} (expected one of {', '.join(INFERENCE_BACKENDS)})")
+        # ONNX Runtime is only needed when selected
+        from backend.embedder.onnx_embedder import ONNXEmbedder
+        from backend.reranker.onnx_reranker import ONNXCrossEncoder
+
+        quantize = backend == "onnx-int8"
+        print(f"⚡ Using ONNX Runtime{' (int8)' if quantize else ''} for the embedder and reranker")
+        return ONNXEmbedder(quantize=quantize), ONNXCrossEncoder(quantize=quantize, max_length=default_rerank_max_length())
+
+    @staticmethod
+    def _create_generator(backend: str) -> BaseGenerator:
+        if backend == "cohere":
+            return AsyncCohereGenerator()
+        if backend == "stub":
+            from backend.generator.stub_generator import StubGenerator
+
+            print("⚠️ Using the stub generator: answers are extracted from the top chunk, not generated")
+            return StubGenerator()
+        raise ValueError(f"Unknown generator backend: {backend} (expected one of {', '.join(GENERATOR_BACKENDS)})")
+
+    @staticmethod
+    def _create_judge(strategy: str, embedder, cross_encoder) -> Optional[BaseJudge]:
+        """Local grounding judge for a strategy; both reuse models that are already loaded"""
+        if strategy == "embedding":
+            return EmbeddingJudge(embedder)
+        if strategy == "cross-encoder":
+            return CrossEncoderJudge(cross_encoder)
+        if strategy == "llm":
+            return None
+        raise ValueError(f"Unknown judge strategy: {strategy} (expected one of {', '.join(JUDGE_STRATEGIES)})")
+
+    @property
+    def vectorstore(self) -> FaissVectorStore:
+        """Vector store of the currently published index snapshot"""
+        return self.index_manager.current_snapshot.store
     
     def _initialize_index(self):
         """Initialize index with existing PDF files"""
         pdf_files = self._get_pdf_files()
+        store, index_path = create_vector_store(), None
         if pdf_files:
-            index_path = self.index_manager.get_index_path(pdf_files)
-            if self.vectorstore.exists(index_path):
-                self.vectorstore.load(index_path)
-                print(f"✅ Loaded existing index with {len(self.vectorstore.documents)} documents")
+            index_path = self.index_manager.find_snapshot_path(pdf_files)
+            if index_path and store.load(index_path):
+                # Snapshots written before upload-date filtering carry no upload times
+                self._record_upload_times(store, [path for path in pdf_files if os.path.basename(path) not in store.source_uploaded_at])
+                print(f"✅ Loaded existing index with {len(store.documents)} documents")
             else:
-                self._build_index(pdf_files)
+                store, index_path = self._build_index(pdf_files)
+        self.index_manager.publish(store, index_path)
     
     def _get_pdf_files(self) -> List[str]:
         """Get all PDF files from data directory"""
@@ -50,111 +173,437 @@ class RAGSystem:
             return []
         return [str(f) for f in data_dir.glob("*.pdf")]
     
-    def _build_index(self, pdf_files: List[str]):
-        """Build index from PDF files"""
-        index_path = self.index_manager.get_index_path(pdf_files)
-        # Remove old index if exists
-        if os.path.exists(index_path):
-            shutil.rmtree(index_path)
+    def _build_index(self, pdf_files: List[str], progress: Optional[Dict[str, Any]] = None) -> Tuple[FaissVectorStore, str]:
+        """Build a new, unpublished index snapshot from PDF files"""
+        store = create_vector_store()
+        index_path = self.index_manager.new_snapshot_path(pdf_files)
+        try:
+            self.ingestion.run(pdf_files, store, progress=progress)
+            self._record_upload_times(store, pdf_files)
+            store.optimize()
+            print(f"♻️ Embedding cache: {self.document_embedder.hits} hits, {self.document_embedder.misses} misses")
+            store.save(index_path)
+        except Exception:
+            self.index_manager.discard(index_path)
+            raise
+        return store, index_path
+
+    def _record_upload_times(self, store: FaissVectorStore, pdf_files: List[str]):
+        # The file's modification time is its upload time (as in /api/documents)
         for path in pdf_files:
-            source_file = os.path.basename(path)
-            pages = self.reader.read(path)
-            chunk_docs = self.chunker.chunk(pages, source_file)
-            embeddings = self.embedder.embed(chunk_docs)
-            self.vectorstore.add(embeddings, chunk_docs)
-        # Save index
+            if os.path.exists(path):
+                store.set_uploaded_at(os.path.basename(path), os.path.getmtime(path))
+
+    def _clone_live_store(self, snapshot) -> FaissVectorStore:
+        """
+        Writable copy of a published store for an incremental update: a fresh store opened
+        from the snapshot's directory. Saved files are mapped read-only and changes go to
+        in-memory overlays, so the published snapshot itself is never modified.
+        """
+        store = create_vector_store()
+        if snapshot is not None and snapshot.index_path and not store.load(snapshot.index_path):
+            raise RuntimeError(f"Could not open index snapshot {snapshot.snapshot_id} for updating")
+        return store
+
+    def _publish_store(self, store: FaissVectorStore):
+        """Save an updated store as a new snapshot and publish it; nothing is published if saving fails"""
+        # Name the snapshot after the files it actually contains, not after whatever sits in
+        # data/ right now (uploads may be waiting for the next scheduled build)
+        data_dir = BACKEND_DIR / "data"
+        pdf_files = [str(data_dir / source) for source in store.sources]
+        index_path = None
         if pdf_files:
-            self.vectorstore.save(index_path)
+            index_path = self.index_manager.new_snapshot_path(pdf_files)
+            try:
+                store.save(index_path)
+            except Exception:
+                self.index_manager.discard(index_path)
+                raise
+        self.index_manager.publish(store, index_path)
+
+    def _index_file(self, store: FaissVectorStore, file_path: str) -> int:
+        source_file = os.path.basename(file_path)
+        batches = list(self.ingestion.iter_batches([file_path]))
+        chunk_docs = [doc for docs, _ in batches for doc in docs]
+        embeddings = np.concatenate([vectors for _, vectors in batches]) if batches else []
+        # Swap old chunks for new ones only once the new embeddings are ready
+        store.replace_document(source_file, embeddings, chunk_docs)
+        self._record_upload_times(store, [file_path])
+        print(f"✅ Indexed {source_file} ({len(chunk_docs)} chunks)")
+        return len(chunk_docs)
+
+    def _apply_changes(self, add_paths: List[str], remove_sources: List[str], compact: bool,
+                       progress: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        progress = progress if progress is not None else {}
+        progress.update(files_total=len(add_paths) + len(remove_sources), files_done=0)
+        stats = {"added_chunks": 0, "removed_chunks": 0, "compacted": 0}
+        # Changes go to a copy of the published store; queries keep seeing the current
+        # snapshot, unchanged, until the updated one is saved and published. If anything
+        # fails, the copy is dropped and the current snapshot stays as it was.
+        with self.index_manager.acquire() as snapshot:
+            store = self._clone_live_store(snapshot)
+            for source_file in remove_sources:
+                removed = store.remove_document(source_file)
+                stats["removed_chunks"] += removed
+                progress["files_done"] += 1
+                print(f"🗑️ Removed {source_file} from index ({removed} chunks)")
+            for file_path in sorted(add_paths):
+                stats["added_chunks"] += self._index_file(store, file_path)
+                progress["files_done"] += 1
+            if compact:
+                stats["compacted"] = store.compact()
+            if add_paths or remove_sources or stats["compacted"]:
+                # One snapshot for the whole batch of changes
+                self._publish_store(store)
+        return stats
+
+    async def apply_changes(self, add_paths: List[str], remove_sources: List[str], compact: bool = True,
+                            progress: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Apply a batch of document changes and publish them as a single new snapshot.
+
+        :param add_paths: PDFs to index; already indexed files have their chunks replaced.
+        :param remove_sources: Source file names to remove from the index.
+        :param compact: Drop tombstoned vectors before publishing.
+        :param progress: Optional dict updated in place with files_total and files_done.
+        :return: Number of chunks added, removed and compacted.
+        """
+        async with self._index_lock:
+            return await asyncio.to_thread(self._apply_changes, add_paths, remove_sources, compact, progress)
+
+    async def add_document(self, file_path: str) -> int:
+        """
+        Index a single PDF without re-processing the rest of the corpus.
+        Re-adding an already indexed file replaces its previous chunks.
+        """
+        stats = await self.apply_changes([file_path], [], compact=False)
+        return stats["added_chunks"]
+
+    async def remove_document(self, source_file: str) -> int:
+        """
+        Remove a single document's chunks from the index.
+        Vectors are tombstoned; call compact_index() to reclaim them.
+        """
+        stats = await self.apply_changes([], [source_file], compact=False)
+        return stats["removed_chunks"]
+
+    async def compact_index(self):
+        """Drop tombstoned vectors from the FAISS index (meant to run as a background task)"""
+        stats = await self.apply_changes([], [], compact=True)
+        if stats["compacted"]:
+            print(f"🧹 Compacted index, dropped {stats['compacted']} vectors")
     
-    async def process_query(self, query: str, top_k: int = 10, use_self_rag: bool = True) -> Dict[str, Any]:
+    async def process_query(self, query: str, top_k: int = 10, use_self_rag: bool = True, filters: Optional[SearchFilter] = None) -> Dict[str, Any]:
         """
         Process query with optional Self-RAG
         """
+        # Pin the current snapshot so a concurrent rebuild cannot swap or delete it mid-query
+        filters = self._query_filters(filters)
+        with self.index_manager.acquire() as snapshot:
+            start_time = time.time()
+            query_vector = await self._embed_query(query)
+            params = self._answer_cache_params(top_k, use_self_rag, filters)
+            cached = self.answer_cache.get(query_vector, snapshot.snapshot_id, params)
+            if cached is not None:
+                cached.update(processing_time=time.time() - start_time, cached=True)
+                return cached
+            result = await self._process_query(snapshot.store, query, top_k, use_self_rag, filters, query_vector=query_vector)
+            self.answer_cache.put(query_vector, snapshot.snapshot_id, params, result)
+            return result
+
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Query embedding, computed in a micro-batch with concurrent requests"""
+        return await self.embed_batcher.submit(query)
+
+    async def _rerank(self, query: str, chunks: List[Tuple[ChunkDocument, float]], top_k: int) -> List[Tuple[ChunkDocument, float]]:
+        """Cross-encoder reranking, computed in a micro-batch with concurrent requests"""
+        return await self.rerank_batcher.submit((query, chunks, top_k))
+
+    async def _judge(self, query: str, answer: str, chunks: List[ChunkDocument]) -> GroundingScore:
+        """Local grounding score of an answer, batched with concurrent queries' judging"""
+        return await self.judge_batcher.submit((query, answer, chunks))
+
+    async def _search(self, fn, *args, **kwargs):
+        """Run an index search on the search executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.search_executor, functools.partial(fn, *args, **kwargs))
+
+    async def _generate(self, query: str, chunks: List[ChunkDocument]) -> str:
+        """Answer generation, within the LLM concurrency limit"""
+        async with self.llm_slots:
+            return await self.generator.agenerate_answer(query, chunks)
+
+    def _rerank_requests(self, requests: List[Tuple[str, List[Tuple[ChunkDocument, float]], int]]) -> List[List[Tuple[ChunkDocument, float]]]:
+        # One rerank_batch call for all requests, cut back to each request's own top_k
+        max_top_k = max(top_k for _, _, top_k in requests)
+        reranked = self.reranker.rerank_batch([query for query, _, _ in requests], [chunks for _, chunks, _ in requests], top_k=max_top_k)
+        return [result[:top_k] for result, (_, _, top_k) in zip(reranked, requests)]
+
+    def _query_filters(self, filters: Optional[SearchFilter]) -> Optional[SearchFilter]:
+        # Deleted documents stay in the published index until the next build removes them;
+        # exclude them now. The exclusion is part of the answer-cache key, so answers cached
+        # before the deletion are not served either.
+        pending_removals = self.scheduler.pending_removals
+        if not pending_removals:
+            return filters
+        filters = filters or SearchFilter()
+        return replace(filters, exclude_source_files=sorted(set(filters.exclude_source_files or []) | set(pending_removals)))
+
+    def _answer_cache_params(self, top_k: int, use_self_rag: bool, filters: Optional[SearchFilter]) -> Tuple:
+        # Everything besides the query that changes the result
+        return top_k, use_self_rag, repr(filters) if filters is not None and not filters.is_empty() else None
+
+    async def _process_query(self, vectorstore: FaissVectorStore, query: str, top_k: int, use_self_rag: bool, filters: Optional[SearchFilter] = None,
+                             query_vector: Optional[np.ndarray] = None) -> Dict[str, Any]:
         start_time = time.time()
         
-        # Get query embedding
-        query_vector = self.embedder.embed([
-            ChunkDocument(text=query, page=0, chunk_id=0, source_file="query")
-        ])[0]
-        
-        # Initial retrieval
-        initial_chunks = self.vectorstore.search(query_vector, k=50)
-        
-        # Rerank
-        reranked_chunks = self.reranker.rerank(query, initial_chunks, top_k=top_k)
+        # Retrieval and reranking
+        initial_chunks, reranked_chunks = await self._retrieve_and_rerank(vectorstore, query, top_k, filters, query_vector)
         
         # Generate answer
         chunks_for_generation = [chunk for chunk, _ in reranked_chunks]
-        answer = self.generator.generate_answer(query, chunks_for_generation)
+        answer = await self._generate(query, chunks_for_generation)
         
-        # Self-RAG evaluation (placeholder for now)
+        # Self-RAG evaluation, as much of it as the retrieval signals call for
+        self_rag_path, signals = self._choose_self_rag_path(use_self_rag, initial_chunks, reranked_chunks)
         self_rag_info = None
-        if use_self_rag:
-            self_rag_info = await self._evaluate_with_self_rag(query, chunks_for_generation, answer)
+        if self_rag_path in ("single", "full"):
+            self_rag_info = await self._evaluate_with_self_rag(vectorstore, query, chunks_for_generation, answer, initial_chunks,
+                                                               filters=filters, refine=self_rag_path == "full")
         
         processing_time = time.time() - start_time
         
+        return self._format_result(answer, reranked_chunks, processing_time, self_rag_info, self_rag_path, signals)
+
+    async def _retrieve_and_rerank(self, vectorstore: FaissVectorStore, query: str, top_k: int, filters: Optional[SearchFilter],
+                                   query_vector: Optional[np.ndarray] = None) -> Tuple[List[Tuple[ChunkDocument, float]], List[Tuple[ChunkDocument, float]]]:
+        """Retrieved candidates (with their retrieval scores) and the reranked top_k"""
+        if query_vector is None:
+            query_vector = await self._embed_query(query)
+        initial_chunks = (await self._search(self._retrieve, vectorstore, [query], np.asarray([query_vector]), self.rerank_candidates, filters))[0]
+        return initial_chunks, await self._rerank(query, initial_chunks, top_k)
+
+    async def stream_query(self, query: str, top_k: int = 10, use_self_rag: bool = True,
+                           filters: Optional[SearchFilter] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Process a query as a stream of (event, data) pairs, so clients see progress long
+        before the whole pipeline is done:
+
+        - "chunks": the reranked chunks, as soon as reranking finishes
+        - "token": a piece of the answer, as the LLM generates it
+        - "self_rag": the Self-RAG evaluation (only when the policy runs it)
+        - "done": processing time, whether the answer cache served the query, and the Self-RAG path taken
+        """
+        # Pin the current snapshot so a concurrent rebuild cannot swap or delete it mid-query
+        filters = self._query_filters(filters)
+        with self.index_manager.acquire() as snapshot:
+            start_time = time.time()
+            query_vector = await self._embed_query(query)
+            params = self._answer_cache_params(top_k, use_self_rag, filters)
+            cached = self.answer_cache.get(query_vector, snapshot.snapshot_id, params)
+            if cached is not None:
+                yield "chunks", {"chunks": cached["chunks"]}
+                yield "token", {"text": cached["answer"]}
+                if cached["self_rag_info"] is not None:
+                    yield "self_rag", cached["self_rag_info"]
+                yield "done", {"processing_time": time.time() - start_time, "cached": True,
+                               "self_rag_path": cached["self_rag_path"], "self_rag_signals": cached["self_rag_signals"]}
+                return
+
+            initial_chunks, reranked_chunks = await self._retrieve_and_rerank(snapshot.store, query, top_k, filters, query_vector)
+            yield "chunks", {"chunks": self._format_chunks(reranked_chunks), "retrieval_time": time.time() - start_time}
+
+            chunks_for_generation = [chunk for chunk, _ in reranked_chunks]
+            pieces = []
+            async with self.llm_slots:
+                async for piece in self.generator.astream_answer(query, chunks_for_generation):
+                    pieces.append(piece)
+                    yield "token", {"text": piece}
+            answer = "".join(pieces).strip() or "No answer generated."
+
+            self_rag_path, signals = self._choose_self_rag_path(use_self_rag, initial_chunks, reranked_chunks)
+            self_rag_info = None
+            if self_rag_path in ("single", "full"):
+                self_rag_info = await self._evaluate_with_self_rag(snapshot.store, query, chunks_for_generation, answer, initial_chunks,
+                                                                   filters=filters, refine=self_rag_path == "full")
+                yield "self_rag", self_rag_info
+
+            result = self._format_result(answer, reranked_chunks, time.time() - start_time, self_rag_info, self_rag_path, signals)
+            self.answer_cache.put(query_vector, snapshot.snapshot_id, params, result)
+            yield "done", {"processing_time": result["processing_time"], "cached": False,
+                           "self_rag_path": self_rag_path, "self_rag_signals": signals}
+
+    def _retrieve(self, vectorstore: FaissVectorStore, queries: List[str], query_matrix: np.ndarray, k: int,
+                  filters: Optional[SearchFilter]) -> List[List[Tuple[ChunkDocument, float]]]:
+        """Candidate chunks for reranking: hybrid (dense + BM25) or dense-only retrieval"""
+        if self.hybrid_search:
+            return vectorstore.hybrid_search_batch(query_matrix, queries, k=k, filters=filters)
+        return vectorstore.search_batch(query_matrix, k=k, filters=filters)
+
+    def _format_chunks(self, reranked_chunks: List[Tuple[ChunkDocument, float]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "text": chunk.text,
+                "source_file": chunk.source_file,
+                "page": chunk.page,
+                "chunk_id": chunk.chunk_id,
+                "score": float(score)
+            }
+            for chunk, score in reranked_chunks
+        ]
+
+    def _format_result(self, answer: str, reranked_chunks: List[Tuple[ChunkDocument, float]], processing_time: float, self_rag_info: Optional[Dict[str, Any]],
+                       self_rag_path: str, self_rag_signals: Dict[str, Optional[float]]) -> Dict[str, Any]:
         return {
             "answer": answer,
-            "chunks": [
-                {
-                    "text": chunk.text,
-                    "source_file": chunk.source_file,
-                    "page": chunk.page,
-                    "chunk_id": chunk.chunk_id,
-                    "score": score
-                }
-                for chunk, score in reranked_chunks
-            ],
+            "chunks": self._format_chunks(reranked_chunks),
             "processing_time": processing_time,
-            "self_rag_info": self_rag_info
+            "self_rag_info": self_rag_info,
+            "self_rag_path": self_rag_path,
+            "self_rag_signals": self_rag_signals,
+            "cached": False
         }
+
+    def _choose_self_rag_path(self, use_self_rag: bool, initial_chunks: List[Tuple[ChunkDocument, float]],
+                              reranked_chunks: List[Tuple[ChunkDocument, float]]) -> Tuple[str, Dict[str, Optional[float]]]:
+        """Self-RAG path ("off" when not requested) and the retrieval signals it was chosen from, which are logged for calibration"""
+        signals = self.self_rag_policy.signals(initial_chunks, reranked_chunks)
+        return (self.self_rag_policy.choose(signals) if use_self_rag else "off"), signals
+
+    async def process_query_batch(self, queries: List[str], top_k: int = 10, use_self_rag: bool = False, filters: Optional[SearchFilter] = None) -> List[Dict[str, Any]]:
+        """
+        Process many queries together: their embeddings and cross-encoder pairs join
+        the shared micro-batches, and one FAISS search runs over the query matrix.
+        Answers are generated concurrently.
+
+        :param queries: The questions to answer.
+        :param top_k: Number of reranked chunks per query.
+        :param use_self_rag: Run Self-RAG evaluation for every query.
+        :param filters: Metadata filters applied to every query.
+        :return: One result per query, in the same format as process_query.
+        """
+        filters = self._query_filters(filters)
+        with self.index_manager.acquire() as snapshot:
+            start_time = time.time()
+            query_matrix = np.stack(await asyncio.gather(*(self._embed_query(query) for query in queries))) if queries else np.zeros((0, 0), dtype="float32")
+            params = self._answer_cache_params(top_k, use_self_rag, filters)
+            results = [self.answer_cache.get(query_vector, snapshot.snapshot_id, params) for query_vector in query_matrix]
+            for result in results:
+                if result is not None:
+                    result.update(processing_time=time.time() - start_time, cached=True)
+            missing = [i for i, result in enumerate(results) if result is None]
+            fresh = await self._process_query_batch(snapshot.store, [queries[i] for i in missing], query_matrix[missing], top_k, use_self_rag, filters)
+            for i, result in zip(missing, fresh):
+                self.answer_cache.put(query_matrix[i], snapshot.snapshot_id, params, result)
+                results[i] = result
+            return results
+
+    async def _process_query_batch(self, vectorstore: FaissVectorStore, queries: List[str], query_matrix: np.ndarray, top_k: int,
+                                   use_self_rag: bool, filters: Optional[SearchFilter]) -> List[Dict[str, Any]]:
+        start_time = time.time()
+        if not queries:
+            return []
+
+        initial_chunks = await self._search(self._retrieve, vectorstore, queries, query_matrix, self.rerank_candidates, filters)
+        reranked = await asyncio.gather(*(self._rerank(query, chunks, top_k) for query, chunks in zip(queries, initial_chunks)))
+
+        answers = await asyncio.gather(*(
+            self._generate(query, [chunk for chunk, _ in reranked_chunks])
+            for query, reranked_chunks in zip(queries, reranked)
+        ))
+
+        paths = [self._choose_self_rag_path(use_self_rag, candidates, reranked_chunks)
+                 for candidates, reranked_chunks in zip(initial_chunks, reranked)]
+
+        async def evaluate(query, reranked_chunks, answer, candidates, self_rag_path):
+            if self_rag_path not in ("single", "full"):
+                return None
+            return await self._evaluate_with_self_rag(vectorstore, query, [chunk for chunk, _ in reranked_chunks], answer, candidates,
+                                                      filters=filters, refine=self_rag_path == "full")
+
+        self_rag_infos = await asyncio.gather(*(
+            evaluate(query, reranked_chunks, answer, candidates, self_rag_path)
+            for query, reranked_chunks, answer, candidates, (self_rag_path, _) in zip(queries, reranked, answers, initial_chunks, paths)
+        ))
+        return [self._format_result(answer, reranked_chunks, time.time() - start_time, self_rag_info, self_rag_path, signals)
+                for reranked_chunks, answer, self_rag_info, (self_rag_path, signals) in zip(reranked, answers, self_rag_infos, paths)]
     
-    async def _evaluate_with_self_rag(self, query: str, chunks: List[ChunkDocument], answer: str, max_iterations: int = 2) -> Dict[str, Any]:
+    async def _evaluate_with_self_rag(self, vectorstore: FaissVectorStore, query: str, chunks: List[ChunkDocument], answer: str,
+                                      initial_chunks: List[Tuple[ChunkDocument, float]], filters: Optional[SearchFilter] = None,
+                                      refine: bool = True) -> Dict[str, Any]:
         """
-        Self-RAG evaluation: Cevabın yeterliliğini LLM ile değerlendir, gerekirse yeni sorgu üret ve döngüsel olarak cevabı iyileştir.
+        Self-RAG evaluation: Cevabın yeterliliğini değerlendir, gerekirse yeni sorgu üret ve cevabı iyileştir.
+
+        A local judge (JUDGE_STRATEGY) scores how well the answer is grounded in its chunks.
+        Confident scores decide without the LLM: above the uncertain band the answer is
+        accepted, below it only a refined query is asked for. Inside the band one LLM call
+        judges the answer and proposes a refined query. An insufficient answer is
+        regenerated once from the refined query's chunks.
+
+        With refine=False (the policy's "single" path) the answer is only judged: no
+        refined query is asked for and nothing is regenerated.
         """
+        grounding = await self._judge(query, answer, chunks) if self.judge else None
+        llm_calls = 1
+        verdict_by = "judge"
+        if grounding is None or self.judge_band[0] <= grounding.score < self.judge_band[1]:
+            sufficient, explanation, refined_query = await self._judge_and_refine_llm(query, answer, refine)
+            llm_calls += 1
+            verdict_by = "llm"
+        elif grounding.score >= self.judge_band[1]:
+            sufficient, explanation, refined_query = True, f"Grounding score {grounding.score:.2f} is above the uncertain band.", ""
+        else:
+            sufficient, explanation, refined_query = False, f"Grounding score {grounding.score:.2f} is below the uncertain band.", ""
+            if refine:
+                refined_query = await self._refine_query_llm(query, answer)
+                llm_calls += 1
+        history = [{
+            "iteration": 1,
+            "query": query,
+            "answer": answer,
+            "sufficient": sufficient,
+            "explanation": explanation,
+            "refined_query": refined_query,
+            "grounding_score": grounding.score if grounding else None
+        }]
         current_query = query
         current_answer = answer
-        history = []
-        for iteration in range(max_iterations):
-            # 1. Cevabın yeterliliğini LLM ile değerlendir
-            sufficient, explanation = await self._is_answer_sufficient_llm(current_query, current_answer)
+        if refine and not sufficient and refined_query and refined_query.strip().lower() != query.strip().lower():
+            # Yeni sorgu ile retrieval ve generation
+            current_query = refined_query
+            _, reranked_chunks = await self._retrieve_and_rerank(vectorstore, current_query, 5, filters)
+            chunks = [chunk for chunk, _ in reranked_chunks]
+            current_answer = await self._generate(current_query, chunks)
+            llm_calls += 1
+            if grounding is not None:
+                grounding = await self._judge(current_query, current_answer, chunks)  # Local, so the final answer gets a real score
             history.append({
-                "iteration": iteration + 1,
+                "iteration": 2,
                 "query": current_query,
                 "answer": current_answer,
-                "sufficient": sufficient,
-                "explanation": explanation
+                "sufficient": None,  # Not judged by the LLM again: that would be a fourth LLM call
+                "explanation": "Regenerated from the refined query.",
+                "grounding_score": grounding.score if grounding else None
             })
-            if sufficient:
-                break
-            # 2. Yeni bir sorgu üret (refine query) LLM ile
-            current_query = await self._refine_query_llm(current_query, current_answer)
-            # 3. Yeni sorgu ile retrieval ve generation
-            query_vector = self.embedder.embed([
-                ChunkDocument(text=current_query, page=0, chunk_id=0, source_file="query")
-            ])[0]
-            initial_chunks = self.vectorstore.search(query_vector, k=10)
-            reranked_chunks = self.reranker.rerank(current_query, initial_chunks, top_k=5)
-            chunks_for_generation = [chunk for chunk, _ in reranked_chunks]
-            current_answer = self.generator.generate_answer(current_query, chunks_for_generation)
+
         # --- Retrieval confidence hesaplama ---
-        # İlk retrieval skorlarının normalize edilmiş ortalaması (inner product [-1,1] -> [0,1])
-        initial_scores = [score for _, score in self.vectorstore.search(self.embedder.embed([
-            ChunkDocument(text=query, page=0, chunk_id=0, source_file="query")
-        ])[0], k=10)]
+        # İlk retrieval'ın en iyi 10 dense skorunun normalize edilmiş ortalaması (inner product [-1,1] -> [0,1]);
+        # skorlar process_query'nin kendi retrieval'ından gelir, yeniden arama yapılmaz.
+        # Keyword-only hybrid hits carry no dense score (NaN) and are left out.
+        initial_scores = sorted((float(score) for _, score in initial_chunks if not np.isnan(score)), reverse=True)[:10]
         if initial_scores:
             retrieval_confidence = float(np.mean([(s + 1) / 2 for s in initial_scores]))
         else:
             retrieval_confidence = 0.0
 
         # --- Generation confidence hesaplama ---
-        # Cohere'den likelihood desteği yoksa, cevabın belirsizliğine göre heuristik skor
+        # The local judge's grounding score of the final answer; with the LLM-only strategy,
+        # a heuristic score from the answer's uncertainty
         def is_uncertain(text):
             lower = text.lower()
             return any(kw in lower for kw in ["emin değilim", "bilinmiyor", "bilgi yok", "bulunamadı", "not sure", "unknown", "cannot answer"])
-        if is_uncertain(current_answer):
+        if grounding is not None:
+            generation_confidence = grounding.score
+        elif is_uncertain(current_answer):
             generation_confidence = 0.3
         else:
             generation_confidence = 0.85
@@ -162,6 +611,7 @@ class RAGSystem:
         final_score = (retrieval_confidence + generation_confidence) / 2
         reflection_notes = [
             f"{len(history)} iterations performed.",
+            f"{llm_calls} LLM calls.",
             f"Retrieval confidence: {retrieval_confidence:.2f}",
             f"Generation confidence: {generation_confidence:.2f}",
             f"Final answer: {current_answer[:60]}..."
@@ -171,63 +621,88 @@ class RAGSystem:
             "final_answer": current_answer,
             "iterations": len(history),
             "history": history,
+            "llm_calls": llm_calls,
             "retrieval_confidence": retrieval_confidence,
             "generation_confidence": generation_confidence,
             "final_score": final_score,
+            "judge": {
+                "strategy": self.judge_strategy,
+                "grounding_score": grounding.score if grounding else None,
+                "sentence_scores": grounding.sentence_scores if grounding else [],
+                "verdict_by": verdict_by
+            },
             "reflection_notes": reflection_notes
         }
 
-    async def _is_answer_sufficient_llm(self, query: str, answer: str) -> (bool, str):
+    async def _judge_and_refine_llm(self, query: str, answer: str, refine: bool = True) -> Tuple[bool, str, str]:
         """
-        Evaluate if the answer sufficiently addresses the query using the LLM. Ask for a yes/no and a short explanation in English.
+        Judge the answer and, if it falls short, get a refined query, in one LLM call with a JSON response. Prompt in English.
+
+        :param refine: Also ask for a refined query; when False the answer is only judged.
+        :return: (sufficient, explanation, refined query or "")
         """
-        prompt = (
-            f"Question: {query}\n"
-            f"Answer: {answer}\n"
-            "Evaluate the above answer: Does this answer fully address the question?\n"
-            "Start your response with only 'yes' or 'no', then provide a brief explanation."
-        )
-        response = self.llm.client.generate(
-            prompt=prompt,
-            model="command-r-plus",
-            max_tokens=60,
-            temperature=0.3,
-        )
-        text = response.generations[0].text.strip().lower() if response.generations else "no"
-        sufficient = text.startswith("yes")
-        explanation = text
-        return sufficient, explanation
+        if refine:
+            prompt = (
+                f"Question: {query}\n"
+                f"Answer: {answer}\n"
+                "Evaluate the above answer: does it fully address the question? If it does not, suggest a new and "
+                "improved question that would retrieve better context for a more detailed answer.\n"
+                'Respond with JSON only: {"sufficient": true or false, "explanation": "<one sentence>", '
+                '"refined_query": "<the improved question, or an empty string>"}'
+            )
+        else:
+            prompt = (
+                f"Question: {query}\n"
+                f"Answer: {answer}\n"
+                "Evaluate the above answer: does it fully address the question?\n"
+                'Respond with JSON only: {"sufficient": true or false, "explanation": "<one sentence>"}'
+            )
+        async with self.llm_slots:
+            text = await self.llm.acomplete(prompt, max_tokens=150 if refine else 80, temperature=0.3)
+        sufficient, explanation, refined_query = self._parse_judgement(text)
+        return sufficient, explanation, refined_query if refine else ""
 
     async def _refine_query_llm(self, query: str, answer: str) -> str:
         """
-        Generate a better/refined query using the LLM, based on the previous answer. Prompt in English.
+        Ask the LLM for a better retrieval query after the local judge rejected the answer. Prompt in English.
         """
         prompt = (
             f"Question: {query}\n"
             f"Answer: {answer}\n"
-            "Based on the above answer, how should I rephrase or expand the question to get a better and more detailed answer?\n"
-            "Please suggest a new and improved question. Only return the new question."
+            "The answer above is not supported well enough by the retrieved documents. Suggest a new and improved "
+            "question that would retrieve better context for a more detailed answer. Reply with the question only."
         )
-        response = self.llm.client.generate(
-            prompt=prompt,
-            model="command-r-plus",
-            max_tokens=60,
-            temperature=0.3,
-        )
-        new_query = response.generations[0].text.strip() if response.generations else query
-        return new_query
+        async with self.llm_slots:
+            text = await self.llm.acomplete(prompt, max_tokens=60, temperature=0.3)
+        return text.strip().strip('"').strip()
+
+    @staticmethod
+    def _parse_judgement(text: str) -> Tuple[bool, str, str]:
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        try:
+            data = json.loads(match.group(0)) if match else None
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            # Free-text fallback: a leading yes/no, as the model was asked before
+            return text.strip().lower().startswith("yes"), text.strip(), ""
+        sufficient = data.get("sufficient")
+        if isinstance(sufficient, str):
+            sufficient = sufficient.strip().lower() in ("true", "yes")
+        return bool(sufficient), str(data.get("explanation") or "").strip(), str(data.get("refined_query") or "").strip()
     
-    async def rebuild_index(self):
-        """Rebuild index with current PDF files"""
-        pdf_files = self._get_pdf_files()
-        # Remove all old indices before creating a new one
-        indices_dir = BACKEND_DIR / "indices"
-        if indices_dir.exists():
-            for item in indices_dir.iterdir():
-                if item.is_dir():
-                    shutil.rmtree(item)
-        if pdf_files:
-            # Clear current index
-            self.vectorstore = FaissVectorStore()
-            self._build_index(pdf_files)
-            print(f"✅ Index rebuilt with {len(pdf_files)} documents")
\ No newline at end of file
+    async def rebuild_index(self, progress: Optional[Dict[str, Any]] = None):
+        """
+        Rebuild index with current PDF files. The new snapshot is built in a worker thread
+        while queries keep being served from the current one, then swapped in atomically.
+
+        :param progress: Optional dict updated in place with ingestion progress.
+        """
+        async with self._index_lock:
+            pdf_files = self._get_pdf_files()
+            if pdf_files:
+                store, index_path = await asyncio.to_thread(self._build_index, pdf_files, progress)
+            else:
+                store, index_path = create_vector_store(), None
+            self.index_manager.publish(store, index_path)
+            print(f"✅ Index rebuilt with {len(pdf_files)} documents")
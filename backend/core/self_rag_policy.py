@@ -0,0 +1,100 @@
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from backend.models.chunk_document import ChunkDocument
+
+SELF_RAG_PATHS = ("skip", "single", "full")
+
+def default_self_rag_policy() -> str:
+    """How Self-RAG runs for queries that request it, from SELF_RAG_POLICY: "adaptive" or "full" (always the full loop)."""
+    return os.getenv("SELF_RAG_POLICY", "adaptive").lower()
+
+def default_skip_score() -> float:
+    """Top cross-encoder score at or above which Self-RAG may be skipped, from SELF_RAG_SKIP_SCORE."""
+    return float(os.getenv("SELF_RAG_SKIP_SCORE", "6.0"))
+
+def default_skip_margin() -> float:
+    """Dense top-1 vs top-k score gap also required for skipping, from SELF_RAG_SKIP_MARGIN."""
+    return float(os.getenv("SELF_RAG_SKIP_MARGIN", "0.1"))
+
+def default_full_score() -> float:
+    """Top cross-encoder score below which the full Self-RAG loop runs, from SELF_RAG_FULL_SCORE."""
+    return float(os.getenv("SELF_RAG_FULL_SCORE", "0.0"))
+
+class SelfRAGPolicy:
+    def __init__(self, adaptive: bool = None, skip_score: float = None, skip_margin: float = None,
+                 full_score: float = None, margin_k: int = 5):
+        """
+        Chooses how much Self-RAG a query gets from how well its retrieval went:
+
+        - "skip": the best chunk is a strong cross-encoder match and stands clearly above
+          the rest of the dense results, so the answer is returned without evaluation.
+        - "single": one judging pass (confidence scores, no refinement).
+        - "full": the best cross-encoder score is weak, so the answer is judged and, if
+          insufficient, regenerated from a refined query.
+
+        Thresholds are in the reranker's score units (cross-encoder logits) and dense
+        inner-product units; calibrate them on logged queries with
+        backend/scripts/calibrate_self_rag.py.
+
+        :param adaptive: Choose the path per query (defaults to SELF_RAG_POLICY); always "full" when False.
+        :param skip_score: Minimum top rerank score for skipping (defaults to SELF_RAG_SKIP_SCORE).
+        :param skip_margin: Minimum dense top-1 vs top-k gap for skipping (defaults to SELF_RAG_SKIP_MARGIN).
+        :param full_score: Top rerank score below which the full loop runs (defaults to SELF_RAG_FULL_SCORE).
+        :param margin_k: Rank compared with the top-1 dense score.
+        """
+        self.adaptive = adaptive if adaptive is not None else default_self_rag_policy() == "adaptive"
+        self.skip_score = skip_score if skip_score is not None else default_skip_score()
+        self.skip_margin = skip_margin if skip_margin is not None else default_skip_margin()
+        self.full_score = full_score if full_score is not None else default_full_score()
+        self.margin_k = margin_k
+        self._lock = threading.Lock()
+        self.path_counts = {path: 0 for path in SELF_RAG_PATHS}
+
+    def signals(self, initial_chunks: List[Tuple[ChunkDocument, float]],
+                reranked_chunks: List[Tuple[ChunkDocument, float]]) -> Dict[str, Optional[float]]:
+        """
+        Retrieval signals the path is chosen from (None when unavailable).
+
+        :param initial_chunks: Retrieved candidates with their dense scores (NaN for keyword-only hits).
+        :param reranked_chunks: Reranked chunks with their cross-encoder scores.
+        :return: rerank_top (best cross-encoder score) and dense_margin (dense top-1 minus top-k score).
+        """
+        rerank_scores = [float(score) for _, score in reranked_chunks if not math.isnan(score)]
+        dense_scores = sorted((float(score) for _, score in initial_chunks if not math.isnan(score)), reverse=True)
+        return {
+            "rerank_top": max(rerank_scores) if rerank_scores else None,
+            "dense_margin": dense_scores[0] - dense_scores[min(self.margin_k, len(dense_scores)) - 1] if dense_scores else None
+        }
+
+    def decide(self, signals: Dict[str, Optional[float]]) -> str:
+        """Path for a query's retrieval signals, without counting it."""
+        rerank_top, dense_margin = signals.get("rerank_top"), signals.get("dense_margin")
+        if not self.adaptive or rerank_top is None or rerank_top < self.full_score:
+            return "full"
+        if rerank_top >= self.skip_score and dense_margin is not None and dense_margin >= self.skip_margin:
+            return "skip"
+        return "single"
+
+    def choose(self, signals: Dict[str, Optional[float]]) -> str:
+        """
+        Path for a query's retrieval signals, counted in the policy's stats.
+
+        :param signals: The query's signals, from signals().
+        :return: "skip", "single" or "full".
+        """
+        path = self.decide(signals)
+        with self._lock:
+            self.path_counts[path] += 1
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "adaptive": self.adaptive,
+                "skip_score": self.skip_score,
+                "skip_margin": self.skip_margin,
+                "full_score": self.full_score,
+                "paths": dict(self.path_counts)
+            }
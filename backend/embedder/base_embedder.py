@@ -1,5 +1,6 @@
+import numpy as np
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 from backend.models.chunk_document import ChunkDocument
 
 class BaseEmbedder(ABC):
@@ -11,4 +12,50 @@ class BaseEmbedder(ABC):
         :param documents: List of ChunkDocument objects to be embedded.
         :return: List of vectors representing the embedded documents.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def embed_array(self, documents: List[ChunkDocument]) -> np.ndarray:
+        """
+        Embed the provided documents into a float32 matrix of shape (len(documents), dim).
+        Embedders that produce numpy arrays natively should override this to skip the list round trip.
+
+        :param documents: List of ChunkDocument objects to be embedded.
+        :return: Matrix with one vector per document.
+        """
+        return np.asarray(self.embed(documents), dtype="float32")
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed query strings in a single model call.
+
+        :param queries: Query texts.
+        :return: Float32 matrix with one vector per query.
+        """
+        return self.embed_texts(queries)
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed arbitrary strings (e.g. answer sentences) in a single model call, bypassing
+        any query or document cache.
+
+        :param texts: Texts to embed.
+        :return: Float32 matrix with one vector per text.
+        """
+        return self.embed_array([ChunkDocument(text=text, page=0, chunk_id=0, source_file="text") for text in texts])
+
+    def embed_stream(self, documents: Iterable[ChunkDocument], batch_size: int = 256) -> Iterator[Tuple[List[ChunkDocument], np.ndarray]]:
+        """
+        Embed a stream of documents in fixed-size batches.
+
+        :param documents: Iterable of ChunkDocument objects to be embedded.
+        :param batch_size: Number of documents per batch.
+        :return: Iterator over (documents, float32 matrix) batches.
+        """
+        batch = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield batch, self.embed_array(batch)
+                batch = []
+        if batch:
+            yield batch, self.embed_array(batch)
@@ -0,0 +1,44 @@
+import numpy as np
+from typing import List
+from backend.embedder.base_embedder import BaseEmbedder
+from backend.embedder.embedding_cache import EmbeddingCache
+from backend.models.chunk_document import ChunkDocument
+
+class CachedEmbedder(BaseEmbedder):
+    def __init__(self, embedder: BaseEmbedder, cache: EmbeddingCache = None):
+        """
+        Wraps an embedder with a persistent embedding cache, so only chunks whose
+        text has never been embedded by this model reach the model.
+
+        :param embedder: The embedder used for cache misses.
+        :param cache: The cache to use; defaults to the on-disk cache of the embedder's model.
+        """
+        self.embedder = embedder
+        self.cache = cache if cache is not None else EmbeddingCache(embedder.model_name)
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, documents: List[ChunkDocument]) -> List[List[float]]:
+        return self.embed_array(documents).tolist()
+
+    def embed_array(self, documents: List[ChunkDocument]) -> np.ndarray:
+        if not documents:
+            return np.zeros((0, self.cache.dim or 0), dtype="float32")
+        texts = [doc.text for doc in documents]
+        vectors, missing = self.cache.get_many(texts)
+        if missing:
+            fresh = self.embedder.embed_array([documents[i] for i in missing])
+            fresh = self.cache.put_many([texts[i] for i in missing], fresh)
+            if vectors is None:
+                vectors = np.zeros((len(texts), fresh.shape[1]), dtype="float32")
+            vectors[missing] = fresh
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return vectors
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        # Queries are not worth persisting next to document embeddings
+        return self.embedder.embed_queries(queries)
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.embed_texts(texts)
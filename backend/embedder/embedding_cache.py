@@ -0,0 +1,128 @@
+import hashlib
+import os
+import pickle
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+KEY_SIZE = hashlib.sha1().digest_size
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, cache_dir: str = None, dtype: str = "float16"):
+        """
+        Persistent, content-addressed cache of chunk embeddings.
+
+        Vectors are appended to a flat binary matrix that is memory-mapped for reads.
+        Keys are sha1(model name + chunk text) digests appended to a parallel key file,
+        so row i of the matrix belongs to the i-th key. Both files are append-only.
+
+        :param model_name: Name of the embedding model the vectors come from.
+        :param cache_dir: Base directory for the cache, one subdirectory per model.
+        :param dtype: Storage dtype of the vectors (float16 or float32).
+        """
+        if cache_dir is None:
+            cache_dir = str(BACKEND_DIR / "cache" / "embeddings")
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.cache_path = os.path.join(cache_dir, model_name.replace("/", "__"))
+        os.makedirs(self.cache_path, exist_ok=True)
+
+        self.keys_path = os.path.join(self.cache_path, "keys.bin")
+        self.vectors_path = os.path.join(self.cache_path, f"vectors.{self.dtype.name}")
+        self.meta_path = os.path.join(self.cache_path, "meta.pkl")
+
+        self.dim: Optional[int] = None
+        self.rows: Dict[bytes, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, 'rb') as f:
+            meta = pickle.load(f)
+        if meta['dtype'] != self.dtype.name:
+            print(f"⚠️ Embedding cache dtype mismatch ({meta['dtype']} != {self.dtype.name}), ignoring cache")
+            return
+        self.dim = meta['dim']
+        for path in (self.keys_path, self.vectors_path):
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+        with open(self.keys_path, 'rb') as f:
+            keys = f.read()
+        # A crash between the two appends can leave one file longer than the other
+        row_bytes = self.dim * self.dtype.itemsize
+        num_rows = min(len(keys) // KEY_SIZE, os.path.getsize(self.vectors_path) // row_bytes)
+        self.rows = {keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(num_rows)}
+        self._truncate(num_rows)
+
+    def _truncate(self, num_rows: int) -> None:
+        with open(self.keys_path, 'r+b') as f:
+            f.truncate(num_rows * KEY_SIZE)
+        with open(self.vectors_path, 'r+b') as f:
+            f.truncate(num_rows * self.dim * self.dtype.itemsize)
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).digest()
+
+    def _get_matrix(self) -> np.memmap:
+        if self._matrix is None:
+            self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(len(self.rows), self.dim))
+        return self._matrix
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get_many(self, texts: List[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Look up the embeddings of the given texts.
+
+        :param texts: Chunk texts to look up.
+        :return: Tuple of (float32 matrix with one row per text, or None if the cache is empty;
+                 positions of the texts that were not found, whose rows are left zero).
+        """
+        with self._lock:
+            if not self.rows:
+                return None, list(range(len(texts)))
+            rows = [self.rows.get(self._key(text), -1) for text in texts]
+            found = [i for i, row in enumerate(rows) if row >= 0]
+            missing = [i for i, row in enumerate(rows) if row < 0]
+            vectors = np.zeros((len(texts), self.dim), dtype="float32")
+            if found:
+                vectors[found] = self._get_matrix()[[rows[i] for i in found]]
+            return vectors, missing
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> np.ndarray:
+        """
+        Store embeddings for the given texts.
+
+        :param texts: Chunk texts the vectors belong to.
+        :param vectors: Matrix of shape (len(texts), dim).
+        :return: The vectors as they will be read back from the cache (float32, rounded to
+                 the storage dtype), so freshly embedded and cached chunks are identical.
+        """
+        vectors = np.asarray(vectors).astype(self.dtype)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, 'wb') as f:
+                    pickle.dump({'dim': self.dim, 'dtype': self.dtype.name, 'model_name': self.model_name}, f)
+            new_keys, new_rows = [], []
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                if key not in self.rows:
+                    self.rows[key] = len(self.rows)
+                    new_keys.append(key)
+                    new_rows.append(i)
+            if new_keys:
+                # Vectors first: keys without vectors are dropped by _load() after a crash
+                with open(self.vectors_path, 'ab') as f:
+                    f.write(vectors[new_rows].tobytes())
+                with open(self.keys_path, 'ab') as f:
+                    f.write(b"".join(new_keys))
+                self._matrix = None
+        return vectors.astype("float32")
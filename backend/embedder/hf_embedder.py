@@ -1,18 +1,37 @@
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from typing import List
 from backend.embedder.base_embedder import BaseEmbedder
+from backend.embedder.query_cache import QueryEmbeddingCache
 from backend.models.chunk_document import ChunkDocument
 
 class HuggingFaceEmbedder(BaseEmbedder):
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", query_cache: QueryEmbeddingCache = None):
         """
         Initializes the HuggingFaceEmbedder with a specified model.
 
         :param model_name: The name of the Hugging Face model to use for embedding.
+        :param query_cache: LRU cache for embed_queries; defaults to one sized by QUERY_CACHE_SIZE and QUERY_CACHE_TTL.
         """
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
-        
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+        # Uncased models map "What is" and "what is" to the same embedding
+        self._lowercase_queries = bool(getattr(getattr(self.model, "tokenizer", None), "do_lower_case", False))
+
     def embed(self, documents: List[ChunkDocument]) -> List[List[float]]:
         texts = [doc.text for doc in documents]
         embeddings = self.model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
-        return embeddings.tolist()
\ No newline at end of file
+        return embeddings.tolist()
+
+    def embed_array(self, documents: List[ChunkDocument]) -> np.ndarray:
+        texts = [doc.text for doc in documents]
+        return self.model.encode(texts, show_progress_bar=False, convert_to_numpy=True).astype("float32", copy=False)
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        return self.query_cache.embed(queries, self.model_name, self.embed_texts, lowercase=self._lowercase_queries)
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype="float32")
+        return self.model.encode(texts, show_progress_bar=False, convert_to_numpy=True).astype("float32", copy=False)
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+from transformers import AutoTokenizer
+from typing import List
+from backend.embedder.base_embedder import BaseEmbedder
+from backend.embedder.query_cache import QueryEmbeddingCache
+from backend.models.chunk_document import ChunkDocument
+from backend.utils.onnx_export import create_session, export_model
+
+class ONNXEmbedder(BaseEmbedder):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", quantize: bool = False,
+                 max_length: int = 256, batch_size: int = 32, normalize: bool = True, num_threads: int = None,
+                 query_cache: QueryEmbeddingCache = None):
+        """
+        Sentence-transformers embedder running on ONNX Runtime: mean pooling over the
+        token embeddings, then L2 normalization, as in all-MiniLM-L6-v2's own pipeline.
+        The model is converted (and optionally int8-quantized) on first use and cached.
+
+        :param model_name: The name of the Hugging Face model to use for embedding.
+        :param quantize: Run the dynamically int8-quantized model.
+        :param max_length: Tokens per text (the model's max_seq_length).
+        :param batch_size: Texts per inference call.
+        :param normalize: L2-normalize the embeddings.
+        :param num_threads: Intra-op threads (defaults to ONNX_THREADS).
+        :param query_cache: LRU cache for embed_queries; defaults to one sized by QUERY_CACHE_SIZE and QUERY_CACHE_TTL.
+        """
+        # int8 vectors differ slightly from float ones: keep their on-disk cache separate
+        self.model_name = f"{model_name}-int8" if quantize else model_name
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.normalize = normalize
+        model_path = export_model(model_name, "embedding", quantize=quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+        self.session = create_session(model_path, num_threads)
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.embedding_dim = int(self.session.get_outputs()[0].shape[-1])
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+        self._lowercase_queries = bool(getattr(self.tokenizer, "do_lower_case", False))
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.embedding_dim), dtype="float32")
+        # Batch texts of similar length together so little compute goes to padding
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            encoded = self.tokenizer([texts[i] for i in rows], padding=True, truncation=True,
+                                     max_length=self.max_length, return_tensors="np")
+            feeds = {name: encoded.get(name, np.zeros_like(encoded["input_ids"])).astype("int64") for name in self._input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = encoded["attention_mask"][..., None].astype("float32")
+            embeddings[rows] = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize and len(texts):
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+    def embed(self, documents: List[ChunkDocument]) -> List[List[float]]:
+        return self.embed_array(documents).tolist()
+
+    def embed_array(self, documents: List[ChunkDocument]) -> np.ndarray:
+        return self.embed_texts([doc.text for doc in documents])
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        return self.query_cache.embed(queries, self.model_name, self.embed_texts, lowercase=self._lowercase_queries)
@@ -0,0 +1,112 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+WHITESPACE = re.compile(r"\s+")
+
+def default_query_cache_size() -> int:
+    """Maximum number of cached query embeddings, from QUERY_CACHE_SIZE (0 disables the cache)."""
+    return int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+
+def default_query_cache_ttl() -> float:
+    """Seconds a cached query embedding stays valid, from QUERY_CACHE_TTL (0 means no expiry)."""
+    return float(os.getenv("QUERY_CACHE_TTL", "3600"))
+
+def normalize_query(query: str, lowercase: bool = False) -> str:
+    """Cache key text: Unicode NFKC, surrounding whitespace stripped and inner runs collapsed."""
+    text = WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip()
+    return text.lower() if lowercase else text
+
+class QueryEmbeddingCache:
+    def __init__(self, max_size: int = None, ttl_seconds: float = None):
+        """
+        In-memory LRU cache of query embeddings with an optional time-to-live.
+        Repeated and popular questions are embedded once instead of on every request.
+
+        :param max_size: Maximum number of entries (defaults to QUERY_CACHE_SIZE); the least
+                         recently used entry is evicted first.
+        :param ttl_seconds: Entry lifetime (defaults to QUERY_CACHE_TTL; 0 means no expiry).
+        """
+        self.max_size = max_size if max_size is not None else default_query_cache_size()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else default_query_cache_ttl()
+        self._entries: "OrderedDict[Hashable, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """The cached vector for a key, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        vector = np.array(vector, dtype="float32")  # Own copy, shared read-only between callers
+        vector.flags.writeable = False
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def embed(self, queries: List[str], model_name: str, encode: Callable[[List[str]], np.ndarray], lowercase: bool = False) -> np.ndarray:
+        """
+        Embed queries through the cache: only the distinct normalized queries that miss
+        reach `encode`, in a single call.
+
+        :param queries: Query texts.
+        :param model_name: Name of the model, part of every key.
+        :param encode: Embeds a list of texts into a float32 matrix.
+        :param lowercase: Normalize case too (for uncased models).
+        :return: Float32 matrix with one vector per query.
+        """
+        if not queries:
+            return encode([])
+        keys = [(model_name, normalize_query(query, lowercase)) for query in queries]
+        cached = [self.get(key) for key in keys]
+        missing = list(dict.fromkeys(key[1] for key, vector in zip(keys, cached) if vector is None))
+        fresh = {}
+        if missing:
+            for text, vector in zip(missing, encode(missing)):
+                self.put((model_name, text), vector)
+                fresh[text] = vector
+        return np.stack([vector if vector is not None else fresh[key[1]] for key, vector in zip(keys, cached)])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
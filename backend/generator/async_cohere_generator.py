@@ -0,0 +1,305 @@
+import asyncio
+import json
+import os
+import random
+import time
+import httpx
+import numpy as np
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional
+from dotenv import load_dotenv
+from backend.generator.base_generator import BaseGenerator
+from backend.models.chunk_document import ChunkDocument
+from backend.prompt.prompt_template import default_prompt_template
+from backend.utils.token_bucket import TokenBucket
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+MIN_LATENCY_SAMPLES = 20  # Successful calls observed before the hedge delay follows their p95
+
+def default_cohere_base_url() -> str:
+    """Cohere API root, from COHERE_BASE_URL (point it at a stub server for testing)."""
+    return os.getenv("COHERE_BASE_URL", "https://api.cohere.com")
+
+def default_generator_deadline() -> float:
+    """Seconds one generation may take, retries and hedges included, from GENERATOR_DEADLINE."""
+    return float(os.getenv("GENERATOR_DEADLINE", "30"))
+
+def default_generator_max_retries() -> int:
+    """Retries after a failed LLM request, from GENERATOR_MAX_RETRIES."""
+    return int(os.getenv("GENERATOR_MAX_RETRIES", "3"))
+
+def default_generator_hedge() -> bool:
+    """Send a duplicate request when the first is slower than the recent p95, from GENERATOR_HEDGE."""
+    return os.getenv("GENERATOR_HEDGE", "false").lower() in ("1", "true", "yes")
+
+def default_generator_rate_limit() -> float:
+    """LLM requests per minute the client stays under, from GENERATOR_RATE_LIMIT (0 disables limiting)."""
+    return float(os.getenv("GENERATOR_RATE_LIMIT", "500"))
+
+def default_generator_max_connections() -> int:
+    """Pooled HTTP connections to the LLM provider, from GENERATOR_MAX_CONNECTIONS."""
+    return int(os.getenv("GENERATOR_MAX_CONNECTIONS", "20"))
+
+class GeneratorError(RuntimeError):
+    """The LLM provider rejected a request or kept failing until retries ran out."""
+
+class _RetryableError(GeneratorError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AsyncCohereGenerator(BaseGenerator):
+    def __init__(self, api_key: str = None, base_url: str = None, model: str = "command-r-plus", deadline: float = None,
+                 max_retries: int = None, hedge: bool = None, hedge_delay: float = 2.0, rate_limit: float = None,
+                 burst: int = 10, max_connections: int = None, backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        """
+        Async Cohere generator over a shared, pooled HTTP connection.
+
+        Every call has a deadline covering all its attempts. Failed attempts (timeouts,
+        connection errors, 429 and 5xx) are retried with full-jitter exponential backoff,
+        honouring Retry-After. With hedging, an attempt still running after the p95 of
+        recent latencies gets a duplicate, and whichever answers first wins. A token
+        bucket keeps all requests, hedges and retries included, under the provider's rate limit.
+
+        :param api_key: Cohere API key (defaults to COHERE_API_KEY).
+        :param base_url: API root (defaults to COHERE_BASE_URL).
+        :param model: Cohere model name.
+        :param deadline: Seconds per call (defaults to GENERATOR_DEADLINE).
+        :param max_retries: Retries per call (defaults to GENERATOR_MAX_RETRIES).
+        :param hedge: Enable hedged requests (defaults to GENERATOR_HEDGE).
+        :param hedge_delay: Hedge delay until enough latencies have been observed.
+        :param rate_limit: Requests per minute (defaults to GENERATOR_RATE_LIMIT).
+        :param burst: Requests that may be sent back to back.
+        :param max_connections: Connection pool size (defaults to GENERATOR_MAX_CONNECTIONS).
+        :param backoff_base: First retry's maximum backoff in seconds; doubles per retry.
+        :param backoff_cap: Maximum backoff in seconds.
+        """
+        load_dotenv()
+        api_key = api_key or os.getenv("COHERE_API_KEY")
+        if not api_key:
+            raise ValueError("COHERE_API_KEY environment variable is not set.")
+        self.api_key = api_key
+        self.base_url = (base_url or default_cohere_base_url()).rstrip("/")
+        self.model = model
+        self.deadline = deadline if deadline is not None else default_generator_deadline()
+        self.max_retries = max_retries if max_retries is not None else default_generator_max_retries()
+        self.hedge = hedge if hedge is not None else default_generator_hedge()
+        self.initial_hedge_delay = hedge_delay
+        self.max_connections = max_connections or default_generator_max_connections()
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        rate_limit = rate_limit if rate_limit is not None else default_generator_rate_limit()
+        self.rate_limiter = TokenBucket(rate_limit / 60, burst)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._latencies: deque = deque(maxlen=500)
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def _client(self) -> httpx.AsyncClient:
+        # One pooled client, bound to the event loop that first uses it (the server's loop,
+        # closed on shutdown); its connections cannot be used or closed from another loop
+        loop = asyncio.get_running_loop()
+        if self._http is not None and self._http_loop is not loop:
+            raise RuntimeError("AsyncCohereGenerator's HTTP client belongs to another event loop; "
+                               "await aclose() on that loop before using the generator on a new one")
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}", "Accept": "application/json"},
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        retry_after = response.headers.get("Retry-After")
+        return float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None
+
+    def hedge_delay(self) -> float:
+        """Seconds before an attempt gets a hedged duplicate: p95 of recent successful latencies."""
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return self.initial_hedge_delay
+        return float(np.percentile(self._latencies, 95))
+
+    async def _attempt(self, payload: Dict[str, Any], deadline_at: float) -> Dict[str, Any]:
+        await self.rate_limiter.acquire()
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        self.attempts += 1
+        start = time.monotonic()
+        try:
+            response = await self._client().post("/v1/generate", json=payload, timeout=remaining)
+        except httpx.TimeoutException as e:
+            raise _RetryableError(f"LLM request timed out: {e!r}")
+        except httpx.TransportError as e:
+            raise _RetryableError(f"LLM request failed: {e!r}")
+        if response.status_code in RETRYABLE_STATUS:
+            raise _RetryableError(f"LLM provider returned {response.status_code}", self._retry_after(response))
+        if response.status_code >= 400:
+            raise GeneratorError(f"LLM provider returned {response.status_code}: {response.text[:200]}")
+        self._latencies.append(time.monotonic() - start)
+        return response.json()
+
+    async def _hedged_attempt(self, payload: Dict[str, Any], deadline_at: float) -> Dict[str, Any]:
+        primary = asyncio.ensure_future(self._attempt(payload, deadline_at))
+        if not self.hedge:
+            return await primary
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if not done:
+                self.hedges += 1
+                pending.add(asyncio.ensure_future(self._attempt(payload, deadline_at)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:  # Retrieve every exception, so none is reported as unhandled
+                    if task.exception() is None:
+                        winner = task
+                    else:
+                        error = task.exception()
+                if winner is not None:
+                    if winner is not primary:
+                        self.hedge_wins += 1
+                    return winner.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _backoff(self, error: _RetryableError, attempt: int, deadline_at: float) -> None:
+        # Full jitter keeps clients that failed together from retrying together
+        delay = error.retry_after if error.retry_after is not None else random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if attempt > self.max_retries or time.monotonic() + delay >= deadline_at:
+            raise GeneratorError(f"{error} (gave up after {attempt} attempts)") from error
+        self.retries += 1
+        print(f"⚠️ {error}, retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def _generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged_attempt(payload, deadline_at)
+            except _RetryableError as e:
+                attempt += 1
+                await self._backoff(e, attempt, deadline_at)
+
+    async def acomplete(self, prompt: str, max_tokens: int = 60, temperature: float = 0.3) -> str:
+        self.calls += 1
+        payload = {"prompt": prompt, "model": self.model, "max_tokens": max_tokens, "temperature": temperature}
+        try:
+            response = await asyncio.wait_for(self._generate(payload), timeout=self.deadline)
+        except GeneratorError:
+            self.failures += 1
+            raise
+        except asyncio.TimeoutError:
+            self.failures += 1
+            raise asyncio.TimeoutError(f"LLM call exceeded its {self.deadline}s deadline")
+        generations = response.get("generations") or []
+        return generations[0].get("text", "").strip() if generations else ""
+
+    async def agenerate_answer(self, question: str, context_chunks: List[ChunkDocument]) -> str:
+        # Merge chunk texts
+        context_texts = [chunk.text for chunk in context_chunks]
+        prompt = default_prompt_template.format(question=question, contexts=context_texts)
+        return await self.acomplete(prompt, max_tokens=1000, temperature=0.0) or "No answer generated."
+
+    async def astream_answer(self, question: str, context_chunks: List[ChunkDocument]) -> AsyncIterator[str]:
+        # Cohere streams newline-delimited JSON events. Failures before the first token are
+        # retried like any call; once text has been sent on, a failure ends the stream. The
+        # deadline covers the whole stream, not just each read.
+        context_texts = [chunk.text for chunk in context_chunks]
+        prompt = default_prompt_template.format(question=question, contexts=context_texts)
+        payload = {"prompt": prompt, "model": self.model, "max_tokens": 1000, "temperature": 0.0, "stream": True}
+        self.calls += 1
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        started = False
+        while True:
+            await self.rate_limiter.acquire()
+            self.attempts += 1
+            try:
+                timeout = max(deadline_at - time.monotonic(), 0.001)
+                async with self._client().stream("POST", "/v1/generate", json=payload, timeout=timeout) as response:
+                    if response.status_code in RETRYABLE_STATUS:
+                        raise _RetryableError(f"LLM provider returned {response.status_code}", self._retry_after(response))
+                    if response.status_code >= 400:
+                        await response.aread()
+                        raise GeneratorError(f"LLM provider returned {response.status_code}: {response.text[:200]}")
+                    lines = response.aiter_lines()
+                    while True:
+                        try:
+                            line = await asyncio.wait_for(lines.__anext__(), timeout=max(deadline_at - time.monotonic(), 0.001))
+                        except StopAsyncIteration:
+                            break
+                        if not line.strip():
+                            continue
+                        try:
+                            event = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            raise GeneratorError(f"LLM provider sent a malformed stream event: {line[:200]!r}") from e
+                        if event.get("is_finished"):
+                            break
+                        if event.get("text"):
+                            started = True
+                            yield event["text"]
+                return
+            except (httpx.TimeoutException, httpx.TransportError, _RetryableError) as e:
+                error = e if isinstance(e, _RetryableError) else _RetryableError(f"LLM stream failed: {e!r}")
+                if started:
+                    self.failures += 1
+                    raise GeneratorError(f"{error} after the answer had started streaming") from e
+                attempt += 1
+                try:
+                    await self._backoff(error, attempt, deadline_at)
+                except GeneratorError:
+                    self.failures += 1
+                    raise
+            except GeneratorError:
+                self.failures += 1
+                raise
+            except asyncio.TimeoutError:
+                self.failures += 1
+                raise asyncio.TimeoutError(f"LLM stream exceeded its {self.deadline}s deadline")
+
+    def generate_answer(self, question: str, context_chunks: List[ChunkDocument]) -> str:
+        # Blocking entry point for scripts; servers should await agenerate_answer
+        return asyncio.run(self._run_once(self.agenerate_answer(question, context_chunks)))
+
+    async def _run_once(self, coroutine):
+        try:
+            return await coroutine
+        finally:
+            await self.aclose()  # The client belongs to this short-lived loop
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = np.asarray(self._latencies) * 1000
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "latency_p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "latency_p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else None,
+            "hedge_delay_ms": self.hedge_delay() * 1000 if self.hedge else None,
+            "rate_limit_waits": self.rate_limiter.waits,
+            "rate_limit_wait_seconds": self.rate_limiter.wait_seconds,
+        }
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, AsyncIterator, Dict, List
 from backend.models.chunk_document import ChunkDocument
 
 class BaseGenerator(ABC):
@@ -12,4 +13,37 @@ class BaseGenerator(ABC):
         :param context_chunks: List of ChunkDocument objects providing context for the answer.
         :return: A string containing the generated answer.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def agenerate_answer(self, question: str, context_chunks: List[ChunkDocument]) -> str:
+        """
+        Async version of generate_answer. Generators with a native async client override
+        it; by default the blocking call runs in a worker thread, off the event loop.
+        """
+        return await asyncio.to_thread(self.generate_answer, question, context_chunks)
+
+    async def astream_answer(self, question: str, context_chunks: List[ChunkDocument]) -> AsyncIterator[str]:
+        """
+        Stream the answer as text pieces while it is generated. Generators without a
+        streaming API yield the whole answer at once.
+        """
+        yield await self.agenerate_answer(question, context_chunks)
+
+    @abstractmethod
+    async def acomplete(self, prompt: str, max_tokens: int = 60, temperature: float = 0.3) -> str:
+        """
+        Raw completion for a prompt (used for Self-RAG judging and query refinement).
+
+        :param prompt: The full prompt.
+        :param max_tokens: Maximum tokens to generate.
+        :param temperature: Sampling temperature.
+        :return: The generated text, stripped ("" when nothing was generated).
+        """
+        pass
+
+    async def aclose(self) -> None:
+        """Release the generator's connections (nothing to release by default)."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters for the status endpoint (none by default)."""
+        return {}
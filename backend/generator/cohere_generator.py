@@ -1,3 +1,4 @@
+import asyncio
 import cohere
 import os
 from typing import List
@@ -32,4 +33,18 @@ class CohereGenerator(BaseGenerator):
             temperature=0.0,
         )
         
-        return response.generations[0].text.strip() if response.generations else "No answer generated."
\ No newline at end of file
+        return response.generations[0].text.strip() if response.generations else "No answer generated."
+
+    def complete(self, prompt: str, max_tokens: int = 60, temperature: float = 0.3) -> str:
+        response = self.client.generate(
+            prompt=prompt,
+            model="command-r-plus",
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
+        return response.generations[0].text.strip() if response.generations else ""
+
+    async def acomplete(self, prompt: str, max_tokens: int = 60, temperature: float = 0.3) -> str:
+        # The blocking client runs in a worker thread, off the event loop
+        return await asyncio.to_thread(self.complete, prompt, max_tokens, temperature)
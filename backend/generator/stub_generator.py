@@ -0,0 +1,59 @@
+import asyncio
+import os
+import re
+from typing import Any, AsyncIterator, Dict, List
+from backend.generator.base_generator import BaseGenerator
+from backend.models.chunk_document import ChunkDocument
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def default_stub_token_delay_ms() -> float:
+    """Delay between streamed words of the stub generator, from STUB_TOKEN_DELAY_MS."""
+    return float(os.getenv("STUB_TOKEN_DELAY_MS", "20"))
+
+class StubGenerator(BaseGenerator):
+    def __init__(self, token_delay_ms: float = None, max_words: int = 60):
+        """
+        Offline generator for development and testing: answers with the opening
+        sentences of the best context chunk, streamed word by word like an LLM would,
+        and accepts every answer when judging. Needs no API key or network access.
+
+        :param token_delay_ms: Delay between streamed words (defaults to STUB_TOKEN_DELAY_MS).
+        :param max_words: Length limit of an answer.
+        """
+        self.token_delay = (token_delay_ms if token_delay_ms is not None else default_stub_token_delay_ms()) / 1000
+        self.max_words = max_words
+        self.calls = 0
+
+    def generate_answer(self, question: str, context_chunks: List[ChunkDocument]) -> str:
+        self.calls += 1
+        if not context_chunks:
+            return "No relevant information was found in the documents."
+        best = context_chunks[0]
+        words = []
+        for sentence in SENTENCE_END.split(best.text.strip()):
+            words.extend(sentence.split())
+            if len(words) >= self.max_words:
+                break
+        return f"According to {best.source_file} (page {best.page}): {' '.join(words[:self.max_words])}"
+
+    async def agenerate_answer(self, question: str, context_chunks: List[ChunkDocument]) -> str:
+        answer = self.generate_answer(question, context_chunks)
+        await asyncio.sleep(self.token_delay * len(answer.split(" ")))  # As long as streaming the answer takes
+        return answer
+
+    async def astream_answer(self, question: str, context_chunks: List[ChunkDocument]) -> AsyncIterator[str]:
+        for i, word in enumerate(self.generate_answer(question, context_chunks).split(" ")):
+            await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+    async def acomplete(self, prompt: str, max_tokens: int = 60, temperature: float = 0.3) -> str:
+        self.calls += 1
+        if '"sufficient"' in prompt:
+            return '{"sufficient": true, "explanation": "The stub generator accepts every answer.", "refined_query": ""}'
+        # Anything else (query refinement) gets the original question back
+        match = re.search(r"^Question: (.*)$", prompt, re.MULTILINE)
+        return match.group(1).strip() if match else ""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "stub", "calls": self.calls}
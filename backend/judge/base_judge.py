@@ -0,0 +1,46 @@
+import re
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+from backend.models.chunk_document import ChunkDocument
+from backend.models.grounding_score import GroundingScore
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+MIN_SENTENCE_WORDS = 3  # Shorter fragments ("Yes.", list markers) carry no claim to check
+
+def split_sentences(text: str) -> List[str]:
+    """Split an answer into the sentences whose support is checked; the whole text if none is long enough."""
+    sentences = [s.strip() for s in SENTENCE_END.split(text) if len(s.split()) >= MIN_SENTENCE_WORDS]
+    return sentences or ([text.strip()] if text.strip() else [])
+
+class BaseJudge(ABC):
+    name = "base"
+    # Scores inside this band are too close to call locally and go to the LLM judge
+    uncertain_low = 0.4
+    uncertain_high = 0.7
+
+    @abstractmethod
+    def score_batch(self, requests: List[Tuple[str, str, List[ChunkDocument]]]) -> List[GroundingScore]:
+        """
+        Score how well each answer is supported by its context chunks and addresses its question.
+
+        :param requests: (question, answer, context chunks) tuples.
+        :return: One GroundingScore per request, in order.
+        """
+        pass
+
+    def score(self, question: str, answer: str, context_chunks: List[ChunkDocument]) -> GroundingScore:
+        """
+        Score a single answer.
+
+        :param question: The user's question.
+        :param answer: The generated answer.
+        :param context_chunks: The chunks the answer was generated from.
+        :return: The answer's GroundingScore.
+        """
+        return self.score_batch([(question, answer, context_chunks)])[0]
+
+    @staticmethod
+    def combine(sentence_scores: List[float], relevance: float, relevance_weight: float) -> float:
+        """Blend the mean sentence support with the answer's relevance to the question, clipped to [0, 1]."""
+        support = sum(sentence_scores) / len(sentence_scores) if sentence_scores else 0.0
+        return min(1.0, max(0.0, (1 - relevance_weight) * support + relevance_weight * relevance))
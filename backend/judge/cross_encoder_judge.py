@@ -0,0 +1,50 @@
+import numpy as np
+from typing import Any, List, Tuple
+from backend.judge.base_judge import BaseJudge, split_sentences
+from backend.models.chunk_document import ChunkDocument
+from backend.models.grounding_score import GroundingScore
+
+class CrossEncoderJudge(BaseJudge):
+    name = "cross-encoder"
+    uncertain_low = 0.2
+    uncertain_high = 0.7
+
+    def __init__(self, model: Any, relevance_weight: float = 0.3, batch_size: int = 32):
+        """
+        Grounding judge on the reranker's cross-encoder: each answer sentence is scored
+        against every context chunk and supported by its best one, and the answer is
+        scored against the question. Logits are squashed to [0, 1] with a sigmoid. More
+        accurate than EmbeddingJudge, at the cost of one forward pass per pair.
+
+        :param model: Scoring model with CrossEncoder's predict(pairs, batch_size) interface,
+                      e.g. the reranker's already-loaded model.
+        :param relevance_weight: Share of question-answer relevance in the score (the rest is sentence support).
+        :param batch_size: Pairs per forward pass.
+        """
+        self.model = model
+        self.relevance_weight = relevance_weight
+        self.batch_size = batch_size
+
+    def score_batch(self, requests: List[Tuple[str, str, List[ChunkDocument]]]) -> List[GroundingScore]:
+        if not requests:
+            return []
+        sentence_lists = [split_sentences(answer) for _, answer, _ in requests]
+        # All pairs of the batch in one predict call: (question, answer) first, then (sentence, chunk)
+        pairs = [(question, answer) for question, answer, _ in requests]
+        for sentences, (_, _, context) in zip(sentence_lists, requests):
+            pairs.extend((sentence, chunk.text) for sentence in sentences for chunk in context)
+        logits = np.asarray(self.model.predict(pairs, batch_size=self.batch_size), dtype="float32").reshape(-1)
+        scores = 1 / (1 + np.exp(-logits))
+
+        results = []
+        offset = len(requests)
+        for i, (sentences, (_, _, context)) in enumerate(zip(sentence_lists, requests)):
+            relevance = float(scores[i])
+            sentence_scores = [0.0] * len(sentences)
+            if sentences and context:
+                block = scores[offset:offset + len(sentences) * len(context)].reshape(len(sentences), len(context))
+                sentence_scores = block.max(axis=1).astype(float).tolist()
+                offset += len(sentences) * len(context)
+            results.append(GroundingScore(score=self.combine(sentence_scores, relevance, self.relevance_weight),
+                                          sentence_scores=sentence_scores, relevance=relevance, method=self.name))
+        return results
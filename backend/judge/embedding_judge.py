@@ -0,0 +1,57 @@
+import numpy as np
+from typing import List, Tuple
+from backend.embedder.base_embedder import BaseEmbedder
+from backend.judge.base_judge import BaseJudge, split_sentences
+from backend.models.chunk_document import ChunkDocument
+from backend.models.grounding_score import GroundingScore
+
+class EmbeddingJudge(BaseJudge):
+    name = "embedding"
+    uncertain_low = 0.35
+    uncertain_high = 0.6
+
+    def __init__(self, embedder: BaseEmbedder, relevance_weight: float = 0.3):
+        """
+        Grounding judge from embedding similarity: each answer sentence is supported by
+        its most similar context chunk (cosine), and the answer's relevance is its cosine
+        to the question. All sentences, questions and answers of a batch are embedded in
+        one model call; chunk vectors come from the embedder's cache when it has one.
+
+        :param embedder: Embedder for sentences and chunks, e.g. the CachedEmbedder of the ingest path.
+        :param relevance_weight: Share of question-answer relevance in the score (the rest is sentence support).
+        """
+        self.embedder = embedder
+        self.relevance_weight = relevance_weight
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def score_batch(self, requests: List[Tuple[str, str, List[ChunkDocument]]]) -> List[GroundingScore]:
+        if not requests:
+            return []
+        sentence_lists = [split_sentences(answer) for _, answer, _ in requests]
+        texts = [question for question, _, _ in requests] + [answer for _, answer, _ in requests]
+        texts += [sentence for sentences in sentence_lists for sentence in sentences]
+        vectors = self._normalize(self.embedder.embed_texts(texts))
+        chunks = [chunk for _, _, context in requests for chunk in context]
+        chunk_vectors = self._normalize(self.embedder.embed_array(chunks)) if chunks else None
+
+        results = []
+        n = len(requests)
+        sentence_offset, chunk_offset = 2 * n, 0
+        for i, (sentences, (_, _, context)) in enumerate(zip(sentence_lists, requests)):
+            # Negative cosines are clipped to 0: unrelated text scores near 0 instead of 0.5
+            relevance = max(0.0, float(vectors[i] @ vectors[n + i]))
+            sentence_scores = [0.0] * len(sentences)
+            if sentences and context:
+                sentence_matrix = vectors[sentence_offset:sentence_offset + len(sentences)]
+                chunk_matrix = chunk_vectors[chunk_offset:chunk_offset + len(context)]
+                support = (sentence_matrix @ chunk_matrix.T).max(axis=1)
+                sentence_scores = np.clip(support, 0.0, 1.0).astype(float).tolist()
+            sentence_offset += len(sentences)
+            chunk_offset += len(context)
+            results.append(GroundingScore(score=self.combine(sentence_scores, relevance, self.relevance_weight),
+                                          sentence_scores=sentence_scores, relevance=relevance, method=self.name))
+        return results
@@ -12,11 +12,13 @@ from backend.reader.pdf_reader import PDFReader
 # from backend.chunker.semantic_preserving_chunker import SemanticPreservingChunker
 from backend.chunker.structure_aware_chunker import StructureAwareChunker
 from backend.embedder.hf_embedder import HuggingFaceEmbedder
+from backend.embedder.cached_embedder import CachedEmbedder
 from backend.vectorstore.faiss_store import FaissVectorStore
 from backend.generator.cohere_generator import CohereGenerator
 from backend.reranker.hf_reranker import HuggingFaceReranker
 from backend.models.chunk_document import ChunkDocument
 from backend.utils.index_manager import IndexManager
+from backend.core.ingestion import IngestionPipeline
 
 def build_index(pdf_paths: list[str], force_rebuild: bool = False) -> tuple[FaissVectorStore, HuggingFaceEmbedder, CohereGenerator, HuggingFaceReranker]:
     # Initialize components
@@ -29,10 +31,10 @@ def build_index(pdf_paths: list[str], force_rebuild: bool = False) -> tuple[Fais
     
     # Initialize index manager
     index_manager = IndexManager()
-    index_path = index_manager.get_index_path(pdf_paths)
+    index_path = index_manager.find_snapshot_path(pdf_paths)
     
     # Check if we can load existing index
-    if not force_rebuild and vectorstore.exists(index_path):
+    if not force_rebuild and index_path and vectorstore.exists(index_path):
         print(f"🔍 Found existing index at: {index_path}")
         if vectorstore.load(index_path):
             print("✅ Successfully loaded existing index!")
@@ -42,21 +44,19 @@ def build_index(pdf_paths: list[str], force_rebuild: bool = False) -> tuple[Fais
     
     # Build new index
     print("🔧 Building new index...")
-    
-    for path in pdf_paths:
-        print(f"\n📄 Processing: {path}")
-        source_file = os.path.basename(path)
-        pages = reader.read(path)
-        chunk_docs = chunker.chunk(pages, source_file)
-        embeddings = embedder.embed(chunk_docs)
-        vectorstore.add(embeddings, chunk_docs)
+    document_embedder = CachedEmbedder(embedder)
+    ingestion = IngestionPipeline(reader, chunker, document_embedder)
+    ingestion.run(pdf_paths, vectorstore)
+    vectorstore.optimize()
+    print(f"♻️ Embedding cache: {document_embedder.hits} hits, {document_embedder.misses} misses")
 
     # Save the new index
+    index_path = index_manager.new_snapshot_path(pdf_paths)
     print(f"\n💾 Saving index to: {index_path}")
     vectorstore.save(index_path)
     
-    # Cleanup old indices
-    index_manager.cleanup_old_indices(keep_latest=3)
+    # Publish it; older snapshots are garbage-collected
+    index_manager.publish(vectorstore, index_path)
 
     return vectorstore, embedder, generator, reranker
 
@@ -72,8 +72,8 @@ def interactive_qa(vectorstore: FaissVectorStore, embedder: HuggingFaceEmbedder,
             ChunkDocument(text=question, page=0, chunk_id=0, source_file="query")
         ])[0]
 
-        # Get initial candidates (more than final k)
-        initial_chunks = vectorstore.search(query_vector, k=10)
+        # Get initial candidates (more than final k): dense and keyword results, fused
+        initial_chunks = vectorstore.hybrid_search(query_vector, question, k=10)
         
         # Rerank the results
         reranked_chunks = reranker.rerank(question, initial_chunks, top_k=5)
@@ -5,4 +5,5 @@ class ChunkDocument:
     text: str                 # The actual chunk content
     page: int                 # Page number in the source document
     chunk_id: int             # Position within the document
-    source_file: str          # File name or path for multi-doc support
\ No newline at end of file
+    source_file: str          # File name or path for multi-doc support
+    global_id: int = -1       # Stable store-wide ID assigned by the vector store
@@ -0,0 +1,9 @@
+from dataclasses import dataclass, field
+from typing import List
+
+@dataclass
+class GroundingScore:
+    score: float                                               # Overall support of the answer in [0, 1]
+    sentence_scores: List[float] = field(default_factory=list)  # Support of each answer sentence by its best chunk
+    relevance: float = 0.0                                     # How well the answer addresses the question, in [0, 1]
+    method: str = ""                                           # Judge that produced the score
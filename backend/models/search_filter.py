@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+@dataclass
+class SearchFilter:
+    source_files: Optional[List[str]] = None   # Only chunks of these files
+    page_min: Optional[int] = None             # Inclusive page range
+    page_max: Optional[int] = None
+    uploaded_after: Optional[float] = None     # Inclusive upload time range (Unix timestamps)
+    uploaded_before: Optional[float] = None
+    exclude_source_files: Optional[List[str]] = None  # Never chunks of these files
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in (self.source_files, self.page_min, self.page_max, self.uploaded_after, self.uploaded_before,
+                                               self.exclude_source_files))
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 class BaseReader(ABC):
     @abstractmethod
@@ -11,4 +11,14 @@ class BaseReader(ABC):
         :param file_path: Path to the file to be read.
         :return: List of tuples with page number and text content.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def iter_pages(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Stream the (page_number, text_content) tuples of a file one page at a time.
+        Readers that can avoid materializing the whole document should override this.
+
+        :param file_path: Path to the file to be read.
+        :return: Iterator over tuples with page number and text content.
+        """
+        yield from self.read(file_path)
@@ -1,12 +1,12 @@
 import fitz # PyMuPDF
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 from backend.reader.base_reader import BaseReader
 
 class PDFReader(BaseReader):
     def read(self, file_path: str) -> List[Tuple[int, str]]:
-        doc = fitz.open(file_path)
-        pages = []
-        for page_num, page in enumerate(doc, start=1):
-            text = page.get_text()
-            pages.append((page_num, text))
-        return pages
\ No newline at end of file
+        return list(self.iter_pages(file_path))
+
+    def iter_pages(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        with fitz.open(file_path) as doc:
+            for page_num, page in enumerate(doc, start=1):
+                yield page_num, page.get_text()
@@ -13,4 +13,16 @@ class BaseReranker(ABC):
         :param top_k: Number of top results to return after reranking.
         :return: Reranked list of tuples containing (ChunkDocument, rerank_score).
         """
-        pass
\ No newline at end of file
+        pass
+
+    def rerank_batch(self, queries: List[str], chunk_lists: List[List[Tuple[ChunkDocument, float]]], top_k: int = 5) -> List[List[Tuple[ChunkDocument, float]]]:
+        """
+        Rerank the candidates of several queries. Rerankers that can score all
+        query-chunk pairs in one model call should override this.
+
+        :param queries: The search query strings.
+        :param chunk_lists: One list of (ChunkDocument, similarity_score) tuples per query.
+        :param top_k: Number of top results to return per query.
+        :return: One reranked list of (ChunkDocument, rerank_score) tuples per query.
+        """
+        return [self.rerank(query, chunks, top_k=top_k) for query, chunks in zip(queries, chunk_lists)]
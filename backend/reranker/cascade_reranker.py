@@ -0,0 +1,130 @@
+import hashlib
+import math
+import os
+import threading
+import zlib
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from backend.models.chunk_document import ChunkDocument
+from backend.reranker.hf_reranker import HuggingFaceReranker
+
+CHARS_PER_TOKEN = 4  # Rough length of a token, for sorting pairs by length before tokenization
+
+def default_rerank_max_length() -> int:
+    """Tokens per query-chunk pair fed to the cross-encoder, from RERANK_MAX_LENGTH."""
+    return int(os.getenv("RERANK_MAX_LENGTH", "256"))
+
+def default_rerank_margin() -> float:
+    """Dense-score gap to the best candidate beyond which candidates are skipped, from RERANK_MARGIN (0 disables)."""
+    return float(os.getenv("RERANK_MARGIN", "0.2"))
+
+def default_rerank_cache_size() -> int:
+    """Cached (query, chunk) scores, from RERANK_CACHE_SIZE (0 disables the cache)."""
+    return int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+
+class CascadeReranker(HuggingFaceReranker):
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", max_length: int = None,
+                 batch_size: int = 16, margin: float = None, min_candidates: int = 10, cache_size: int = None,
+                 model: Any = None):
+        """
+        Cross-encoder reranker that avoids scoring pairs it does not need to:
+
+        1. Candidates whose dense score is more than `margin` below the best candidate's
+           are dropped without being scored, except for the first `min_candidates` in
+           retrieval order. Candidates without a dense score (NaN, e.g. keyword-only
+           hybrid hits) are always scored.
+        2. Pairs are scored in micro-batches of similar length, truncated to `max_length`
+           tokens, so little compute goes to padding.
+        3. Scores are cached per (query hash, global chunk ID), so repeated and refined
+           queries do not re-score the same pairs.
+
+        :param model_name: Cross-encoder model name from HuggingFace.
+        :param max_length: Tokens per pair (defaults to RERANK_MAX_LENGTH).
+        :param batch_size: Pairs per cross-encoder forward pass.
+        :param margin: Dense-score margin (defaults to RERANK_MARGIN; 0 disables skipping).
+        :param min_candidates: Leading candidates that are always scored (at least top_k).
+        :param cache_size: Maximum cached scores (defaults to RERANK_CACHE_SIZE).
+        :param model: Scoring model with CrossEncoder's interface (a CrossEncoder is loaded when None).
+        """
+        super().__init__(model_name, max_length=max_length or default_rerank_max_length(), model=model)
+        self.max_length = max_length or default_rerank_max_length()
+        self.batch_size = batch_size
+        self.margin = margin if margin is not None else default_rerank_margin()
+        self.min_candidates = min_candidates
+        self.cache_size = cache_size if cache_size is not None else default_rerank_cache_size()
+        self._cache: "OrderedDict[Tuple[bytes, int], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pairs_scored = 0
+        self.pairs_cached = 0
+        self.pairs_skipped = 0
+
+    def _query_key(self, query: str) -> bytes:
+        return hashlib.sha1(f"{self.model_name}\n{query}".encode("utf-8")).digest()
+
+    def _select(self, chunks: List[Tuple[ChunkDocument, float]], top_k: int) -> List[ChunkDocument]:
+        # Drop candidates far below the best dense score without scoring them
+        dense_scores = [score for _, score in chunks if not math.isnan(score)]
+        if self.margin <= 0 or not dense_scores:
+            return [chunk for chunk, _ in chunks]
+        cutoff = max(dense_scores) - self.margin
+        keep_first = max(self.min_candidates, top_k)
+        selected = [chunk for position, (chunk, score) in enumerate(chunks)
+                    if position < keep_first or math.isnan(score) or score >= cutoff]
+        self.pairs_skipped += len(chunks) - len(selected)
+        return selected
+
+    def _score(self, pairs: List[Tuple[bytes, str, ChunkDocument]]) -> List[float]:
+        # Look pairs up in the score cache; the text checksum guards against
+        # global IDs being reused by a rebuilt index
+        scores: List[Optional[float]] = [None] * len(pairs)
+        with self._lock:
+            for i, (query_key, _, chunk) in enumerate(pairs):
+                entry = self._cache.get((query_key, chunk.global_id))
+                if entry is not None and entry[0] == zlib.crc32(chunk.text.encode("utf-8")):
+                    self._cache.move_to_end((query_key, chunk.global_id))
+                    scores[i] = entry[1]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        self.pairs_cached += len(pairs) - len(missing)
+        if missing:
+            # One predict call over length-sorted pairs, so each micro-batch pads little
+            order = sorted(missing, key=lambda i: min(len(pairs[i][2].text), self.max_length * CHARS_PER_TOKEN))
+            fresh = self.model.predict([(pairs[i][1], pairs[i][2].text) for i in order], batch_size=self.batch_size)
+            self.pairs_scored += len(order)
+            with self._lock:
+                for i, score in zip(order, np.asarray(fresh, dtype="float32").tolist()):
+                    scores[i] = score
+                    if self.cache_size > 0:
+                        query_key, _, chunk = pairs[i]
+                        self._cache[(query_key, chunk.global_id)] = (zlib.crc32(chunk.text.encode("utf-8")), score)
+                        self._cache.move_to_end((query_key, chunk.global_id))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores
+
+    def rerank(self, query: str, chunks: List[Tuple[ChunkDocument, float]], top_k: int = 5) -> List[Tuple[ChunkDocument, float]]:
+        return self.rerank_batch([query], [chunks], top_k=top_k)[0]
+
+    def rerank_batch(self, queries: List[str], chunk_lists: List[List[Tuple[ChunkDocument, float]]], top_k: int = 5) -> List[List[Tuple[ChunkDocument, float]]]:
+        selected = [self._select(chunks, top_k) for chunks in chunk_lists]
+        pairs = [(self._query_key(query), query, chunk) for query, chunks in zip(queries, selected) for chunk in chunks]
+        scores = self._score(pairs)
+
+        results = []
+        offset = 0
+        for chunks in selected:
+            scored_chunks = list(zip(chunks, scores[offset:offset + len(chunks)]))
+            scored_chunks.sort(key=lambda x: x[1], reverse=True)
+            results.append(scored_chunks[:top_k])
+            offset += len(chunks)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.pairs_scored + self.pairs_cached + self.pairs_skipped
+        return {
+            "pairs_scored": self.pairs_scored,
+            "pairs_cached": self.pairs_cached,
+            "pairs_skipped": self.pairs_skipped,
+            "scored_fraction": self.pairs_scored / total if total else 0.0,
+            "cache_size": len(self._cache),
+        }
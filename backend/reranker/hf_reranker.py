@@ -1,16 +1,20 @@
 from sentence_transformers import CrossEncoder
-from typing import List, Tuple
+from typing import Any, List, Tuple
 from backend.reranker.base_reranker import BaseReranker
 from backend.models.chunk_document import ChunkDocument
 
 class HuggingFaceReranker(BaseReranker):
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", max_length: int = None, model: Any = None):
         """
         Initialize HuggingFace cross-encoder reranker.
         
         :param model_name: Cross-encoder model name from HuggingFace.
+        :param max_length: Truncate query-chunk pairs to this many tokens (model default when None).
+        :param model: Scoring model with CrossEncoder's predict(pairs, batch_size) interface,
+                      e.g. an ONNXCrossEncoder; a CrossEncoder is loaded when None.
         """
-        self.model = CrossEncoder(model_name)
+        self.model_name = model_name
+        self.model = model if model is not None else CrossEncoder(model_name, max_length=max_length)
     
     def rerank(self, query: str, chunks: List[Tuple[ChunkDocument, float]], top_k: int = 5) -> List[Tuple[ChunkDocument, float]]:
         if not chunks:
@@ -27,4 +31,18 @@ class HuggingFaceReranker(BaseReranker):
         scored_chunks.sort(key=lambda x: x[1], reverse=True)
         
         # Return top_k results
-        return scored_chunks[:top_k]
\ No newline at end of file
+        return scored_chunks[:top_k]
+
+    def rerank_batch(self, queries: List[str], chunk_lists: List[List[Tuple[ChunkDocument, float]]], top_k: int = 5) -> List[List[Tuple[ChunkDocument, float]]]:
+        # Score the pairs of all queries in one predict call, then split them back per query
+        query_doc_pairs = [(query, chunk.text) for query, chunks in zip(queries, chunk_lists) for chunk, _ in chunks]
+        scores = self.model.predict(query_doc_pairs) if query_doc_pairs else []
+
+        results = []
+        offset = 0
+        for chunks in chunk_lists:
+            scored_chunks = list(zip([chunk for chunk, _ in chunks], scores[offset:offset + len(chunks)]))
+            scored_chunks.sort(key=lambda x: x[1], reverse=True)
+            results.append(scored_chunks[:top_k])
+            offset += len(chunks)
+        return results
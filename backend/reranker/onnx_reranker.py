@@ -0,0 +1,64 @@
+import os
+import numpy as np
+from transformers import AutoTokenizer
+from typing import List, Tuple
+from backend.reranker.hf_reranker import HuggingFaceReranker
+from backend.utils.onnx_export import create_session, export_model, load_model_config
+
+class ONNXCrossEncoder:
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", quantize: bool = False,
+                 max_length: int = None, num_threads: int = None):
+        """
+        Cross-encoder running on ONNX Runtime, with the predict() interface of
+        sentence-transformers' CrossEncoder so the rerankers can use either.
+
+        :param model_name: Cross-encoder model name from HuggingFace.
+        :param quantize: Run the dynamically int8-quantized model.
+        :param max_length: Tokens per query-chunk pair (tokenizer default when None).
+        :param num_threads: Intra-op threads (defaults to ONNX_THREADS).
+        """
+        model_path = export_model(model_name, "cross-encoder", quantize=quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+        self.max_length = max_length or min(self.tokenizer.model_max_length, 512)
+        self.session = create_session(model_path, num_threads)
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+        # Same output activation as CrossEncoder: sigmoid for single-label models unless the config overrides it
+        config = load_model_config(model_path)
+        activation = config.get("sbert_ce_default_activation_function") or ""
+        self._sigmoid = config.get("num_labels", len(config.get("id2label", {0: None}))) == 1 and not activation.endswith("Identity")
+
+    def predict(self, sentences: List[Tuple[str, str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """
+        Relevance scores of (query, passage) pairs.
+
+        :param sentences: Query-passage pairs.
+        :param batch_size: Pairs per inference call.
+        :return: One score per pair (a row of label scores for multi-label models).
+        """
+        if not sentences:
+            return np.zeros(0, dtype="float32")
+        logits = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            encoded = self.tokenizer([query for query, _ in batch], [passage for _, passage in batch], padding=True,
+                                     truncation="longest_first", max_length=self.max_length, return_tensors="np")
+            feeds = {name: encoded.get(name, np.zeros_like(encoded["input_ids"])).astype("int64") for name in self._input_names}
+            logits.append(self.session.run(None, feeds)[0])
+        scores = np.concatenate(logits).astype("float32")
+        if self._sigmoid:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        return scores[:, 0] if scores.shape[1] == 1 else scores
+
+class ONNXReranker(HuggingFaceReranker):
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", quantize: bool = False,
+                 max_length: int = None, num_threads: int = None):
+        """
+        HuggingFace cross-encoder reranker running on ONNX Runtime.
+
+        :param model_name: Cross-encoder model name from HuggingFace.
+        :param quantize: Run the dynamically int8-quantized model.
+        :param max_length: Truncate query-chunk pairs to this many tokens.
+        :param num_threads: Intra-op threads (defaults to ONNX_THREADS).
+        """
+        super().__init__(model_name, max_length=max_length,
+                         model=ONNXCrossEncoder(model_name, quantize=quantize, max_length=max_length, num_threads=num_threads))
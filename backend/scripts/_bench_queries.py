@@ -0,0 +1,12 @@
+# Questions shared by the benchmark scripts: four about the constitution, four about the
+# METU undergraduate regulations, matching the PDFs in backend/data
+QUESTIONS = [
+    "What are the duties of the President of the Republic?",
+    "How are members of the Grand National Assembly elected?",
+    "What does Article 10 say about equality before the law?",
+    "What is the minimum cumulative GPA required to graduate?",
+    "How many times can a student repeat a course?",
+    "What happens if a student fails to register for a semester?",
+    "Can a student withdraw from a course after the add-drop period?",
+    "What are the conditions for a double major program?",
+]
@@ -0,0 +1,133 @@
+import sys
+import os
+import time
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.reader.pdf_reader import PDFReader
+from backend.chunker.structure_aware_chunker import StructureAwareChunker
+from backend.chunker.semantic_preserving_chunker import SemanticPreservingChunker
+from backend.chunker.recursive_chunker import RecursiveChunker
+
+# --- Previous implementations: re-encode the whole candidate string on every step ---
+
+class LegacyPackingMixin:
+    def _legacy_combine_blocks(self, blocks):
+        chunks = []
+        current = ""
+        for block in blocks:
+            candidate = f"{current}\n\n{block}".strip() if current else block
+            token_count = len(self.tokenizer.encode(candidate, add_special_tokens=False))
+            if token_count <= self.max_tokens:
+                current = candidate
+            else:
+                if current:
+                    chunks.append(current.strip())
+                block_tokens = len(self.tokenizer.encode(block, add_special_tokens=False))
+                if block_tokens > self.max_tokens:
+                    chunks.extend(self._hard_split(block))
+                    current = ""
+                else:
+                    current = block
+        if current:
+            chunks.append(current.strip())
+        return chunks
+
+    def _hard_split(self, text):
+        words = text.split(" ")
+        chunks = []
+        current = ""
+        for word in words:
+            candidate = f"{current} {word}".strip()
+            if len(self.tokenizer.encode(candidate, add_special_tokens=False)) > self.max_tokens:
+                if current:
+                    chunks.append(current.strip())
+                current = word
+            else:
+                current = candidate
+        if current:
+            chunks.append(current.strip())
+        return chunks
+
+class LegacyStructureAwareChunker(LegacyPackingMixin, StructureAwareChunker):
+    def _combine_blocks(self, blocks):
+        return self._legacy_combine_blocks(blocks)
+
+class LegacySemanticPreservingChunker(LegacyPackingMixin, SemanticPreservingChunker):
+    def _group_blocks(self, blocks):
+        return self._legacy_combine_blocks(blocks)
+
+class LegacyRecursiveChunker(RecursiveChunker):
+    def _split_recursive(self, text, level=0):
+        delimiters = ["\n#", "\n\n", "\n", ". ", " "]
+        delimiter = delimiters[level]
+        parts = text.split(delimiter)
+        chunks = []
+        current_chunk = ""
+        for part in parts:
+            combined = current_chunk + delimiter + part if current_chunk else part
+            if len(self.tokenizer.encode(combined, add_special_tokens=False)) <= self.max_tokens:
+                current_chunk = combined
+            else:
+                if current_chunk:
+                    chunks.append(current_chunk.strip())
+                if len(self.tokenizer.encode(part, add_special_tokens=False)) > self.max_tokens:
+                    if level < len(delimiters) - 1:
+                        chunks.extend(self._split_recursive(part, level + 1))
+                    else:
+                        chunks.append(part.strip())
+                    current_chunk = ""
+                else:
+                    current_chunk = part
+        if current_chunk:
+            chunks.append(current_chunk.strip())
+        return chunks
+
+def time_chunker(chunker, pages, source_file, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = chunker.chunk(pages, source_file)
+        best = min(best, time.perf_counter() - start)
+    return chunks, best
+
+def benchmark_chunkers(pdf_files, model_name, repeats=3):
+    reader = PDFReader()
+    documents = [(os.path.basename(path), reader.read(path)) for path in pdf_files]
+
+    pairs = [
+        ("StructureAwareChunker", StructureAwareChunker(model_name), LegacyStructureAwareChunker(model_name)),
+        ("SemanticPreservingChunker", SemanticPreservingChunker(model_name), LegacySemanticPreservingChunker(model_name)),
+        ("RecursiveChunker", RecursiveChunker(model_name), LegacyRecursiveChunker(model_name)),
+    ]
+    tokenizer = pairs[0][1].tokenizer
+    total_tokens = sum(len(tokenizer.encode(text, add_special_tokens=False)) for _, pages in documents for _, text in pages)
+
+    print(f"\n{'='*72}")
+    print(f"📊 Chunking throughput ({len(pdf_files)} files, {total_tokens} tokens, best of {repeats})")
+    print('='*72)
+    for name, chunker, legacy in pairs:
+        new_time = legacy_time = 0.0
+        identical = True
+        for source_file, pages in documents:
+            new_chunks, elapsed = time_chunker(chunker, pages, source_file, repeats)
+            new_time += elapsed
+            old_chunks, elapsed = time_chunker(legacy, pages, source_file, repeats)
+            legacy_time += elapsed
+            identical &= [c.text for c in new_chunks] == [c.text for c in old_chunks]
+        print(f"{name:<28} legacy {total_tokens / legacy_time:>10.0f} tok/s | "
+              f"packed {total_tokens / new_time:>10.0f} tok/s | x{legacy_time / new_time:5.1f} | "
+              f"{'identical chunks ✅' if identical else 'CHUNKS DIFFER ❌'}")
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else "data/"
+    model_name = sys.argv[2] if len(sys.argv) > 2 else "sentence-transformers/all-MiniLM-L6-v2"
+    pdf_files = sorted(os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.endswith(".pdf"))
+
+    if not pdf_files:
+        print(f"⚠️ No PDF files found in {pdf_dir}")
+        sys.exit(1)
+
+    benchmark_chunkers(pdf_files, model_name)
@@ -0,0 +1,72 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import faiss
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.models.chunk_document import ChunkDocument
+from backend.vectorstore.faiss_store import FaissVectorStore
+from backend.vectorstore.index_factory import CODECS
+
+def make_corpus(num_vectors: int, embedding_dim: int, num_queries: int, seed: int = 0):
+    # Clustered vectors, closer to sentence embeddings than uniform noise
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(num_vectors // 200, 8), embedding_dim))
+    vectors = centers[rng.integers(0, len(centers), num_vectors)] + 0.6 * rng.normal(size=(num_vectors, embedding_dim))
+    queries = vectors[rng.integers(0, num_vectors, num_queries)] + 0.3 * rng.normal(size=(num_queries, embedding_dim))
+    return vectors.astype("float32"), queries.astype("float32")
+
+def build_store(vectors: np.ndarray, index_type: str, codec: str, rescore_factor: int, index_path: str) -> FaissVectorStore:
+    store = FaissVectorStore(embedding_dim=vectors.shape[1], index_type=index_type, codec=codec, rescore_factor=rescore_factor)
+    documents = [ChunkDocument(text="", page=0, chunk_id=i, source_file="benchmark") for i in range(len(vectors))]
+    store.add(vectors, documents)
+    store.optimize()
+    # Save and reload so the index and side file are memory-mapped as in the server
+    store.save(index_path)
+    loaded = FaissVectorStore(embedding_dim=vectors.shape[1], rescore_factor=rescore_factor)
+    loaded.load(index_path)
+    return loaded
+
+def search_ids(store: FaissVectorStore, queries: np.ndarray, k: int):
+    start = time.time()
+    results = [[doc.global_id for doc, _ in store.search(query, k=k)] for query in queries]
+    return results, (time.time() - start) / len(queries)
+
+def benchmark_compression(num_vectors: int, embedding_dim: int, index_type: str, k: int = 10, num_queries: int = 200):
+    vectors, queries = make_corpus(num_vectors, embedding_dim, num_queries)
+    work_dir = tempfile.mkdtemp(prefix="benchmark_compression_")
+
+    exact = build_store(vectors, "flat", "fp32", 0, os.path.join(work_dir, "exact"))
+    truth, _ = search_ids(exact, queries, k)
+    baseline_bytes = faiss.serialize_index(exact.index).nbytes / num_vectors
+
+    print(f"\n{'='*78}")
+    print(f"📊 Vector compression ({num_vectors} x {embedding_dim}, {index_type} index, recall@{k} vs exact flat)")
+    print('='*78)
+    print(f"{'codec':<6} {'bytes/vector':>13} {'ratio':>7} {'recall':>8} {'ms/query':>9} {'recall+rescore':>15} {'ms/query':>9}")
+    for codec in CODECS:
+        store = build_store(vectors, index_type, codec, 0, os.path.join(work_dir, codec))
+        index_bytes = faiss.serialize_index(store.index).nbytes / num_vectors
+        results, latency = search_ids(store, queries, k)
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(results, truth)])
+        line = f"{codec:<6} {index_bytes:>13.1f} {baseline_bytes / index_bytes:>6.1f}x {recall:>8.3f} {latency * 1000:>9.2f}"
+        if store.full_vectors is not None:
+            store.rescore_factor = 4
+            results, latency = search_ids(store, queries, k)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(results, truth)])
+            line += f" {recall:>15.3f} {latency * 1000:>9.2f}"
+        print(line)
+    print("Re-scoring reads full-precision vectors from the memory-mapped side file (4 * k candidates).")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    num_vectors = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    index_type = sys.argv[2] if len(sys.argv) > 2 else "flat"
+    embedding_dim = int(sys.argv[3]) if len(sys.argv) > 3 else 384
+    benchmark_compression(num_vectors, embedding_dim, index_type)
@@ -0,0 +1,68 @@
+import sys
+import os
+import asyncio
+import time
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.core.rag_system import RAGSystem
+from backend.scripts._bench_queries import QUESTIONS
+
+async def blocking_query(rag_system: RAGSystem, query: str, top_k: int) -> str:
+    # The previous pipeline: every stage called directly on the event loop
+    query_vector = rag_system.embedder.embed_queries([query])[0]
+    chunks = rag_system._retrieve(rag_system.vectorstore, [query], query_vector[None], rag_system.rerank_candidates, None)[0]
+    reranked = rag_system.reranker.rerank(query, chunks, top_k=top_k)
+    return rag_system.generator.generate_answer(query, [chunk for chunk, _ in reranked])
+
+async def async_query(rag_system: RAGSystem, query: str, top_k: int) -> str:
+    return (await rag_system.process_query(query, top_k=top_k, use_self_rag=False))["answer"]
+
+async def run_load(run_query, rag_system: RAGSystem, concurrency: int, num_requests: int, top_k: int = 5):
+    latencies, probe_latencies = [], []
+    next_request = iter(range(num_requests))
+    done = asyncio.Event()
+
+    async def client():
+        for i in next_request:
+            # Distinct texts, so no cache can answer
+            start = time.perf_counter()
+            await run_query(rag_system, f"{QUESTIONS[i % len(QUESTIONS)]} ({concurrency}-{i})", top_k)
+            latencies.append(time.perf_counter() - start)
+
+    async def probe():
+        # Stands in for a cheap endpoint such as /api/system/status: how long until the loop runs it
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0)
+            probe_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.02)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return num_requests / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99), np.percentile(probe_latencies, 99)
+
+async def benchmark_concurrency(num_requests: int):
+    rag_system = RAGSystem()
+    rag_system.answer_cache.max_size = 0  # Measure the pipeline, not the answer cache
+
+    print(f"\n{'='*80}")
+    print(f"📊 End-to-end queries ({num_requests} per run), generator: {type(rag_system.generator).__name__}")
+    print('='*80)
+    print(f"{'pipeline':<10} {'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'loop p99 ms':>12}")
+    for label, run_query in (("blocking", blocking_query), ("async", async_query)):
+        for concurrency in (1, 8, 32):
+            qps, p50, p99, probe_p99 = await run_load(run_query, rag_system, concurrency, num_requests)
+            print(f"{label:<10} {concurrency:>8} {qps:>8.1f} {p50 * 1000:>9.1f} {p99 * 1000:>9.1f} {probe_p99 * 1000:>12.1f}")
+    await rag_system.generator.aclose()
+
+if __name__ == "__main__":
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    asyncio.run(benchmark_concurrency(num_requests))
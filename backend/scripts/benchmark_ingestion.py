@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.reader.pdf_reader import PDFReader
+from backend.chunker.structure_aware_chunker import StructureAwareChunker
+from backend.embedder.hf_embedder import HuggingFaceEmbedder
+from backend.embedder.cached_embedder import CachedEmbedder
+from backend.vectorstore.faiss_store import FaissVectorStore
+from backend.core.ingestion import IngestionPipeline, default_ingest_workers
+
+def benchmark_ingestion(pdf_files: list[str], workers: int):
+    reader = PDFReader()
+    chunker = StructureAwareChunker()
+    embedder = CachedEmbedder(HuggingFaceEmbedder())
+
+    # Warm the embedding cache so both runs measure reading + chunking, not the model
+    IngestionPipeline(reader, chunker, embedder, workers=workers).run(pdf_files, FaissVectorStore())
+
+    results = {}
+    for num_workers in sorted({1, workers}):
+        pipeline = IngestionPipeline(reader, chunker, embedder, workers=num_workers)
+        start = time.time()
+        stats = pipeline.run(pdf_files, FaissVectorStore())
+        results[num_workers] = (time.time() - start, stats["chunks"])
+
+    print(f"\n{'='*60}")
+    print(f"📊 Ingestion throughput ({len(pdf_files)} files)")
+    print('='*60)
+    baseline = results[1][0]
+    for num_workers, (elapsed, chunks) in results.items():
+        print(f"{num_workers:>3} workers: {elapsed:7.2f}s  {chunks / elapsed:8.1f} chunks/s  x{baseline / elapsed:.2f}")
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else "data/"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else default_ingest_workers()
+    pdf_files = [os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
+
+    if not pdf_files:
+        print(f"⚠️ No PDF files found in {pdf_dir}")
+        sys.exit(1)
+
+    benchmark_ingestion(pdf_files, workers)
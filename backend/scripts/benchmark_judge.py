@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.core.rag_system import RAGSystem, default_judge_band
+from backend.judge.embedding_judge import EmbeddingJudge
+from backend.judge.cross_encoder_judge import CrossEncoderJudge
+from backend.scripts._bench_queries import QUESTIONS
+
+def build_cases(rag_system: RAGSystem, top_k: int = 5):
+    # Grounded answers are extracted from the retrieved chunks; ungrounded ones are the
+    # same sentences paired with another question's chunks
+    cases = []
+    for question in QUESTIONS:
+        query_vector = rag_system.embedder.embed_queries([question])
+        chunks = rag_system._retrieve(rag_system.vectorstore, [question], query_vector, rag_system.rerank_candidates, None)[0]
+        chunks = [chunk for chunk, _ in rag_system.reranker.rerank(question, chunks, top_k=top_k)]
+        answer = " ".join(chunks[0].text.split()[:60]) if chunks else ""
+        cases.append((question, answer, chunks))
+    ungrounded = [(question, cases[(i + len(cases) // 2) % len(cases)][1], chunks) for i, (question, _, chunks) in enumerate(cases)]
+    return cases, ungrounded
+
+def benchmark_judge(repeats: int = 5):
+    os.environ.setdefault("JUDGE_STRATEGY", "llm")  # The judges are built below
+    rag_system = RAGSystem()
+    grounded, ungrounded = build_cases(rag_system)
+    judges = [EmbeddingJudge(rag_system.document_embedder), CrossEncoderJudge(rag_system.reranker.model)]
+
+    print(f"\n{'='*80}")
+    print(f"📊 Local grounding judges, {len(grounded)} grounded and {len(ungrounded)} ungrounded answers")
+    print('='*80)
+    print(f"{'judge':<15} {'ms/answer':>10} {'grounded':>9} {'ungrounded':>11} {'accepted':>9} {'rejected':>9} {'to LLM':>7}")
+    for judge in judges:
+        low, high = default_judge_band(judge)
+        judge.score_batch(grounded[:1])  # Warm-up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            scores = judge.score_batch(grounded + ungrounded)
+        per_answer = (time.perf_counter() - start) / repeats / len(scores) * 1000
+        values = np.array([s.score for s in scores])
+        is_grounded = np.arange(len(values)) < len(grounded)
+        accepted = int(((values >= high) & is_grounded).sum())
+        rejected = int(((values < low) & ~is_grounded).sum())
+        wrong = int(((values >= high) & ~is_grounded).sum() + ((values < low) & is_grounded).sum())
+        to_llm = int(((values >= low) & (values < high)).sum())
+        print(f"{judge.name:<15} {per_answer:>10.2f} {values[is_grounded].mean():>9.2f} {values[~is_grounded].mean():>11.2f} "
+              f"{accepted:>9} {rejected:>9} {to_llm:>7}")
+        if wrong:
+            print(f"⚠️ {judge.name}: {wrong} answers decided wrongly without the LLM; adjust JUDGE_UNCERTAIN_LOW/HIGH")
+    print("\nEvery answer decided locally saves one LLM round trip (typically 0.5-2 s).")
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    benchmark_judge(repeats)
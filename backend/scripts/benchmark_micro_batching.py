@@ -0,0 +1,75 @@
+import sys
+import os
+import asyncio
+import time
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.reader.pdf_reader import PDFReader
+from backend.chunker.structure_aware_chunker import StructureAwareChunker
+from backend.embedder.hf_embedder import HuggingFaceEmbedder
+from backend.embedder.cached_embedder import CachedEmbedder
+from backend.embedder.query_cache import QueryEmbeddingCache
+from backend.vectorstore.faiss_store import FaissVectorStore
+from backend.reranker.cascade_reranker import CascadeReranker
+from backend.core.ingestion import IngestionPipeline
+from backend.core.micro_batcher import MicroBatcher
+from backend.scripts._bench_queries import QUESTIONS
+
+async def run_load(embed_batcher, rerank_batcher, store, concurrency: int, num_requests: int, num_candidates: int):
+    # `concurrency` clients, each sending its next query as soon as the previous one returns
+    latencies = []
+    next_request = iter(range(num_requests))
+
+    async def client():
+        for i in next_request:
+            # Distinct texts, so neither the query nor the score cache can answer
+            question = f"{QUESTIONS[i % len(QUESTIONS)]} ({i})"
+            start = time.perf_counter()
+            query_vector = await embed_batcher.submit(question)
+            candidates = store.search(query_vector, k=num_candidates)
+            await rerank_batcher.submit((question, candidates, 5))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return num_requests / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+def benchmark_micro_batching(pdf_files: list[str], num_requests: int = 128, num_candidates: int = 30):
+    embedder = HuggingFaceEmbedder(query_cache=QueryEmbeddingCache(max_size=0))
+    reranker = CascadeReranker(cache_size=0)
+    store = FaissVectorStore()
+    IngestionPipeline(PDFReader(), StructureAwareChunker(), CachedEmbedder(embedder)).run(pdf_files, store)
+
+    def rerank_requests(requests):
+        reranked = reranker.rerank_batch([q for q, _, _ in requests], [c for _, c, _ in requests], top_k=max(k for _, _, k in requests))
+        return [result[:k] for result, (_, _, k) in zip(reranked, requests)]
+
+    print(f"\n{'='*80}")
+    print(f"📊 Query embedding + rerank of {num_candidates} candidates, {num_requests} requests per run")
+    print('='*80)
+    print(f"{'batching':<10} {'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'mean batch (embed/rerank)':>27}")
+    for label, max_batch_size in (("off", 1), ("on", None)):
+        for concurrency in (1, 4, 16, 64):
+            embed_batcher = MicroBatcher(embedder.embed_queries, max_batch_size=max_batch_size, name="embed")
+            rerank_batcher = MicroBatcher(rerank_requests, max_batch_size=max_batch_size, name="rerank")
+            qps, p50, p95 = asyncio.run(run_load(embed_batcher, rerank_batcher, store, concurrency, num_requests, num_candidates))
+            batch_sizes = f"{embed_batcher.stats()['mean_batch_size']:.1f} / {rerank_batcher.stats()['mean_batch_size']:.1f}"
+            print(f"{label:<10} {concurrency:>8} {qps:>8.1f} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {batch_sizes:>27}")
+            embed_batcher.close()
+            rerank_batcher.close()
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else "data/"
+    num_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    pdf_files = [os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
+
+    if not pdf_files:
+        print(f"⚠️ No PDF files found in {pdf_dir}")
+        sys.exit(1)
+
+    benchmark_micro_batching(pdf_files, num_requests)
@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.reader.pdf_reader import PDFReader
+from backend.chunker.structure_aware_chunker import StructureAwareChunker
+from backend.embedder.hf_embedder import HuggingFaceEmbedder
+from backend.embedder.onnx_embedder import ONNXEmbedder
+from backend.embedder.query_cache import QueryEmbeddingCache
+from backend.reranker.hf_reranker import HuggingFaceReranker
+from backend.reranker.onnx_reranker import ONNXReranker
+from backend.scripts._bench_queries import QUESTIONS
+
+def timed(fn, repeat: int = 3):
+    # Best of a few runs, after one warm-up call
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def benchmark_onnx(pdf_files: list[str], num_chunks: int = 512, num_candidates: int = 30, top_k: int = 5):
+    chunker = StructureAwareChunker()
+    chunks = [chunk for path in pdf_files for chunk in chunker.chunk(PDFReader().read(path), os.path.basename(path))][:num_chunks]
+    for global_id, chunk in enumerate(chunks):
+        chunk.global_id = global_id  # Stand-in for the IDs a vector store would assign
+    embedders = {
+        "torch": HuggingFaceEmbedder(query_cache=QueryEmbeddingCache(max_size=0)),
+        "onnx": ONNXEmbedder(query_cache=QueryEmbeddingCache(max_size=0)),
+        "onnx-int8": ONNXEmbedder(quantize=True, query_cache=QueryEmbeddingCache(max_size=0)),
+    }
+
+    print(f"\n{'='*80}")
+    print(f"📊 Embedder: {len(chunks)} chunks, {len(QUESTIONS)} single queries")
+    print('='*80)
+    print(f"{'backend':<10} {'query p50 ms':>13} {'chunks/s':>10} {'mean cosine':>12} {'min cosine':>11}")
+    reference = None
+    for name, embedder in embedders.items():
+        latencies = [timed(lambda q=question: embedder.embed_queries([q]))[1] for question in QUESTIONS]
+        vectors, seconds = timed(lambda: embedder.embed_array(chunks), repeat=1)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        if reference is None:
+            reference = vectors
+        cosine = (vectors * reference).sum(axis=1)
+        print(f"{name:<10} {np.median(latencies) * 1000:>13.2f} {len(chunks) / seconds:>10.1f} {cosine.mean():>12.4f} {cosine.min():>11.4f}")
+
+    # Candidates per question from the torch embeddings, so all rerankers see the same lists
+    query_matrix = embedders["torch"].embed_queries(QUESTIONS)
+    candidates = [[(chunks[i], float(s)) for s, i in sorted(zip(reference @ q, range(len(chunks))), reverse=True)[:num_candidates]]
+                  for q in query_matrix]
+    rerankers = {
+        "torch": HuggingFaceReranker(),
+        "onnx": ONNXReranker(),
+        "onnx-int8": ONNXReranker(quantize=True),
+    }
+
+    print(f"\n{'='*80}")
+    print(f"📊 Reranker: {num_candidates} candidates per query, top {top_k}")
+    print('='*80)
+    print(f"{'backend':<10} {'pairs/s':>10} {'top-k overlap':>14} {'max |Δscore|':>13}")
+    reference = None
+    for name, reranker in rerankers.items():
+        results, seconds = timed(lambda: [reranker.rerank(q, c, top_k=len(c)) for q, c in zip(QUESTIONS, candidates)], repeat=1)
+        scores = [{chunk.global_id: float(score) for chunk, score in result} for result in results]
+        if reference is None:
+            reference = (results, scores)
+        overlap = np.mean([len({c.global_id for c, _ in a[:top_k]} & {c.global_id for c, _ in b[:top_k]}) / top_k
+                           for a, b in zip(results, reference[0])])
+        delta = max(abs(s[gid] - r[gid]) for s, r in zip(scores, reference[1]) for gid in r)
+        print(f"{name:<10} {num_candidates * len(QUESTIONS) / seconds:>10.1f} {overlap:>14.3f} {delta:>13.4f}")
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else "data/"
+    num_chunks = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    pdf_files = [os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
+
+    if not pdf_files:
+        print(f"⚠️ No PDF files found in {pdf_dir}")
+        sys.exit(1)
+
+    benchmark_onnx(pdf_files, num_chunks)
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.reader.pdf_reader import PDFReader
+from backend.chunker.structure_aware_chunker import StructureAwareChunker
+from backend.embedder.hf_embedder import HuggingFaceEmbedder
+from backend.embedder.cached_embedder import CachedEmbedder
+from backend.vectorstore.faiss_store import FaissVectorStore
+from backend.reranker.hf_reranker import HuggingFaceReranker
+from backend.reranker.cascade_reranker import CascadeReranker
+from backend.core.ingestion import IngestionPipeline
+from backend.scripts._bench_queries import QUESTIONS
+
+def rerank_all(reranker, candidates, top_k: int):
+    start = time.process_time()
+    results = [reranker.rerank(question, chunks, top_k=top_k) for question, chunks in zip(QUESTIONS, candidates)]
+    return results, (time.process_time() - start) / len(QUESTIONS)
+
+def benchmark_reranker(pdf_files: list[str], num_candidates: int = 50, top_k: int = 5):
+    embedder = HuggingFaceEmbedder()
+    store = FaissVectorStore()
+    IngestionPipeline(PDFReader(), StructureAwareChunker(), CachedEmbedder(embedder)).run(pdf_files, store)
+    query_matrix = embedder.embed_queries(QUESTIONS)
+    candidates = {
+        "dense": store.search_batch(query_matrix, k=num_candidates),
+        "hybrid": store.hybrid_search_batch(query_matrix, QUESTIONS, k=num_candidates),
+    }
+
+    baseline = HuggingFaceReranker()
+    print(f"\n{'='*72}")
+    print(f"📊 Reranking {num_candidates} candidates per query, top {top_k} ({len(QUESTIONS)} questions)")
+    print('='*72)
+    print(f"{'candidates':<10} {'reranker':<16} {'CPU ms/query':>13} {'pairs scored':>13} {'top-k overlap':>14}")
+    for name, candidate_lists in candidates.items():
+        reference, cpu = rerank_all(baseline, candidate_lists, top_k)
+        print(f"{name:<10} {'full':<16} {cpu * 1000:>13.1f} {num_candidates * len(QUESTIONS):>13} {1.0:>14.3f}")
+        cascade = CascadeReranker()
+        for label in ("cascade (cold)", "cascade (warm)"):
+            scored_before = cascade.pairs_scored
+            results, cpu = rerank_all(cascade, candidate_lists, top_k)
+            overlap = np.mean([len({c.global_id for c, _ in a} & {c.global_id for c, _ in b}) / top_k
+                               for a, b in zip(results, reference)])
+            print(f"{name:<10} {label:<16} {cpu * 1000:>13.1f} {cascade.pairs_scored - scored_before:>13} {overlap:>14.3f}")
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else "data/"
+    num_candidates = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pdf_files = [os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
+
+    if not pdf_files:
+        print(f"⚠️ No PDF files found in {pdf_dir}")
+        sys.exit(1)
+
+    benchmark_reranker(pdf_files, num_candidates)
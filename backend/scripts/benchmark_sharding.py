@@ -0,0 +1,86 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.models.chunk_document import ChunkDocument
+from backend.vectorstore.faiss_store import FaissVectorStore
+from backend.vectorstore.sharded_store import ShardedVectorStore
+
+CHUNKS_PER_FILE = 1000
+ADD_BATCH = 100_000
+
+def fill_store(store, num_vectors: int, embedding_dim: int, index_path: str, seed: int = 0):
+    # Same vectors for every store; generated in batches to bound memory
+    rng = np.random.default_rng(seed)
+    for start in range(0, num_vectors, ADD_BATCH):
+        count = min(ADD_BATCH, num_vectors - start)
+        vectors = rng.normal(size=(count, embedding_dim)).astype("float32")
+        documents = [ChunkDocument(text="", page=0, chunk_id=i, source_file=f"doc_{i // CHUNKS_PER_FILE}.pdf")
+                     for i in range(start, start + count)]
+        store.add(vectors, documents)
+    store.optimize()
+    # Save and reload so the stores are memory-mapped as in the server
+    store.save(index_path)
+    store.load(index_path)
+    return store
+
+def measure_latency(store, queries: np.ndarray, k: int):
+    store.search(queries[0], k=k)  # Warm up (loads lazy shards)
+    latencies = []
+    for query in queries:
+        start = time.time()
+        store.search(query, k=k)
+        latencies.append(time.time() - start)
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000
+
+def measure_throughput(store, queries: np.ndarray, k: int, clients: int):
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(lambda query: store.search(query, k=k), queries))
+    return len(queries) / (time.time() - start)
+
+def benchmark_sharding(num_vectors: int, num_shards: int, embedding_dim: int, index_type: str = "flat",
+                       k: int = 10, num_queries: int = 200, clients: int = 8):
+    work_dir = tempfile.mkdtemp(prefix="benchmark_sharding_")
+    queries = np.random.default_rng(1).normal(size=(num_queries, embedding_dim)).astype("float32")
+
+    print(f"\n{'='*78}")
+    print(f"📊 Sharding ({num_vectors} x {embedding_dim}, {index_type} index, {os.cpu_count()} CPUs, {clients} concurrent clients)")
+    print('='*78)
+    stores = {
+        "single": FaissVectorStore(embedding_dim=embedding_dim, index_type=index_type),
+        f"{num_shards} shards": ShardedVectorStore(embedding_dim=embedding_dim, num_shards=num_shards, shard_by="chunk",
+                                                   index_type=index_type),
+    }
+    results = {}
+    print(f"{'store':<12} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'QPS':>8} {'batch QPS':>10}")
+    for name, store in stores.items():
+        start = time.time()
+        fill_store(store, num_vectors, embedding_dim, os.path.join(work_dir, name.replace(" ", "_")))
+        build_time = time.time() - start
+        p50, p95 = measure_latency(store, queries, k)
+        qps = measure_throughput(store, queries, k, clients)
+        start = time.time()
+        results[name] = store.search_batch(queries, k=k)
+        batch_qps = num_queries / (time.time() - start)
+        print(f"{name:<12} {build_time:>8.1f} {p50:>8.2f} {p95:>8.2f} {qps:>8.1f} {batch_qps:>10.1f}")
+
+    single, sharded = results.values()
+    overlap = np.mean([len({doc.chunk_id for doc, _ in a} & {doc.chunk_id for doc, _ in b}) / k for a, b in zip(single, sharded)])
+    print(f"Top-{k} overlap between single and sharded results: {overlap:.3f}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    num_vectors = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_shards = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    embedding_dim = int(sys.argv[3]) if len(sys.argv) > 3 else 384
+    index_type = sys.argv[4] if len(sys.argv) > 4 else "flat"
+    benchmark_sharding(num_vectors, num_shards, embedding_dim, index_type)
@@ -0,0 +1,47 @@
+import sys
+import os
+import asyncio
+import time
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.core.rag_system import RAGSystem
+from backend.scripts._bench_queries import QUESTIONS
+
+async def benchmark_streaming(use_self_rag: bool):
+    rag_system = RAGSystem()
+    rag_system.answer_cache.max_size = 0  # Every question goes through the whole pipeline
+
+    blocking, first_event, first_token, complete = [], [], [], []
+    for i, question in enumerate(QUESTIONS):
+        start = time.perf_counter()
+        await rag_system.process_query(f"{question} ({i}a)", top_k=5, use_self_rag=use_self_rag)
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        seen_token = False
+        async for event, _ in rag_system.stream_query(f"{question} ({i}b)", top_k=5, use_self_rag=use_self_rag):
+            if event == "chunks":
+                first_event.append(time.perf_counter() - start)
+            elif event == "token" and not seen_token:
+                first_token.append(time.perf_counter() - start)
+                seen_token = True
+        complete.append(time.perf_counter() - start)
+
+    print(f"\n{'='*72}")
+    print(f"📊 {len(QUESTIONS)} queries, Self-RAG {'on' if use_self_rag else 'off'}, generator: {type(rag_system.generator).__name__}")
+    print('='*72)
+    print(f"{'':<34} {'p50 ms':>10} {'max ms':>10}")
+    for label, values in (("/api/query: full response", blocking),
+                          ("/api/query/stream: chunks event", first_event),
+                          ("/api/query/stream: first token", first_token),
+                          ("/api/query/stream: done event", complete)):
+        print(f"{label:<34} {np.median(values) * 1000:>10.1f} {max(values) * 1000:>10.1f}")
+    await rag_system.generator.aclose()
+
+if __name__ == "__main__":
+    use_self_rag = "--no-self-rag" not in sys.argv[1:]
+    asyncio.run(benchmark_streaming(use_self_rag))
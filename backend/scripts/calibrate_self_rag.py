@@ -0,0 +1,126 @@
+import sys
+import os
+import asyncio
+import json
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.core.rag_system import RAGSystem
+from backend.core.self_rag_policy import SelfRAGPolicy
+
+QUANTILES = np.linspace(0, 100, 21)
+
+def load_logged_queries(path: str = None, limit: int = 500):
+    """
+    Queries to calibrate on: a file of one query per line, a JSONL export of the
+    queries collection (mongoexport --collection queries), or the collection itself
+    (MONGODB_URI, DB_NAME) when no file is given.
+    """
+    if path is None:
+        from pymongo import MongoClient
+
+        client = MongoClient(os.getenv("MONGODB_URI"))
+        cursor = client[os.getenv("DB_NAME", "selfRAG")]["queries"].find({}, {"query": 1}).sort("created_at", -1).limit(limit * 2)
+        queries = [doc["query"] for doc in cursor]
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        queries = [json.loads(line)["query"] if line.startswith("{") else line for line in lines]
+    # Repeated questions would be answered from the cache in production, so count each once
+    return list(dict.fromkeys(queries))[:limit]
+
+async def replay(rag_system: RAGSystem, queries, top_k: int):
+    # Every query through the full Self-RAG loop, recording what the policy would have seen
+    records = []
+    for i, query in enumerate(queries, 1):
+        result = await rag_system.process_query(query, top_k=top_k, use_self_rag=True)
+        info = result["self_rag_info"]
+        records.append({
+            "signals": result["self_rag_signals"],
+            "insufficient": not info["history"][0]["sufficient"],
+            "llm_calls": info["llm_calls"],
+            "llm_judged": info.get("judge", {}).get("verdict_by", "llm") == "llm"
+        })
+        if i % 25 == 0:
+            print(f"🔄 Replayed {i}/{len(queries)} queries")
+    await rag_system.generator.aclose()
+    return records
+
+def evaluate(policy: SelfRAGPolicy, records):
+    """Path counts, insufficient answers that would have gone unrefined, and extra LLM calls saved per query"""
+    counts = {"skip": 0, "single": 0, "full": 0}
+    misses, saved = 0, 0
+    for record in records:
+        path = policy.decide(record["signals"])
+        counts[path] += 1
+        extra_calls = record["llm_calls"] - 1  # Beyond the answer itself
+        if path == "skip":
+            saved += extra_calls
+        elif path == "single":
+            saved += extra_calls - int(record["llm_judged"])
+        if path != "full" and record["insufficient"]:
+            misses += 1
+    return counts, misses, saved / len(records)
+
+def calibrate(records, max_miss_rate: float):
+    rerank_tops = [r["signals"]["rerank_top"] for r in records if r["signals"]["rerank_top"] is not None]
+    margins = [r["signals"]["dense_margin"] for r in records if r["signals"]["dense_margin"] is not None]
+    if not rerank_tops or not margins:
+        return None
+    score_grid = sorted(set(np.percentile(rerank_tops, QUANTILES).round(3)))
+    margin_grid = sorted(set(np.percentile(margins, QUANTILES).round(4)))
+    best = None
+    for full_score in score_grid:
+        for skip_score in (s for s in score_grid if s >= full_score):
+            for skip_margin in margin_grid:
+                policy = SelfRAGPolicy(adaptive=True, skip_score=skip_score, skip_margin=skip_margin, full_score=full_score)
+                counts, misses, saved = evaluate(policy, records)
+                if misses / len(records) > max_miss_rate:
+                    continue
+                key = (saved, -misses)
+                if best is None or key > best[0]:
+                    best = (key, policy, counts, misses, saved)
+    return best
+
+def print_row(label: str, counts, misses: int, saved: float, total: int):
+    print(f"{label:<12} {counts['skip'] / total:>7.0%} {counts['single'] / total:>7.0%} {counts['full'] / total:>7.0%} "
+          f"{misses:>7} {saved:>12.2f}")
+
+def calibrate_self_rag(path: str = None, max_miss_rate: float = 0.05, limit: int = 500, top_k: int = 5):
+    os.environ["ANSWER_CACHE_SIZE"] = "0"  # Every query must reach the pipeline
+    queries = load_logged_queries(path, limit)
+    if not queries:
+        print("⚠️ No logged queries found")
+        return
+    rag_system = RAGSystem()
+    current = rag_system.self_rag_policy
+    rag_system.self_rag_policy = SelfRAGPolicy(adaptive=False)
+    records = asyncio.run(replay(rag_system, queries, top_k))
+
+    print(f"\n{'='*64}")
+    print(f"📊 Self-RAG policy on {len(records)} logged queries, "
+          f"{sum(r['insufficient'] for r in records)} judged insufficient by the full loop")
+    print('='*64)
+    print(f"{'policy':<12} {'skip':>7} {'single':>7} {'full':>7} {'misses':>7} {'saved calls':>12}")
+    print_row("always full", {"skip": 0, "single": 0, "full": len(records)}, 0, 0.0, len(records))
+    print_row("current", *evaluate(SelfRAGPolicy(adaptive=True, skip_score=current.skip_score, skip_margin=current.skip_margin,
+                                                 full_score=current.full_score), records), len(records))
+    best = calibrate(records, max_miss_rate)
+    if best is None:
+        print(f"\n⚠️ No thresholds keep misses under {max_miss_rate:.0%}; keep SELF_RAG_POLICY=full")
+        return
+    _, policy, counts, misses, saved = best
+    print_row("calibrated", counts, misses, saved, len(records))
+    print(f"\n✅ Calibrated thresholds (misses ≤ {max_miss_rate:.0%} of queries):")
+    print(f"SELF_RAG_SKIP_SCORE={policy.skip_score}")
+    print(f"SELF_RAG_SKIP_MARGIN={policy.skip_margin}")
+    print(f"SELF_RAG_FULL_SCORE={policy.full_score}")
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != "-" else None
+    max_miss_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    calibrate_self_rag(path, max_miss_rate, limit)
@@ -0,0 +1,108 @@
+import sys
+import os
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: float = 50, tail_ms: float = 1000, tail_rate: float = 0.05,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, token_ms: float = 10, seed: int = None):
+        """
+        Local stand-in for Cohere's /v1/generate endpoint, for testing the generator
+        client without network access or API costs.
+
+        :param port: Port to listen on (0 picks a free one).
+        :param latency_ms: Typical response time.
+        :param tail_ms: Response time of slow (tail) requests.
+        :param tail_rate: Fraction of requests that are slow.
+        :param error_rate: Fraction of requests answered with 503.
+        :param throttle_rate: Fraction of requests answered with 429 and Retry-After.
+        :param token_ms: Delay between streamed words.
+        :param seed: Random seed, for repeatable runs.
+        """
+        super().__init__(("127.0.0.1", port), StubLLMHandler)
+        self.latency_ms = latency_ms
+        self.tail_ms = tail_ms
+        self.tail_rate = tail_rate
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.token_ms = token_ms
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubLLMServer":
+        """Serve from a background thread."""
+        threading.Thread(target=self.serve_forever, name="stub-llm-server", daemon=True).start()
+        return self
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server: StubLLMServer = self.server
+        server.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/v1/generate":
+            return self._reply(404, {"message": "not found"})
+        roll = server.random.random()
+        if roll < server.throttle_rate:
+            return self._reply(429, {"message": "too many requests"}, {"Retry-After": "0.1"})
+        if roll < server.throttle_rate + server.error_rate:
+            return self._reply(503, {"message": "unavailable"})
+        slow = server.random.random() < server.tail_rate
+        time.sleep((server.tail_ms if slow else server.latency_ms * server.random.uniform(0.5, 1.5)) / 1000)
+        prompt = body.get("prompt", "")
+        # Judge-style prompts get a verdict, everything else an answer
+        if '"sufficient"' in prompt:
+            text = '{"sufficient": true, "explanation": "The answer addresses the question.", "refined_query": ""}'
+        else:
+            text = f"Stub answer ({len(prompt)} prompt chars)."
+        if body.get("stream"):
+            return self._stream(text)
+        self._reply(200, {"id": f"stub-{server.requests}", "generations": [{"id": "0", "text": text}]})
+
+    def _stream(self, text: str):
+        # Newline-delimited JSON events, one per word, as Cohere's streaming generate sends them
+        self.send_response(200)
+        self.send_header("Content-Type", "application/stream+json")
+        self.end_headers()
+        try:
+            for i, word in enumerate(text.split(" ")):
+                self.wfile.write((json.dumps({"is_finished": False, "text": word if i == 0 else " " + word}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.server.token_ms / 1000)
+            self.wfile.write((json.dumps({"is_finished": True, "finish_reason": "COMPLETE"}) + "\n").encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _reply(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up, e.g. a cancelled hedge
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8089
+    server = StubLLMServer(port)
+    print(f"✅ Stub LLM server on {server.base_url} (set COHERE_BASE_URL to use it)")
+    server.serve_forever()
@@ -0,0 +1,43 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+from backend.models.chunk_document import ChunkDocument
+
+RRF_K = 60  # Damping constant from the original reciprocal rank fusion paper
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Tuple[ChunkDocument, float]]], top_n: Optional[int] = None,
+                           rrf_k: int = RRF_K) -> List[Tuple[ChunkDocument, float]]:
+    """
+    Merge ranked result lists by reciprocal rank fusion: each chunk scores
+    sum(1 / (rrf_k + rank)) over the lists it appears in. Only ranks are used, so lists
+    scored on different scales (cosine similarity, BM25) can be combined directly.
+
+    :param result_lists: Ranked (ChunkDocument, score) lists, best first.
+    :param top_n: Number of fused results to return (all when None).
+    :param rrf_k: Damping constant; larger values flatten the contribution of top ranks.
+    :return: (ChunkDocument, fused score) tuples, best first.
+    """
+    scores: Dict[int, float] = {}
+    documents: Dict[int, ChunkDocument] = {}
+    for results in result_lists:
+        for rank, (doc, _) in enumerate(results, start=1):
+            scores[doc.global_id] = scores.get(doc.global_id, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(doc.global_id, doc)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    if top_n is not None:
+        ranked = ranked[:top_n]
+    return [(documents[global_id], score) for global_id, score in ranked]
+
+def fuse_dense_and_keyword(dense: List[Tuple[ChunkDocument, float]], keyword: List[Tuple[ChunkDocument, float]],
+                           top_n: int) -> List[Tuple[ChunkDocument, float]]:
+    """
+    Order the union of a dense and a keyword result list by reciprocal rank fusion, but
+    keep each chunk's dense similarity as its score so later stages can compare it
+    against the best dense match. Chunks found only by keyword get NaN (unknown).
+
+    :param dense: Dense search results, best first.
+    :param keyword: BM25 search results, best first.
+    :param top_n: Number of fused results to return.
+    :return: (ChunkDocument, dense similarity or NaN) tuples in fused order.
+    """
+    dense_scores = {doc.global_id: score for doc, score in dense}
+    return [(doc, dense_scores.get(doc.global_id, math.nan)) for doc, _ in reciprocal_rank_fusion([dense, keyword], top_n=top_n)]
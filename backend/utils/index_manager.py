@@ -1,10 +1,29 @@
 import os
 import hashlib
-from typing import List
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Set
 from pathlib import Path
 
 BACKEND_DIR = Path(__file__).parent.parent
 
+class IndexSnapshot:
+    def __init__(self, index_path: Optional[str], store):
+        """
+        A published version of the index: the vector store serving queries and the
+        directory it was saved to. Snapshot directories are written once and never modified.
+
+        :param index_path: Directory of the saved snapshot, or None for an unsaved empty store.
+        :param store: The vector store serving this snapshot.
+        """
+        self.index_path = index_path
+        self.snapshot_id = os.path.basename(index_path) if index_path else "empty"
+        self.store = store
+        self.refcount = 0
+        self.retired = False
+
 class IndexManager:
     def __init__(self, base_index_dir: str = None):
         """
@@ -16,6 +35,16 @@ class IndexManager:
             base_index_dir = str(BACKEND_DIR / "indices")
         self.base_index_dir = base_index_dir
         os.makedirs(self.base_index_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._current: Optional[IndexSnapshot] = None
+        self._retired: List[IndexSnapshot] = []
+        self._building: Set[str] = set()
+        self._last_version = 0
+        self._publish_listeners: List[Callable[[IndexSnapshot], None]] = []
+
+    def add_publish_listener(self, listener: Callable[[IndexSnapshot], None]) -> None:
+        """Call listener with every newly published snapshot (e.g. to invalidate caches)."""
+        self._publish_listeners.append(listener)
     
     def get_index_path(self, pdf_paths: List[str]) -> str:
         """
@@ -76,26 +105,112 @@ class IndexManager:
                 indices.append(item)
         
         return indices
-    
-    def cleanup_old_indices(self, keep_latest: int = 3) -> None:
+
+    def new_snapshot_path(self, pdf_paths: List[str]) -> str:
         """
-        Clean up old indices, keeping only the latest ones.
-        
-        :param keep_latest: Number of latest indices to keep.
+        Reserve a fresh, versioned directory for a new snapshot of the given PDF set.
+        The directory is protected from garbage collection until it is published or discarded.
+
+        :param pdf_paths: List of PDF file paths.
+        :return: Snapshot directory path (index_<hash>_v<version>).
         """
-        indices = self.list_indices()
-        if len(indices) <= keep_latest:
-            return
-        
-        # Sort by modification time
-        index_paths = [(idx, os.path.join(self.base_index_dir, idx)) for idx in indices]
-        index_paths.sort(key=lambda x: os.path.getmtime(x[1]), reverse=True)
-        
-        # Remove old indices
-        for idx_name, idx_path in index_paths[keep_latest:]:
-            import shutil
+        with self._lock:
+            self._last_version = max(self._last_version + 1, time.time_ns())
+            index_path = f"{self.get_index_path(pdf_paths)}_v{self._last_version}"
+            self._building.add(index_path)
+        return index_path
+
+    def discard(self, index_path: str) -> None:
+        """
+        Give up on a reserved snapshot directory (e.g. after a failed build) and delete it.
+
+        :param index_path: Path returned by new_snapshot_path.
+        """
+        with self._lock:
+            self._building.discard(index_path)
+        shutil.rmtree(index_path, ignore_errors=True)
+
+    def find_snapshot_path(self, pdf_paths: List[str]) -> Optional[str]:
+        """
+        Find the newest snapshot on disk for the given PDF set.
+
+        :param pdf_paths: List of PDF file paths.
+        :return: Snapshot directory path, or None if there is none.
+        """
+        base_name = os.path.basename(self.get_index_path(pdf_paths))
+        candidates = []
+        for name in self.list_indices():
+            if name == base_name:
+                candidates.append((0, name))  # Unversioned index from before snapshots
+            elif name.startswith(f"{base_name}_v") and name[len(base_name) + 2:].isdigit():
+                candidates.append((int(name[len(base_name) + 2:]), name))
+        if not candidates:
+            return None
+        return os.path.join(self.base_index_dir, max(candidates)[1])
+
+    @property
+    def current_snapshot(self) -> Optional[IndexSnapshot]:
+        return self._current
+
+    def publish(self, store, index_path: Optional[str]) -> IndexSnapshot:
+        """
+        Atomically make a new snapshot the one that serves queries. The previous snapshot
+        is retired and its directory removed once no in-flight query holds it.
+
+        :param store: Fully built vector store.
+        :param index_path: Directory the store was saved to, or None for an unsaved empty store.
+        :return: The published snapshot.
+        """
+        snapshot = IndexSnapshot(index_path, store)
+        with self._lock:
+            previous = self._current
+            self._current = snapshot
+            if index_path:
+                self._building.discard(index_path)
+            if previous is not None:
+                previous.retired = True
+                self._retired.append(previous)
+        print(f"🔄 Published index snapshot {snapshot.snapshot_id}")
+        for listener in self._publish_listeners:
+            listener(snapshot)
+        self.collect_garbage()
+        return snapshot
+
+    @contextmanager
+    def acquire(self) -> Iterator[Optional[IndexSnapshot]]:
+        """
+        Pin the current snapshot for the duration of a query, so that a concurrent
+        publish() does not delete it underneath the query.
+        """
+        with self._lock:
+            snapshot = self._current
+            if snapshot is not None:
+                snapshot.refcount += 1
+        try:
+            yield snapshot
+        finally:
+            if snapshot is not None:
+                with self._lock:
+                    snapshot.refcount -= 1
+                    release = snapshot.retired and snapshot.refcount == 0
+                if release:
+                    self.collect_garbage()
+
+    def collect_garbage(self) -> None:
+        """
+        Delete the directories of retired snapshots that are no longer in use, as well as
+        index directories left over from earlier runs.
+        """
+        with self._lock:
+            self._retired = [s for s in self._retired if s.refcount > 0]
+            keep = {s.index_path for s in self._retired} | set(self._building)
+            if self._current is not None:
+                keep.add(self._current.index_path)
+            stale = [os.path.join(self.base_index_dir, name) for name in self.list_indices()]
+            stale = [path for path in stale if path not in keep]
+        for index_path in stale:
             try:
-                shutil.rmtree(idx_path)
-                print(f"🗑️ Removed old index: {idx_name}")
+                shutil.rmtree(index_path)
+                print(f"🗑️ Removed old index: {os.path.basename(index_path)}")
             except Exception as e:
-                print(f"⚠️ Could not remove index {idx_name}: {e}")
\ No newline at end of file
+                print(f"⚠️ Could not remove index {os.path.basename(index_path)}: {e}")
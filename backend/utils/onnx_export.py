@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import onnxruntime as ort
+from pathlib import Path
+from typing import Dict
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+TASK_OUTPUTS = {"embedding": "last_hidden_state", "cross-encoder": "logits"}
+MODEL_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+_export_lock = threading.Lock()
+
+def default_onnx_threads() -> int:
+    """Intra-op threads per ONNX Runtime session, from ONNX_THREADS (0 lets ONNX Runtime decide)."""
+    return int(os.getenv("ONNX_THREADS", "0"))
+
+def onnx_model_dir(model_name: str, cache_dir: str = None) -> str:
+    if cache_dir is None:
+        cache_dir = str(BACKEND_DIR / "cache" / "onnx")
+    return os.path.join(cache_dir, model_name.replace("/", "__"))
+
+def export_model(model_name: str, task: str, quantize: bool = False, cache_dir: str = None) -> str:
+    """
+    Path of the ONNX version of a Hugging Face model, converting it on first use.
+
+    The exported graph, its tokenizer and its config are cached under
+    cache/onnx/<model>/, so the conversion (which needs PyTorch) runs once per model.
+    With quantize, a dynamically int8-quantized copy is derived from the float graph
+    and cached next to it.
+
+    :param model_name: Hugging Face model name.
+    :param task: "embedding" (token embeddings, pooled by the caller) or "cross-encoder" (logits).
+    :param quantize: Return the int8-quantized model.
+    :param cache_dir: Base directory for converted models.
+    :return: Path of the .onnx file; the tokenizer and config live in the same directory.
+    """
+    if task not in TASK_OUTPUTS:
+        raise ValueError(f"Unknown task: {task} (expected one of {', '.join(TASK_OUTPUTS)})")
+    model_dir = onnx_model_dir(model_name, cache_dir)
+    model_path = os.path.join(model_dir, "model.onnx")
+    quantized_path = os.path.join(model_dir, "model_int8.onnx")
+    with _export_lock:
+        if not os.path.exists(model_path):
+            _export(model_name, task, model_dir)
+        if quantize and not os.path.exists(quantized_path):
+            _quantize(model_path, quantized_path)
+    return quantized_path if quantize else model_path
+
+def _export(model_name: str, task: str, model_dir: str) -> None:
+    # PyTorch is only needed for this one-time conversion
+    import torch
+    from transformers import AutoModel, AutoModelForSequenceClassification, AutoTokenizer
+
+    print(f"🔄 Exporting {model_name} to ONNX")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model_cls = AutoModel if task == "embedding" else AutoModelForSequenceClassification
+    model = model_cls.from_pretrained(model_name).eval()
+    sample = tokenizer(["what is the minimum gpa"], ["Students must keep a cumulative GPA of at least 2.00."],
+                       padding=True, return_tensors="pt")
+    input_names = [name for name in MODEL_INPUTS if name in sample]
+    output_name = TASK_OUTPUTS[task]
+
+    class Wrapper(torch.nn.Module):
+        # Positional inputs in, a single tensor out: what the ONNX exporter handles best
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return getattr(self.model(**dict(zip(input_names, inputs))), output_name)
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes[output_name] = {0: "batch", 1: "sequence"} if task == "embedding" else {0: "batch"}
+    Path(model_dir).parent.mkdir(parents=True, exist_ok=True)
+    # Write into a temporary directory and rename it, so an interrupted export leaves no half-written model
+    tmp_dir = tempfile.mkdtemp(dir=Path(model_dir).parent)
+    try:
+        with torch.no_grad():
+            torch.onnx.export(Wrapper(), tuple(sample[name] for name in input_names), os.path.join(tmp_dir, "model.onnx"),
+                              input_names=input_names, output_names=[output_name], dynamic_axes=dynamic_axes, opset_version=17)
+        tokenizer.save_pretrained(tmp_dir)
+        model.config.save_pretrained(tmp_dir)
+        shutil.rmtree(model_dir, ignore_errors=True)
+        os.rename(tmp_dir, model_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    print(f"✅ Exported {model_name} to {model_dir}")
+
+def _quantize(model_path: str, quantized_path: str) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    print(f"🔄 Quantizing {model_path} to int8")
+    tmp_path = quantized_path + ".tmp"
+    quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, quantized_path)
+
+def create_session(model_path: str, num_threads: int = None) -> ort.InferenceSession:
+    """
+    CPU inference session with all graph optimizations enabled.
+
+    :param model_path: Path of the .onnx file.
+    :param num_threads: Intra-op threads (defaults to ONNX_THREADS).
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    threads = num_threads if num_threads is not None else default_onnx_threads()
+    if threads:
+        options.intra_op_num_threads = threads
+    return ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+def load_model_config(model_path: str) -> Dict:
+    with open(os.path.join(os.path.dirname(model_path), "config.json")) as f:
+        return json.load(f)
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = 1):
+        """
+        Async token bucket rate limiter: tokens refill at `rate` per second up to `burst`,
+        and every request takes one.
+
+        :param rate: Sustained requests per second (0 or less disables limiting).
+        :param burst: Most requests that may be sent back to back after an idle period.
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        start = None
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                if start is not None:
+                    self.waits += 1
+                    self.wait_seconds += time.monotonic() - start
+                return
+            if start is None:
+                start = time.monotonic()
+            await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -1,14 +1,15 @@
+import numpy as np
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import List, Tuple, Union
 from backend.models.chunk_document import ChunkDocument
 
 class BaseVectorStore(ABC):
     @abstractmethod
-    def add(self, embeddings: List[List[float]], documents: List[ChunkDocument]) -> None:
+    def add(self, embeddings: Union[List[List[float]], np.ndarray], documents: List[ChunkDocument]) -> None:
         """
         Adds embeddings and corresponding documents to the vector store.
 
-        :param embeddings: List of vector representations of the documents.
+        :param embeddings: Vector representations of the documents, as a list of lists or an (n, d) matrix.
         :param documents: List of ChunkDocument objects to be added.
         """
         pass
@@ -24,6 +25,17 @@ class BaseVectorStore(ABC):
         """
         pass
     
+    def search_batch(self, query_matrix: np.ndarray, k: int) -> List[List[Tuple[ChunkDocument, float]]]:
+        """
+        Searches the vector store for several queries at once.
+        Stores that can search a whole matrix in one call should override this.
+
+        :param query_matrix: (n, d) matrix of query vectors.
+        :param k: The number of nearest neighbors to return per query.
+        :return: One list of (ChunkDocument, similarity score) tuples per query.
+        """
+        return [self.search(query_vector, k) for query_vector in query_matrix]
+
     @abstractmethod
     def save(self, index_path: str) -> None:
         """
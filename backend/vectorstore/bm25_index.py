@@ -0,0 +1,227 @@
+import numpy as np
+import os
+import pickle
+import re
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Words, plus dotted/dashed identifiers such as "5.2.1" or "ek-3" kept as a single term
+TOKEN_PATTERN = re.compile(r"\w+(?:[./-]\w+)*")
+TOKEN_SEPARATORS = re.compile(r"[./-]")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased terms of a text. Compound identifiers are indexed both whole and split,
+    so "Article 5.2" matches queries for "5.2" as well as for "5".
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        if TOKEN_SEPARATORS.search(token):
+            terms.extend(part for part in TOKEN_SEPARATORS.split(token) if part)
+    return terms
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Okapi BM25 inverted index over chunk texts, keyed by global chunk ID.
+
+        Saved postings are stored in CSR form (per-term offsets into flat arrays of chunk
+        IDs and term frequencies) that can be memory-mapped. Chunks added after opening go
+        to per-term array.array postings, and removed chunks are masked out at query time,
+        until the index is written again.
+
+        :param k1: Term frequency saturation.
+        :param b: Document length normalization.
+        """
+        self.k1 = k1
+        self.b = b
+        self._terms: Dict[str, int] = {}  # Term -> term ID
+        self._term_offsets = np.zeros(1, dtype="int64")  # Saved postings of term t: [offsets[t], offsets[t + 1])
+        self._post_ids = np.empty(0, dtype="int64")
+        self._post_tfs = np.empty(0, dtype="int32")
+        self._doc_ids = np.empty(0, dtype="int64")  # Sorted IDs of the saved chunks
+        self._doc_lens = np.empty(0, dtype="int32")
+        self._overlay_postings: Dict[int, Tuple[array, array]] = {}
+        self._overlay_lens: Dict[int, int] = {}
+        self._removed: Set[int] = set()
+        self._removed_array: Optional[np.ndarray] = None
+        self._num_docs = 0
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return self._num_docs
+
+    def add(self, global_id: int, text: str) -> None:
+        """Index a chunk under its global ID, which must be larger than every saved chunk's ID."""
+        terms = tokenize(text)
+        for term, tf in Counter(terms).items():
+            term_id = self._terms.setdefault(term, len(self._terms))
+            ids, tfs = self._overlay_postings.setdefault(term_id, (array("q"), array("i")))
+            ids.append(global_id)
+            tfs.append(tf)
+        self._overlay_lens[global_id] = len(terms)
+        self._num_docs += 1
+        self._total_len += len(terms)
+
+    def remove(self, global_ids: Iterable[int]) -> None:
+        """Remove chunks from the index (their postings are dropped on the next write)."""
+        for global_id in global_ids:
+            if global_id in self._removed:
+                continue
+            length = self._overlay_lens.pop(global_id, None)
+            if length is None:
+                row = int(np.searchsorted(self._doc_ids, global_id))
+                if row == len(self._doc_ids) or self._doc_ids[row] != global_id:
+                    continue
+                length = int(self._doc_lens[row])
+            self._removed.add(global_id)
+            self._removed_array = None
+            self._num_docs -= 1
+            self._total_len -= length
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        ids, tfs = np.empty(0, dtype="int64"), np.empty(0, dtype="int32")
+        if term_id < len(self._term_offsets) - 1:
+            start, end = self._term_offsets[term_id], self._term_offsets[term_id + 1]
+            ids, tfs = np.asarray(self._post_ids[start:end]), np.asarray(self._post_tfs[start:end])
+        overlay = self._overlay_postings.get(term_id)
+        if overlay is not None:
+            ids = np.concatenate([ids, np.frombuffer(overlay[0], dtype="int64")])
+            tfs = np.concatenate([tfs, np.frombuffer(overlay[1], dtype="int32")])
+        if self._removed:
+            if self._removed_array is None:
+                self._removed_array = np.fromiter(self._removed, dtype="int64", count=len(self._removed))
+            keep = ~np.isin(ids, self._removed_array)
+            ids, tfs = ids[keep], tfs[keep]
+        return ids, tfs
+
+    def _lengths(self, ids: np.ndarray) -> np.ndarray:
+        # Overlay IDs were assigned after every saved chunk's, so they sort past the saved rows
+        rows = np.searchsorted(self._doc_ids, ids)
+        in_base = rows < len(self._doc_ids)
+        lengths = np.empty(len(ids), dtype="float32")
+        lengths[in_base] = self._doc_lens[rows[in_base]]
+        lengths[~in_base] = [self._overlay_lens[global_id] for global_id in ids[~in_base].tolist()]
+        return lengths
+
+    def search(self, query: str, k: int, allowed_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score chunks against the query terms.
+
+        :param query: The query text.
+        :param k: Number of results.
+        :param allowed_ids: Sorted global IDs to restrict the search to (all when None).
+        :return: (ids, scores) arrays of the k best-scoring chunks, best first.
+        """
+        term_ids = [self._terms[term] for term in dict.fromkeys(tokenize(query)) if term in self._terms]
+        if not term_ids or self._num_docs == 0:
+            return np.empty(0, dtype="int64"), np.empty(0, dtype="float32")
+        avg_len = self._total_len / self._num_docs
+        matched_ids, matched_scores = [], []
+        for term_id in term_ids:
+            ids, tfs = self._postings(term_id)
+            if len(ids) == 0:
+                continue
+            # IDF over the whole corpus, so filtering does not change how terms are weighted
+            idf = np.log(1 + (self._num_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            if allowed_ids is not None:
+                rows = np.searchsorted(allowed_ids, ids)
+                keep = rows < len(allowed_ids)
+                keep[keep] = allowed_ids[rows[keep]] == ids[keep]
+                ids, tfs = ids[keep], tfs[keep]
+            norm = self.k1 * (1 - self.b + self.b * self._lengths(ids) / avg_len)
+            matched_ids.append(ids)
+            matched_scores.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not matched_ids:
+            return np.empty(0, dtype="int64"), np.empty(0, dtype="float32")
+        ids, inverse = np.unique(np.concatenate(matched_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(matched_scores)).astype("float32")
+        top = min(k, len(ids))
+        if top == 0:
+            return ids[:0], scores[:0]
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return ids[best], scores[best]
+
+    def write(self, directory: str) -> None:
+        """
+        Write the index with overlay postings merged in and removed chunks dropped.
+
+        :param directory: Directory the postings files are written to.
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        num_base_terms = len(self._term_offsets) - 1
+        term_parts = [np.repeat(np.arange(num_base_terms, dtype="int64"), np.diff(self._term_offsets))]
+        id_parts, tf_parts = [np.asarray(self._post_ids)], [np.asarray(self._post_tfs)]
+        for term_id, (ids, tfs) in self._overlay_postings.items():
+            term_parts.append(np.full(len(ids), term_id, dtype="int64"))
+            id_parts.append(np.frombuffer(ids, dtype="int64"))
+            tf_parts.append(np.frombuffer(tfs, dtype="int32"))
+        terms, ids, tfs = np.concatenate(term_parts), np.concatenate(id_parts), np.concatenate(tf_parts)
+        if self._removed:
+            keep = ~np.isin(ids, np.fromiter(self._removed, dtype="int64", count=len(self._removed)))
+            terms, ids, tfs = terms[keep], ids[keep], tfs[keep]
+
+        # Drop terms without postings and renumber the rest in order of first appearance
+        used = np.zeros(len(self._terms), dtype=bool)
+        used[terms] = True
+        new_ids = np.cumsum(used) - 1
+        vocabulary = [term for term, term_id in self._terms.items() if used[term_id]]
+        terms = new_ids[terms]
+        order = np.lexsort((ids, terms))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(terms, minlength=len(vocabulary)))]).astype("int64")
+
+        base_keep = ~np.isin(self._doc_ids, np.fromiter(self._removed, dtype="int64", count=len(self._removed)))
+        overlay_ids = sorted(self._overlay_lens)
+        columns = {
+            "term_offsets.npy": offsets,
+            "post_ids.npy": ids[order],
+            "post_tfs.npy": tfs[order],
+            "doc_ids.npy": np.concatenate([self._doc_ids[base_keep], np.array(overlay_ids, dtype="int64")]),
+            "doc_lens.npy": np.concatenate([self._doc_lens[base_keep],
+                                            np.array([self._overlay_lens[i] for i in overlay_ids], dtype="int32")]),
+        }
+        for name, column in columns.items():
+            np.save(os.path.join(directory, name), column)
+        with open(os.path.join(directory, "terms.pkl"), "wb") as f:
+            pickle.dump({"terms": vocabulary, "k1": self.k1, "b": self.b}, f)
+
+    @classmethod
+    def open(cls, directory: str, mmap: bool = True) -> "BM25Index":
+        """
+        Open an index written by write().
+
+        :param directory: Directory containing the postings files.
+        :param mmap: Memory-map the postings instead of reading them into memory.
+        """
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(directory, "terms.pkl"), "rb") as f:
+            meta = pickle.load(f)
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index._terms = {term: term_id for term_id, term in enumerate(meta["terms"])}
+        index._term_offsets = np.load(os.path.join(directory, "term_offsets.npy"))
+        index._post_ids = np.load(os.path.join(directory, "post_ids.npy"), mmap_mode=mmap_mode)
+        index._post_tfs = np.load(os.path.join(directory, "post_tfs.npy"), mmap_mode=mmap_mode)
+        index._doc_ids = np.load(os.path.join(directory, "doc_ids.npy"))
+        index._doc_lens = np.load(os.path.join(directory, "doc_lens.npy"))
+        index._num_docs = len(index._doc_ids)
+        index._total_len = int(index._doc_lens.sum())
+        return index
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Tuple[int, str]]) -> "BM25Index":
+        """
+        :param documents: (global ID, text) pairs in increasing ID order.
+        """
+        index = cls()
+        for global_id, text in documents:
+            index.add(global_id, text)
+        return index
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return all(os.path.exists(os.path.join(directory, name)) for name in
+                   ["term_offsets.npy", "post_ids.npy", "post_tfs.npy", "doc_ids.npy", "doc_lens.npy", "terms.pkl"])
@@ -0,0 +1,211 @@
+import numpy as np
+import os
+import pickle
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from backend.models.chunk_document import ChunkDocument
+
+class ChunkTable(Mapping):
+    def __init__(self):
+        """
+        Chunk metadata keyed by global chunk ID.
+
+        Saved chunks live in columnar arrays (an offsets array into a UTF-8 text blob, plus
+        page, chunk-ID and source-index arrays) that can be memory-mapped, so opening a large
+        table costs milliseconds and several processes share its pages through the OS page
+        cache. A ChunkDocument is only created for the rows actually looked up. Chunks added
+        after opening are kept in an in-memory overlay, and removals are recorded per source
+        file, until the table is written again.
+        """
+        self._ids = np.empty(0, dtype="int64")  # Sorted global IDs of the saved rows
+        self._offsets = np.zeros(1, dtype="int64")
+        self._text = np.empty(0, dtype="uint8")
+        self._pages = np.empty(0, dtype="int32")
+        self._chunk_ids = np.empty(0, dtype="int32")
+        self._source_idx = np.empty(0, dtype="int32")
+        self._source_names: List[str] = []
+        self._removed_sources: set = set()  # Indices into _source_names removed from the saved rows
+        self._source_rows: Optional[Dict[int, np.ndarray]] = None  # Lazily grouped saved rows per source
+        self._overlay: Dict[int, ChunkDocument] = {}
+        self._overlay_sources: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_documents(cls, documents: Dict[int, ChunkDocument]) -> "ChunkTable":
+        table = cls()
+        for global_id in sorted(documents):
+            table.add(documents[global_id])
+        return table
+
+    def add(self, doc: ChunkDocument) -> None:
+        """Add a chunk under its doc.global_id, which must be larger than every saved row's ID."""
+        self._overlay[doc.global_id] = doc
+        self._overlay_sources.setdefault(doc.source_file, []).append(doc.global_id)
+
+    def remove_source(self, source_file: str) -> List[int]:
+        """
+        Remove every chunk of a source file.
+
+        :return: Global IDs of the removed chunks.
+        """
+        removed = []
+        groups = self._groups()
+        for source_index, rows in groups.items():
+            if self._source_names[source_index] == source_file and source_index not in self._removed_sources:
+                self._removed_sources.add(source_index)
+                removed.extend(self._ids[rows].tolist())
+        for global_id in self._overlay_sources.pop(source_file, []):
+            del self._overlay[global_id]
+            removed.append(global_id)
+        return removed
+
+    @property
+    def sources(self) -> List[str]:
+        """Source files that still have chunks in the table."""
+        names = [self._source_names[i] for i in self._groups() if i not in self._removed_sources]
+        names += [name for name in self._overlay_sources if name not in names]
+        return names
+
+    def select_ids(self, sources: Optional[Iterable[str]] = None, page_min: Optional[int] = None, page_max: Optional[int] = None) -> np.ndarray:
+        """
+        Global IDs of the chunks of the given source files within a page range. Source
+        filters only touch the precomputed rows of the selected files.
+
+        :param sources: Source files to keep (all when None).
+        :param page_min: Smallest page to keep (inclusive).
+        :param page_max: Largest page to keep (inclusive).
+        :return: Sorted int64 array of global IDs.
+        """
+        if sources is None:
+            rows = self._live_rows()
+            overlay_ids = list(self._overlay)
+        else:
+            wanted = set(sources)
+            groups = self._groups()
+            selected = [rows for i, rows in groups.items() if self._source_names[i] in wanted and i not in self._removed_sources]
+            rows = np.sort(np.concatenate(selected)) if selected else np.empty(0, dtype="int64")
+            overlay_ids = [global_id for name in wanted for global_id in self._overlay_sources.get(name, [])]
+        if page_min is not None or page_max is not None:
+            low = page_min if page_min is not None else np.iinfo("int32").min
+            high = page_max if page_max is not None else np.iinfo("int32").max
+            pages = np.asarray(self._pages[rows])
+            rows = rows[(pages >= low) & (pages <= high)]
+            overlay_ids = [global_id for global_id in overlay_ids if low <= self._overlay[global_id].page <= high]
+        return np.concatenate([np.asarray(self._ids[rows], dtype="int64"), np.array(sorted(overlay_ids), dtype="int64")])
+
+    def _groups(self) -> Dict[int, np.ndarray]:
+        if self._source_rows is None:
+            order = np.argsort(self._source_idx, kind="stable")
+            counts = np.bincount(self._source_idx, minlength=len(self._source_names))
+            self._source_rows = {i: rows for i, rows in enumerate(np.split(order, np.cumsum(counts)[:-1])) if len(rows)}
+        return self._source_rows
+
+    def _row(self, global_id: int) -> Optional[int]:
+        row = int(np.searchsorted(self._ids, global_id))
+        if row < len(self._ids) and self._ids[row] == global_id and int(self._source_idx[row]) not in self._removed_sources:
+            return row
+        return None
+
+    def _materialize(self, row: int) -> ChunkDocument:
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return ChunkDocument(
+            text=self._text[start:end].tobytes().decode("utf-8"),
+            page=int(self._pages[row]),
+            chunk_id=int(self._chunk_ids[row]),
+            source_file=self._source_names[self._source_idx[row]],
+            global_id=int(self._ids[row]),
+        )
+
+    def _live_rows(self) -> np.ndarray:
+        if not self._removed_sources:
+            return np.arange(len(self._ids))
+        return np.flatnonzero(~np.isin(self._source_idx, list(self._removed_sources)))
+
+    def __getitem__(self, global_id: int) -> ChunkDocument:
+        doc = self._overlay.get(global_id)
+        if doc is not None:
+            return doc
+        row = self._row(global_id)
+        if row is None:
+            raise KeyError(global_id)
+        return self._materialize(row)
+
+    def __contains__(self, global_id) -> bool:
+        return global_id in self._overlay or self._row(global_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self._ids[self._live_rows()].tolist()
+        yield from self._overlay
+
+    def __len__(self) -> int:
+        removed = sum(len(rows) for i, rows in self._groups().items() if i in self._removed_sources) if self._removed_sources else 0
+        return len(self._ids) - removed + len(self._overlay)
+
+    def write(self, directory: str) -> None:
+        """
+        Write the table (saved rows that were not removed, plus the overlay) in columnar form.
+
+        :param directory: Directory the column files are written to.
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        rows = self._live_rows()
+        starts, ends = self._offsets[rows], self._offsets[rows + 1]
+        if len(rows) == len(self._ids):
+            base_text = self._text.tobytes()
+        else:
+            base_text = b"".join(self._text[start:end].tobytes() for start, end in zip(starts.tolist(), ends.tolist()))
+        overlay = [self._overlay[global_id] for global_id in sorted(self._overlay)]
+        overlay_text = [doc.text.encode("utf-8") for doc in overlay]
+
+        base_sources = np.asarray(self._source_idx[rows])
+        source_names = [self._source_names[i] for i in np.unique(base_sources).tolist()]
+        source_names += [name for name in dict.fromkeys(doc.source_file for doc in overlay) if name not in source_names]
+        source_lookup = {name: i for i, name in enumerate(source_names)}
+        remap = np.array([source_lookup.get(name, -1) for name in self._source_names], dtype="int32")
+
+        lengths = np.concatenate([ends - starts, np.array([len(text) for text in overlay_text], dtype="int64")])
+        columns = {
+            # Overlay IDs were assigned after the saved rows', so the concatenation stays sorted
+            "ids.npy": np.concatenate([self._ids[rows], np.array([doc.global_id for doc in overlay], dtype="int64")]),
+            "offsets.npy": np.concatenate([[0], np.cumsum(lengths)]).astype("int64"),
+            "pages.npy": np.concatenate([self._pages[rows], np.array([doc.page for doc in overlay], dtype="int32")]),
+            "chunk_ids.npy": np.concatenate([self._chunk_ids[rows], np.array([doc.chunk_id for doc in overlay], dtype="int32")]),
+            "source_idx.npy": np.concatenate([remap[base_sources] if len(remap) else base_sources,
+                                              np.array([source_lookup[doc.source_file] for doc in overlay], dtype="int32")]),
+        }
+        for name, column in columns.items():
+            np.save(os.path.join(directory, name), column)
+        with open(os.path.join(directory, "text.bin"), "wb") as f:
+            f.write(base_text)
+            f.write(b"".join(overlay_text))
+        with open(os.path.join(directory, "sources.pkl"), "wb") as f:
+            pickle.dump(source_names, f)
+
+    @classmethod
+    def open(cls, directory: str, mmap: bool = True) -> "ChunkTable":
+        """
+        Open a table written by write().
+
+        :param directory: Directory containing the column files.
+        :param mmap: Memory-map the columns instead of reading them into memory.
+        """
+        mmap_mode = "r" if mmap else None
+        table = cls()
+        table._ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode=mmap_mode)
+        table._offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode=mmap_mode)
+        table._pages = np.load(os.path.join(directory, "pages.npy"), mmap_mode=mmap_mode)
+        table._chunk_ids = np.load(os.path.join(directory, "chunk_ids.npy"), mmap_mode=mmap_mode)
+        table._source_idx = np.load(os.path.join(directory, "source_idx.npy"), mmap_mode=mmap_mode)
+        text_path = os.path.join(directory, "text.bin")
+        if mmap and os.path.getsize(text_path) > 0:
+            table._text = np.memmap(text_path, dtype="uint8", mode="r")
+        else:
+            table._text = np.fromfile(text_path, dtype="uint8")
+        with open(os.path.join(directory, "sources.pkl"), "rb") as f:
+            table._source_names = pickle.load(f)
+        return table
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return all(os.path.exists(os.path.join(directory, name)) for name in
+                   ["ids.npy", "offsets.npy", "pages.npy", "chunk_ids.npy", "source_idx.npy", "text.bin", "sources.pkl"])
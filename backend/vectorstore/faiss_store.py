@@ -2,63 +2,435 @@ import faiss
 import numpy as np
 import pickle
 import os
+import threading
 from pathlib import Path
-from sklearn.preprocessing import normalize
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 from backend.vectorstore.base_vectorstore import BaseVectorStore
 from backend.models.chunk_document import ChunkDocument
+from backend.models.search_filter import SearchFilter
+from backend.utils.fusion import fuse_dense_and_keyword
+from backend.vectorstore.bm25_index import BM25Index
+from backend.vectorstore.chunk_table import ChunkTable
+from backend.vectorstore.index_factory import (create_index, default_codec, default_index_type, default_rescore_factor,
+                                               export_vectors, is_lossy, make_index_config, min_training_vectors,
+                                               search_parameters, select_index_type, supports_remove,
+                                               supports_selector, training_sample_size)
+from backend.vectorstore.vector_file import VectorFile
+
+SUBSET_SCAN_MAX = 16384  # Filters matching at most this many chunks are scored exactly, without the ANN index
 
 class FaissVectorStore(BaseVectorStore):
-    def __init__(self, embedding_dim: int = 384):
+    def __init__(self, embedding_dim: int = 384, use_mmap: bool = True, index_type: str = None,
+                 codec: str = None, rescore_factor: int = None):
         """
         Initializes the FaissVectorStore with a specified embedding dimension.
 
+        Vectors are stored in an ID-mapped index under stable global chunk IDs, so a
+        single document can be added or removed without rebuilding the whole index.
+
         :param embedding_dim: The dimension of the embeddings.
+        :param use_mmap: Memory-map the FAISS index and chunk metadata on load (and after save)
+                         instead of reading them into memory.
+        :param index_type: Index structure optimize() converts to: "flat", "ivf_flat", "ivf_pq",
+                           "hnsw", or "auto" to pick one from the number of vectors
+                           (defaults to INDEX_TYPE or "auto").
+        :param codec: How optimize() stores vectors in the index: "fp32", "fp16", "sq8" or "pq"
+                      (defaults to INDEX_CODEC or "fp32"). With a lossy codec, full-precision
+                      copies are kept in a memory-mapped side file for exact re-scoring.
+        :param rescore_factor: With a lossy codec, re-score k * rescore_factor candidates
+                               against the full-precision vectors (defaults to
+                               INDEX_RESCORE_FACTOR or 4; 0 disables re-scoring).
         """
         # self.index = faiss.IndexFlatL2(embedding_dim) # L2 distance index
         self.embedding_dim = embedding_dim
-        self.index = faiss.IndexFlatIP(embedding_dim)  # Inner product index
-        self.documents: List[ChunkDocument] = []
+        self.use_mmap = use_mmap
+        self.index_type = (index_type or default_index_type()).lower()
+        self.codec = (codec or default_codec()).lower()
+        self.rescore_factor = rescore_factor if rescore_factor is not None else default_rescore_factor()
+        self.full_vectors: Optional[VectorFile] = None  # Exact vectors, kept while the index codec is lossy
+        self.index_config = make_index_config("flat", 0, embedding_dim)  # Vectors are added to a flat index until optimize()
+        self.index = self._new_index()  # Inner product index keyed by global chunk ID
+        self.documents = ChunkTable()
+        self.bm25 = BM25Index()  # Keyword index over the same chunks, for hybrid search
+        self.deleted_ids: Set[int] = set()  # Tombstones awaiting compact()
+        self.source_uploaded_at: Dict[str, float] = {}  # Upload time per source file, for filtering
+        self.next_id = 0
+        self._index_path = None  # Snapshot the index is memory-mapped from, if any
+        self._lock = threading.RLock()
+
+    def _new_index(self) -> faiss.Index:
+        return create_index(self.index_config, self.embedding_dim)
+
+    def _read_index(self, index_path: str, mmap: bool) -> faiss.Index:
+        faiss_path = os.path.join(index_path, "faiss_index.bin")
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+        if mmap and mmap_flag is not None:
+            try:
+                return faiss.read_index(faiss_path, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError as e:
+                print(f"⚠️ Could not memory-map {faiss_path}, reading it into memory: {e}")
+        return faiss.read_index(faiss_path)
+
+    def _ensure_writable(self) -> None:
+        # A memory-mapped index cannot grow or shrink in place: read it into memory first
+        if self._index_path is not None:
+            self.index = self._read_index(self._index_path, mmap=False)
+            self._index_path = None
         
-    def add(self, embeddings: List[List[float]], documents: List[ChunkDocument]) -> None:
-        vectors = np.array(embeddings).astype("float32")
-        vectors = normalize(vectors)
-        self.index.add(vectors)
-        self.documents.extend(documents)
+    def add(self, embeddings: Union[List[List[float]], np.ndarray], documents: List[ChunkDocument]) -> None:
+        if not documents:
+            return
+        vectors = np.array(embeddings, dtype="float32", ndmin=2)  # Copy: normalized in place
+        faiss.normalize_L2(vectors)
+        with self._lock:
+            self._ensure_writable()
+            ids = np.arange(self.next_id, self.next_id + len(documents), dtype="int64")
+            self.index.add_with_ids(vectors, ids)
+            if self.full_vectors is not None:
+                self.full_vectors.append(self.next_id, vectors)
+            for global_id, doc in zip(ids.tolist(), documents):
+                doc.global_id = global_id
+                self.documents.add(doc)
+                self.bm25.add(global_id, doc.text)
+            self.next_id += len(documents)
+
+    def remove_document(self, source_file: str) -> int:
+        """
+        Remove every chunk of a source file from the store.
+
+        The chunks disappear from search results immediately; their vectors are only
+        tombstoned and are physically dropped from the FAISS index by compact().
+
+        :param source_file: The source file whose chunks should be removed.
+        :return: Number of chunks removed.
+        """
+        with self._lock:
+            ids = self.documents.remove_source(source_file)
+            self.deleted_ids.update(ids)
+            self.bm25.remove(ids)
+            self.source_uploaded_at.pop(source_file, None)
+        return len(ids)
+
+    def replace_document(self, source_file: str, embeddings: Union[List[List[float]], np.ndarray], documents: List[ChunkDocument]) -> int:
+        """
+        Atomically swap all chunks of a source file for new ones, so concurrent searches
+        see either the old or the new version of the document, never neither.
+
+        :param source_file: The source file being (re-)indexed.
+        :param embeddings: Vector representations of the new chunks.
+        :param documents: The new chunks of the source file.
+        :return: Number of chunks removed.
+        """
+        with self._lock:
+            removed = self.remove_document(source_file)
+            self.add(embeddings, documents)
+        return removed
+
+    def compact(self) -> int:
+        """
+        Physically remove tombstoned vectors from the FAISS index.
+
+        :return: Number of vectors removed.
+        """
+        with self._lock:
+            if not self.deleted_ids:
+                return 0
+            self._ensure_writable()
+            ids = np.array(sorted(self.deleted_ids), dtype="int64")
+            if supports_remove(self.index_config):
+                removed = self.index.remove_ids(ids)
+            else:
+                # HNSW graphs cannot drop nodes: rebuild the graph from the remaining vectors
+                all_ids, vectors = self._export_vectors()
+                keep = ~np.isin(all_ids, ids)
+                self.index = self._train_index(self.index_config, all_ids[keep], vectors[keep])
+                removed = len(all_ids) - int(keep.sum())
+            self.deleted_ids.clear()
+        return int(removed)
+
+    def _export_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Prefer the exact copies over decoding a lossy index
+        ids, vectors = export_vectors(self.index, reconstruct=self.full_vectors is None)
+        if self.full_vectors is not None:
+            vectors = self.full_vectors.take(ids)
+        return ids, vectors
+
+    def _train_index(self, config: dict, ids: np.ndarray, vectors: np.ndarray, seed: int = 0) -> faiss.Index:
+        index = create_index(config, self.embedding_dim)
+        sample_size = training_sample_size(config, len(ids))
+        if sample_size:
+            rng = np.random.default_rng(seed)
+            sample = vectors[np.sort(rng.choice(len(ids), size=sample_size, replace=False))]
+            index.train(sample)
+        index.add_with_ids(vectors, ids)
+        return index
+
+    def optimize(self, index_type: str = None, codec: str = None, seed: int = 0) -> bool:
+        """
+        Convert the flat index built during ingestion to the configured index type and
+        codec, training it on a random sample of the stored vectors. Tombstoned vectors
+        are dropped along the way. Meant to run once at the end of a full index build.
+
+        :param index_type: Overrides the store's index_type for this call.
+        :param codec: Overrides the store's codec for this call.
+        :param seed: Seed for drawing the training sample.
+        :return: True if the index was converted.
+        """
+        with self._lock:
+            index_type = (index_type or self.index_type).lower()
+            num_vectors = self.index.ntotal - len(self.deleted_ids)
+            if index_type == "auto":
+                index_type = select_index_type(num_vectors)
+            config = make_index_config(index_type, num_vectors, self.embedding_dim, codec=(codec or self.codec).lower())
+            if (config["type"], config["codec"]) == (self.index_config["type"], self.index_config.get("codec", "fp32")):
+                return False
+            if self.index_config["type"] in ("ivf_flat", "ivf_pq"):
+                print(f"⚠️ Cannot convert an {self.index_config['type']} index; rebuild the index instead")
+                return False
+            if num_vectors < min_training_vectors(config):
+                print(f"⚠️ {num_vectors} vectors are too few to train a {index_type} index, keeping {self.index_config['type']}")
+                return False
+
+            self._ensure_writable()
+            ids, vectors = self._export_vectors()
+            if self.deleted_ids:
+                keep = ~np.isin(ids, np.fromiter(self.deleted_ids, dtype="int64"))
+                ids, vectors = ids[keep], vectors[keep]
+            self.index = self._train_index(config, ids, vectors, seed)
+            self.index_config = config
+            self.full_vectors = VectorFile.from_vectors(ids, vectors, self.next_id) if is_lossy(config) else None
+            self.deleted_ids.clear()
+        print(f"🧭 Index optimized: {index_type}/{config['codec']} over {len(ids)} vectors ({config})")
+        return True
+
+    def set_uploaded_at(self, source_file: str, timestamp: float) -> None:
+        """Record when a source file was uploaded, so searches can filter on it."""
+        with self._lock:
+            self.source_uploaded_at[source_file] = timestamp
+
+    @property
+    def sources(self) -> List[str]:
+        return self.documents.sources
         
-    def search(self, query_vector: List[float], k: int = 5) -> List[Tuple[ChunkDocument, float]]:
-        query = np.array([query_vector]).astype("float32")
-        query = normalize(query)
-        distances, indices = self.index.search(query, k)
+    def search(self, query_vector: List[float], k: int = 5, nprobe: int = None, ef_search: int = None,
+               filters: SearchFilter = None) -> List[Tuple[ChunkDocument, float]]:
+        """
+        Search the k most similar chunks.
+
+        :param query_vector: The query embedding.
+        :param k: Number of results.
+        :param nprobe: IVF lists to scan for this query (defaults to the saved index config).
+        :param ef_search: HNSW search queue size for this query (defaults to the saved index config).
+        :param filters: Restrict the search to chunks matching these metadata filters.
+        """
+        return self.search_batch(np.asarray([query_vector], dtype="float32"), k, nprobe=nprobe, ef_search=ef_search, filters=filters)[0]
+
+    def search_batch(self, query_matrix: np.ndarray, k: int = 5, nprobe: int = None, ef_search: int = None,
+                     filters: SearchFilter = None) -> List[List[Tuple[ChunkDocument, float]]]:
+        """
+        Search the k most similar chunks for every row of a query matrix with a single FAISS call.
+
+        Filters are applied inside the FAISS search through an ID selector, or, when they
+        match few chunks, by scoring just those chunks exactly.
+
+        :param query_matrix: (n, d) matrix of query embeddings.
+        :param k: Number of results per query.
+        :param nprobe: IVF lists to scan (defaults to the saved index config).
+        :param ef_search: HNSW search queue size (defaults to the saved index config).
+        :param filters: Restrict the search to chunks matching these metadata filters.
+        :return: One result list per query, as in search().
+        """
+        queries = np.array(query_matrix, dtype="float32", ndmin=2)  # Copy: normalized in place
+        faiss.normalize_L2(queries)
+        with self._lock:
+            # Only take a consistent view under the lock; the search itself runs outside it
+            # (FAISS releases the GIL), so concurrent queries search in parallel. Published
+            # snapshots are never written to (see RAGSystem._apply_changes).
+            index, config, documents, full_vectors = self.index, self.index_config, self.documents, self.full_vectors
+            deleted = np.fromiter(self.deleted_ids, dtype="int64", count=len(self.deleted_ids))
+            selected = self._select_ids(filters) if filters is not None and not filters.is_empty() else None
+        if index.ntotal == 0:
+            return [[] for _ in range(len(queries))]
+        if selected is not None:
+            if len(selected) == 0:
+                return [[] for _ in range(len(queries))]
+            if len(selected) <= SUBSET_SCAN_MAX:
+                vectors = self._vectors_for(index, full_vectors, selected)
+                if vectors is not None:
+                    return self._subset_search(documents, queries, selected, vectors, k)
+
+        # Re-score a larger candidate set when the index only holds compressed vectors
+        rescore = full_vectors is not None and self.rescore_factor > 0
+        num_candidates = k * self.rescore_factor if rescore else k
+        selector, post_filter = None, False
+        if selected is None:
+            # Over-fetch so that tombstoned vectors awaiting compaction do not eat into k
+            fetch_k = min(num_candidates + len(deleted), index.ntotal)
+        elif supports_selector(config):
+            # Removed chunks are never selected, so no over-fetching is needed
+            fetch_k = min(num_candidates, len(selected))
+            selector, bitmap = self._make_selector(selected)
+            if config["type"] == "hnsw":
+                # Filtered graph search needs a wider queue the more selective the filter is
+                ef_search = max(ef_search or config["ef_search"],
+                                min(4096, fetch_k * index.ntotal // len(selected)))
+        else:
+            # The index cannot filter while searching: over-fetch by the filter's selectivity
+            fetch_k = min(num_candidates * index.ntotal // len(selected) + len(deleted), index.ntotal)
+            post_filter = True
+        params = search_parameters(config, nprobe=nprobe, ef_search=ef_search, selector=selector)
+        distances, indices = index.search(queries, fetch_k, params=params)
+        if post_filter:
+            indices = np.where(np.isin(indices, selected), indices, -1)
 
         results = []
-        for idx, score in zip(indices[0], distances[0]):
-            if idx < len(self.documents):
-                results.append((self.documents[idx], float(score)))
+        for query, row_distances, row_indices in zip(queries, distances, indices):
+            if rescore:
+                row_distances, row_indices = self._rescore(full_vectors, deleted, query, row_indices, num_candidates)
+            results.append(self._collect(documents, row_indices, row_distances, k))
         return results
+
+    def keyword_search_batch(self, queries: List[str], k: int = 5, filters: SearchFilter = None) -> List[List[Tuple[ChunkDocument, float]]]:
+        """
+        BM25 keyword search for every query text.
+
+        :param queries: The query texts.
+        :param k: Number of results per query.
+        :param filters: Restrict the search to chunks matching these metadata filters.
+        :return: One list of (ChunkDocument, BM25 score) tuples per query.
+        """
+        with self._lock:
+            bm25, documents = self.bm25, self.documents
+            allowed = self._select_ids(filters) if filters is not None and not filters.is_empty() else None
+        results = []
+        for query in queries:
+            ids, scores = bm25.search(query, k, allowed_ids=allowed)
+            results.append(self._collect(documents, ids, scores, k))
+        return results
+
+    def hybrid_search(self, query_vector: List[float], query: str, k: int = 5, filters: SearchFilter = None,
+                      **search_kwargs) -> List[Tuple[ChunkDocument, float]]:
+        """Hybrid search for a single query; see hybrid_search_batch."""
+        return self.hybrid_search_batch(np.asarray([query_vector], dtype="float32"), [query], k, filters=filters, **search_kwargs)[0]
+
+    def hybrid_search_batch(self, query_matrix: np.ndarray, queries: List[str], k: int = 5, filters: SearchFilter = None,
+                            **search_kwargs) -> List[List[Tuple[ChunkDocument, float]]]:
+        """
+        Dense and BM25 search fused by reciprocal rank. Exact terms (article numbers,
+        clause IDs) that embeddings rank poorly are pulled up by the keyword list.
+
+        :param query_matrix: (n, d) matrix of query embeddings.
+        :param queries: The n query texts.
+        :param k: Number of fused results per query; each list contributes its top k.
+        :param filters: Restrict both searches to chunks matching these metadata filters.
+        :param search_kwargs: Passed on to search_batch (nprobe, ef_search).
+        :return: One list of (ChunkDocument, dense similarity) tuples per query in fused order (NaN for keyword-only hits).
+        """
+        dense = self.search_batch(query_matrix, k, filters=filters, **search_kwargs)
+        sparse = self.keyword_search_batch(queries, k, filters=filters)
+        return [fuse_dense_and_keyword(dense_results, sparse_results, top_n=k)
+                for dense_results, sparse_results in zip(dense, sparse)]
+
+    def _select_ids(self, filters: SearchFilter) -> np.ndarray:
+        sources = filters.source_files
+        if filters.uploaded_after is not None or filters.uploaded_before is not None:
+            after = filters.uploaded_after if filters.uploaded_after is not None else float("-inf")
+            before = filters.uploaded_before if filters.uploaded_before is not None else float("inf")
+            candidates = sources if sources is not None else self.source_uploaded_at.keys()
+            sources = [source for source in candidates
+                       if source in self.source_uploaded_at and after <= self.source_uploaded_at[source] <= before]
+        if filters.exclude_source_files:
+            excluded = set(filters.exclude_source_files)
+            sources = [source for source in (sources if sources is not None else self.sources) if source not in excluded]
+        return self.documents.select_ids(sources, filters.page_min, filters.page_max)
+
+    def _make_selector(self, ids: np.ndarray) -> Tuple[faiss.IDSelector, Optional[np.ndarray]]:
+        # A single ID range (e.g. one file indexed in one go) needs no bitmap
+        if ids[-1] - ids[0] + 1 == len(ids):
+            return faiss.IDSelectorRange(int(ids[0]), int(ids[-1]) + 1), None
+        mask = np.zeros(int(ids[-1]) + 1, dtype=bool)
+        mask[ids] = True
+        bitmap = np.packbits(mask, bitorder="little")  # Must outlive the search
+        return faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap)), bitmap
+
+    @staticmethod
+    def _vectors_for(index: faiss.Index, full_vectors: Optional[VectorFile], ids: np.ndarray) -> Optional[np.ndarray]:
+        if full_vectors is not None:
+            return full_vectors.take(ids)
+        if isinstance(index, faiss.IndexIDMap2):
+            return index.reconstruct_batch(ids)
+        return None
+
+    def _subset_search(self, documents: ChunkTable, queries: np.ndarray, ids: np.ndarray, vectors: np.ndarray,
+                       k: int) -> List[List[Tuple[ChunkDocument, float]]]:
+        scores = queries @ vectors.T
+        top = min(k, len(ids))
+        results = []
+        for row_scores in scores:
+            best = np.argpartition(-row_scores, top - 1)[:top]
+            best = best[np.argsort(-row_scores[best], kind="stable")]
+            results.append(self._collect(documents, ids[best], row_scores[best], k))
+        return results
+
+    @staticmethod
+    def _collect(documents: ChunkTable, indices: np.ndarray, distances: np.ndarray, k: int) -> List[Tuple[ChunkDocument, float]]:
+        results = []
+        for idx, score in zip(indices.tolist(), distances.tolist()):
+            doc = documents.get(idx)
+            if doc is not None:
+                results.append((doc, score))
+                if len(results) == k:
+                    break
+        return results
+
+    @staticmethod
+    def _rescore(full_vectors: VectorFile, deleted: np.ndarray, query: np.ndarray, candidate_ids: np.ndarray,
+                 num_candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        ids = candidate_ids[candidate_ids >= 0]
+        if len(deleted):
+            ids = ids[~np.isin(ids, deleted)]
+        ids = ids[:num_candidates]
+        scores = full_vectors.take(ids) @ query
+        order = np.argsort(-scores, kind="stable")
+        return scores[order], ids[order]
     
     def save(self, index_path: str) -> None:
         try:
             # Create directory if it doesn't exist
             Path(index_path).mkdir(parents=True, exist_ok=True)
-            
-            # Save FAISS index
-            faiss_path = os.path.join(index_path, "faiss_index.bin")
-            faiss.write_index(self.index, faiss_path)
-            
-            # Save documents metadata
-            docs_path = os.path.join(index_path, "documents.pkl")
-            with open(docs_path, 'wb') as f:
-                pickle.dump(self.documents, f)
-            
-            # Save configuration
-            config_path = os.path.join(index_path, "config.pkl")
-            config = {
-                'embedding_dim': self.embedding_dim,
-                'num_documents': len(self.documents)
-            }
-            with open(config_path, 'wb') as f:
-                pickle.dump(config, f)
+
+            with self._lock:
+                # Save FAISS index
+                faiss_path = os.path.join(index_path, "faiss_index.bin")
+                faiss.write_index(self.index, faiss_path)
+
+                # Save documents metadata in columnar form
+                self.documents.write(os.path.join(index_path, "chunks"))
+
+                # Save keyword index
+                self.bm25.write(os.path.join(index_path, "bm25"))
+
+                # Save full-precision vectors kept for re-scoring
+                if self.full_vectors is not None:
+                    self.full_vectors.write(os.path.join(index_path, "vectors.npy"))
+
+                # Save configuration
+                config_path = os.path.join(index_path, "config.pkl")
+                config = {
+                    'embedding_dim': self.embedding_dim,
+                    'num_documents': len(self.documents),
+                    'next_id': self.next_id,
+                    'deleted_ids': sorted(self.deleted_ids),
+                    'index_config': self.index_config,
+                    'source_uploaded_at': self.source_uploaded_at
+                }
+                with open(config_path, 'wb') as f:
+                    pickle.dump(config, f)
+
+                if self.use_mmap:
+                    # Re-map from the new snapshot so the old one can be deleted and the
+                    # in-memory overlay is released
+                    self._open(index_path, config)
                 
             print(f"✅ Index saved successfully to {index_path}")
             
@@ -68,12 +440,10 @@ class FaissVectorStore(BaseVectorStore):
     
     def load(self, index_path: str) -> bool:
         try:
-            faiss_path = os.path.join(index_path, "faiss_index.bin")
-            docs_path = os.path.join(index_path, "documents.pkl")
             config_path = os.path.join(index_path, "config.pkl")
             
             # Check if all required files exist
-            if not all(os.path.exists(p) for p in [faiss_path, docs_path, config_path]):
+            if not self.exists(index_path):
                 return False
             
             # Load configuration
@@ -84,13 +454,12 @@ class FaissVectorStore(BaseVectorStore):
             if config['embedding_dim'] != self.embedding_dim:
                 print(f"⚠️ Embedding dimension mismatch: expected {self.embedding_dim}, got {config['embedding_dim']}")
                 return False
-            
-            # Load FAISS index
-            self.index = faiss.read_index(faiss_path)
-            
-            # Load documents
-            with open(docs_path, 'rb') as f:
-                self.documents = pickle.load(f)
+
+            with self._lock:
+                if ChunkTable.exists(os.path.join(index_path, "chunks")):
+                    self._open(index_path, config)
+                else:
+                    self._load_pickled(index_path, config)
             
             print(f"✅ Index loaded successfully from {index_path}")
             print(f"📊 Loaded {len(self.documents)} documents")
@@ -100,11 +469,62 @@ class FaissVectorStore(BaseVectorStore):
         except Exception as e:
             print(f"❌ Error loading index: {e}")
             return False
+
+    def _open(self, index_path: str, config: dict) -> None:
+        index = self._read_index(index_path, mmap=self.use_mmap)
+        self.documents = ChunkTable.open(os.path.join(index_path, "chunks"), mmap=self.use_mmap)
+        self.bm25 = self._open_bm25(index_path)
+        self.index = index
+        self._index_path = index_path if self.use_mmap else None
+        self.deleted_ids = set(config.get('deleted_ids', []))
+        self.source_uploaded_at = dict(config.get('source_uploaded_at', {}))
+        self.next_id = config['next_id']
+        self.index_config = config.get('index_config', make_index_config("flat", 0, self.embedding_dim))
+        vectors_path = os.path.join(index_path, "vectors.npy")
+        self.full_vectors = VectorFile.open(vectors_path, self.embedding_dim, mmap=self.use_mmap) if os.path.exists(vectors_path) else None
+
+    def _load_pickled(self, index_path: str, config: dict) -> None:
+        # Snapshots written before the columnar chunk table
+        self.index_config = config.get('index_config', make_index_config("flat", 0, self.embedding_dim))
+        self.full_vectors = None
+        index = faiss.read_index(os.path.join(index_path, "faiss_index.bin"))
+        with open(os.path.join(index_path, "documents.pkl"), 'rb') as f:
+            documents = pickle.load(f)
+
+        if isinstance(documents, list):
+            # Indices written before global chunk IDs: positions are the IDs
+            index, documents = self._migrate_positional_index(index, documents)
+
+        self.index = index
+        self.documents = ChunkTable.from_documents(documents)
+        self.bm25 = self._open_bm25(index_path)
+        self._index_path = None
+        self.deleted_ids = set(config.get('deleted_ids', []))
+        self.source_uploaded_at = dict(config.get('source_uploaded_at', {}))
+        self.next_id = config.get('next_id', max(documents, default=-1) + 1)
+
+    def _open_bm25(self, index_path: str) -> BM25Index:
+        bm25_path = os.path.join(index_path, "bm25")
+        if BM25Index.exists(bm25_path):
+            return BM25Index.open(bm25_path, mmap=self.use_mmap)
+        # Snapshots written before hybrid search: index the stored chunk texts
+        print(f"🔄 Building keyword index for {len(self.documents)} chunks")
+        return BM25Index.from_documents((global_id, self.documents[global_id].text) for global_id in sorted(self.documents))
+
+    def _migrate_positional_index(self, index: faiss.Index, documents: List[ChunkDocument]) -> Tuple[faiss.Index, Dict[int, ChunkDocument]]:
+        vectors = index.reconstruct_n(0, index.ntotal)
+        ids = np.arange(index.ntotal, dtype="int64")
+        migrated = self._new_index()
+        migrated.add_with_ids(vectors, ids)
+        for global_id, doc in enumerate(documents):
+            doc.global_id = global_id
+        return migrated, dict(enumerate(documents))
     
     def exists(self, index_path: str) -> bool:
         required_files = [
             os.path.join(index_path, "faiss_index.bin"),
-            os.path.join(index_path, "documents.pkl"),
             os.path.join(index_path, "config.pkl")
         ]
-        return all(os.path.exists(f) for f in required_files)
\ No newline at end of file
+        has_documents = (ChunkTable.exists(os.path.join(index_path, "chunks"))
+                         or os.path.exists(os.path.join(index_path, "documents.pkl")))
+        return all(os.path.exists(f) for f in required_files) and has_documents
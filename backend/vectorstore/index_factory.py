@@ -0,0 +1,180 @@
+import faiss
+import math
+import numpy as np
+import os
+from typing import Any, Dict, Optional, Tuple
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+CODECS = ("fp32", "fp16", "sq8", "pq")  # How each vector is stored inside the index
+
+SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# Auto-selection thresholds on the number of vectors
+FLAT_MAX_VECTORS = 50_000  # Exact search is fast enough below this
+HNSW_MAX_VECTORS = 1_000_000  # Above this, compressed IVF-PQ keeps memory in check
+
+MIN_POINTS_PER_CENTROID = 39  # FAISS warns about k-means with fewer training points
+MAX_POINTS_PER_CENTROID = 256
+
+def default_index_type() -> str:
+    """Index type requested through INDEX_TYPE ("auto" or one of INDEX_TYPES)."""
+    return os.getenv("INDEX_TYPE", "auto").lower()
+
+def default_codec() -> str:
+    """Vector codec requested through INDEX_CODEC (one of CODECS)."""
+    return os.getenv("INDEX_CODEC", "fp32").lower()
+
+def default_rescore_factor() -> int:
+    """Candidates fetched per result for exact re-scoring, from INDEX_RESCORE_FACTOR (0 disables it)."""
+    return int(os.getenv("INDEX_RESCORE_FACTOR", "4"))
+
+def select_index_type(num_vectors: int) -> str:
+    """
+    Pick the index type for a corpus size.
+
+    :param num_vectors: Number of vectors that will be indexed.
+    """
+    if num_vectors < FLAT_MAX_VECTORS:
+        return "flat"
+    if num_vectors < HNSW_MAX_VECTORS:
+        return "hnsw"
+    return "ivf_pq"
+
+def make_index_config(index_type: str, num_vectors: int, embedding_dim: int, codec: str = "fp32") -> Dict[str, Any]:
+    """
+    Build the parameters of an index type for a corpus size. The result is saved in
+    config.pkl so a loaded index is searched with the same parameters.
+
+    :param index_type: One of INDEX_TYPES.
+    :param num_vectors: Number of vectors the index is trained for.
+    :param embedding_dim: The dimension of the embeddings.
+    :param codec: One of CODECS; "ivf_pq" always uses "pq".
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {index_type} (expected one of {', '.join(INDEX_TYPES)})")
+    if index_type == "ivf_pq":
+        codec = "pq"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec: {codec} (expected one of {', '.join(CODECS)})")
+    config: Dict[str, Any] = {"type": index_type, "codec": codec}
+    if index_type in ("ivf_flat", "ivf_pq"):
+        nlist = int(4 * math.sqrt(num_vectors))
+        nlist = max(1, min(nlist, 65536, num_vectors // MIN_POINTS_PER_CENTROID))
+        config.update(nlist=nlist, nprobe=min(nlist, max(8, nlist // 32)))
+    elif index_type == "hnsw":
+        config.update(hnsw_m=32, ef_construction=200, ef_search=64)
+    if codec == "pq":
+        # 8-bit codes over sub-vectors of 4 dimensions: 16x smaller than float32
+        sub_dim = next((d for d in (4, 2, 1) if embedding_dim % d == 0))
+        config.update(pq_m=embedding_dim // sub_dim, pq_nbits=8)
+    return config
+
+def is_lossy(config: Dict[str, Any]) -> bool:
+    """Whether the index stores vectors with reduced precision."""
+    return config.get("codec", "fp32") != "fp32"
+
+def needs_training(config: Dict[str, Any]) -> bool:
+    return config["type"] in ("ivf_flat", "ivf_pq") or is_lossy(config)
+
+def min_training_vectors(config: Dict[str, Any]) -> int:
+    """Smallest corpus the index type can be trained on."""
+    minimum = 0
+    if config["type"] in ("ivf_flat", "ivf_pq"):
+        minimum = 16 * MIN_POINTS_PER_CENTROID
+    if config.get("codec") == "pq":
+        minimum = max(minimum, 2 ** config["pq_nbits"])
+    return minimum
+
+def training_sample_size(config: Dict[str, Any], num_vectors: int) -> int:
+    """Number of vectors to train on (k-means does not need the whole corpus)."""
+    if not needs_training(config):
+        return 0
+    size = 0
+    if config["type"] in ("ivf_flat", "ivf_pq"):
+        size = config["nlist"] * MAX_POINTS_PER_CENTROID
+    if config["codec"] == "pq":
+        size = max(size, 2 ** config["pq_nbits"] * MAX_POINTS_PER_CENTROID)
+    if config["codec"] in ("fp16", "sq8"):
+        size = max(size, 65536)  # Only per-dimension ranges are learned
+    return min(num_vectors, size)
+
+def create_index(config: Dict[str, Any], embedding_dim: int) -> faiss.Index:
+    """
+    Create an empty inner-product index keyed by global chunk ID.
+
+    IVF indices store IDs in their inverted lists and support remove_ids directly;
+    flat and HNSW indices are wrapped in IndexIDMap2.
+
+    :param config: Index parameters from make_index_config.
+    :param embedding_dim: The dimension of the embeddings.
+    """
+    index_type, codec = config["type"], config.get("codec", "fp32")
+    metric = faiss.METRIC_INNER_PRODUCT
+    if index_type == "flat":
+        if codec == "fp32":
+            index = faiss.IndexFlatIP(embedding_dim)
+        elif codec == "pq":
+            index = faiss.IndexPQ(embedding_dim, config["pq_m"], config["pq_nbits"], metric)
+        else:
+            index = faiss.IndexScalarQuantizer(embedding_dim, SCALAR_QUANTIZERS[codec], metric)
+        return faiss.IndexIDMap2(index)
+    if index_type == "hnsw":
+        if codec == "fp32":
+            index = faiss.IndexHNSWFlat(embedding_dim, config["hnsw_m"], metric)
+        elif codec == "pq":
+            index = faiss.IndexHNSWPQ(embedding_dim, config["pq_m"], config["hnsw_m"], config["pq_nbits"], metric)
+        else:
+            index = faiss.IndexHNSWSQ(embedding_dim, SCALAR_QUANTIZERS[codec], config["hnsw_m"], metric)
+        index.hnsw.efConstruction = config["ef_construction"]
+        index.hnsw.efSearch = config["ef_search"]
+        return faiss.IndexIDMap2(index)
+    quantizer = faiss.IndexFlatIP(embedding_dim)
+    if codec == "fp32":
+        index = faiss.IndexIVFFlat(quantizer, embedding_dim, config["nlist"], metric)
+    elif codec == "pq":
+        index = faiss.IndexIVFPQ(quantizer, embedding_dim, config["nlist"], config["pq_m"], config["pq_nbits"], metric)
+    else:
+        index = faiss.IndexIVFScalarQuantizer(quantizer, embedding_dim, config["nlist"], SCALAR_QUANTIZERS[codec], metric)
+    index.nprobe = config["nprobe"]
+    return index
+
+def search_parameters(config: Dict[str, Any], nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                      selector: Optional[faiss.IDSelector] = None) -> Optional[faiss.SearchParameters]:
+    """
+    Per-query search parameters, falling back to the values saved with the index.
+
+    :param config: Index parameters from make_index_config.
+    :param nprobe: Number of IVF lists to scan.
+    :param ef_search: Size of the HNSW search queue.
+    :param selector: Restricts the search to the selected IDs (see supports_selector).
+    """
+    extra = {"sel": selector} if selector is not None else {}
+    if config["type"] in ("ivf_flat", "ivf_pq"):
+        return faiss.SearchParametersIVF(nprobe=min(nprobe or config["nprobe"], config["nlist"]), **extra)
+    if config["type"] == "hnsw":
+        return faiss.SearchParametersHNSW(efSearch=ef_search or config["ef_search"], **extra)
+    return faiss.SearchParameters(**extra) if extra else None
+
+def supports_selector(config: Dict[str, Any]) -> bool:
+    """IndexPQ cannot filter by ID during the search."""
+    return not (config["type"] == "flat" and config.get("codec") == "pq")
+
+def supports_remove(config: Dict[str, Any]) -> bool:
+    """HNSW graphs cannot drop vectors; they are rebuilt without them instead."""
+    return config["type"] != "hnsw"
+
+def export_vectors(index: faiss.Index, reconstruct: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Read back the IDs and vectors of an IndexIDMap2-wrapped index (flat or HNSW).
+
+    :param reconstruct: Also decode the vectors (approximate for lossy codecs).
+    :return: (ids, vectors) arrays; vectors is None when not reconstructed.
+    """
+    ids = faiss.vector_to_array(index.id_map).astype("int64")
+    if not reconstruct:
+        return ids, None
+    vectors = index.index.reconstruct_n(0, index.ntotal) if index.ntotal else np.empty((0, index.d), dtype="float32")
+    return ids, vectors
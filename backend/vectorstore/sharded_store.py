@@ -0,0 +1,301 @@
+import heapq
+import itertools
+import os
+import pickle
+import threading
+import zlib
+import numpy as np
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from backend.models.chunk_document import ChunkDocument
+from backend.models.search_filter import SearchFilter
+from backend.utils.fusion import fuse_dense_and_keyword
+from backend.vectorstore.base_vectorstore import BaseVectorStore
+from backend.vectorstore.faiss_store import FaissVectorStore
+
+SHARD_STRATEGIES = ("source", "chunk")
+
+def default_num_shards() -> int:
+    """Number of shards requested through VECTOR_SHARDS (1 keeps a single FaissVectorStore)."""
+    return max(1, int(os.getenv("VECTOR_SHARDS", "1")))
+
+def default_shard_by() -> str:
+    """Sharding strategy requested through SHARD_BY (one of SHARD_STRATEGIES)."""
+    return os.getenv("SHARD_BY", "source").lower()
+
+def create_vector_store(embedding_dim: int = 384) -> BaseVectorStore:
+    """A ShardedVectorStore when VECTOR_SHARDS asks for more than one shard, else a FaissVectorStore."""
+    num_shards = default_num_shards()
+    if num_shards > 1:
+        return ShardedVectorStore(embedding_dim=embedding_dim, num_shards=num_shards)
+    return FaissVectorStore(embedding_dim=embedding_dim)
+
+class ShardedChunks(Mapping):
+    def __init__(self, store: "ShardedVectorStore"):
+        """Read-only view of the chunks of every shard, keyed by sharded global ID."""
+        self._store = store
+
+    def __getitem__(self, global_id: int) -> ChunkDocument:
+        local_id, shard_index = divmod(global_id, self._store.num_shards)
+        return self._store._to_global(self._store.shard(shard_index).documents[local_id], shard_index)
+
+    def __iter__(self) -> Iterator[int]:
+        for shard_index, shard in enumerate(self._store.shards):
+            for local_id in shard.documents:
+                yield local_id * self._store.num_shards + shard_index
+
+    def __len__(self) -> int:
+        # Shards not loaded yet are counted from the saved manifest, without loading them
+        return sum(self._store.shard_size(i) for i in range(self._store.num_shards))
+
+class ShardedVectorStore(BaseVectorStore):
+    def __init__(self, embedding_dim: int = 384, num_shards: int = None, shard_by: str = None,
+                 max_workers: int = None, **store_kwargs: Any):
+        """
+        Splits chunks across several FaissVectorStore shards and searches them in
+        parallel. FAISS releases the GIL while searching, so a thread per shard scans
+        the shards concurrently; the per-shard top-k lists are merged with a heap.
+
+        Every shard numbers its chunks on its own; the store-wide global ID of a chunk
+        is local_id * num_shards + shard. Saved shards are loaded lazily, on first use.
+
+        :param embedding_dim: The dimension of the embeddings.
+        :param num_shards: Number of shards (defaults to VECTOR_SHARDS).
+        :param shard_by: "source" keeps every chunk of a file in one shard, so adding or
+                         removing a file touches a single shard; "chunk" spreads each file's
+                         chunks evenly over all shards (defaults to SHARD_BY or "source").
+        :param max_workers: Threads searching shards concurrently (defaults to num_shards).
+        :param store_kwargs: Passed to every FaissVectorStore shard (index_type, codec, ...).
+        """
+        self.embedding_dim = embedding_dim
+        self.num_shards = num_shards or default_num_shards()
+        self.shard_by = (shard_by or default_shard_by()).lower()
+        if self.shard_by not in SHARD_STRATEGIES:
+            raise ValueError(f"Unknown sharding strategy: {self.shard_by} (expected one of {', '.join(SHARD_STRATEGIES)})")
+        self.store_kwargs = store_kwargs
+        self._max_workers = max_workers
+        self._shards: List[Optional[FaissVectorStore]] = [None] * self.num_shards
+        self._shard_paths: List[Optional[str]] = [None] * self.num_shards
+        self._shard_sizes: List[Optional[int]] = [None] * self.num_shards  # Saved chunk counts, from shards.pkl
+        self._shard_locks = [threading.Lock() for _ in range(self.num_shards)]
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or self.num_shards, thread_name_prefix="shard")
+        self._lock = threading.RLock()  # Serializes writes that span shards
+
+    def shard(self, shard_index: int) -> FaissVectorStore:
+        """The shard's store, loaded from disk on first use."""
+        store = self._shards[shard_index]
+        if store is None:
+            with self._shard_locks[shard_index]:
+                store = self._shards[shard_index]
+                if store is None:
+                    store = FaissVectorStore(embedding_dim=self.embedding_dim, **self.store_kwargs)
+                    path = self._shard_paths[shard_index]
+                    if path is not None and not store.load(path):
+                        raise RuntimeError(f"Could not load shard {shard_index} from {path}")
+                    self._shards[shard_index] = store
+        return store
+
+    def shard_size(self, shard_index: int) -> int:
+        """Number of chunks in a shard; a saved shard not loaded yet is counted from the manifest."""
+        store = self._shards[shard_index]
+        if store is None and self._shard_sizes[shard_index] is not None:
+            return self._shard_sizes[shard_index]
+        return len(self.shard(shard_index).documents)
+
+    @property
+    def shards(self) -> List[FaissVectorStore]:
+        return self._map(lambda shard: shard)
+
+    def _map(self, fn: Callable[[FaissVectorStore], Any], shard_indices: List[int] = None) -> List[Any]:
+        # Run fn on every shard (loading it if needed) in the thread pool
+        shard_indices = range(self.num_shards) if shard_indices is None else shard_indices
+        futures = [self._pool.submit(lambda i=i: fn(self.shard(i))) for i in shard_indices]
+        return [future.result() for future in futures]
+
+    def shard_for(self, doc: ChunkDocument) -> int:
+        # crc32 rather than hash(): placement must not change between processes
+        key = doc.source_file if self.shard_by == "source" else f"{doc.source_file}:{doc.chunk_id}"
+        return zlib.crc32(key.encode("utf-8")) % self.num_shards
+
+    def _shards_of_source(self, source_file: str) -> List[int]:
+        if self.shard_by == "source":
+            return [zlib.crc32(source_file.encode("utf-8")) % self.num_shards]
+        return list(range(self.num_shards))
+
+    def _to_global(self, doc: ChunkDocument, shard_index: int) -> ChunkDocument:
+        # Copy: the shard's own document keeps its local ID
+        return replace(doc, global_id=doc.global_id * self.num_shards + shard_index)
+
+    def add(self, embeddings: Union[List[List[float]], np.ndarray], documents: List[ChunkDocument]) -> None:
+        if not documents:
+            return
+        vectors = np.asarray(embeddings, dtype="float32").reshape(len(documents), -1)
+        assignment = np.array([self.shard_for(doc) for doc in documents])
+        with self._lock:
+            for shard_index in np.unique(assignment).tolist():
+                rows = np.flatnonzero(assignment == shard_index)
+                copies = [replace(documents[row]) for row in rows.tolist()]
+                self.shard(shard_index).add(vectors[rows], copies)
+                for row, copy in zip(rows.tolist(), copies):
+                    documents[row].global_id = copy.global_id * self.num_shards + shard_index
+
+    def remove_document(self, source_file: str) -> int:
+        """
+        Remove every chunk of a source file from the shards holding it.
+
+        :return: Number of chunks removed.
+        """
+        with self._lock:
+            return sum(self._map(lambda shard: shard.remove_document(source_file), self._shards_of_source(source_file)))
+
+    def replace_document(self, source_file: str, embeddings: Union[List[List[float]], np.ndarray], documents: List[ChunkDocument]) -> int:
+        """
+        Swap all chunks of a source file for new ones. With shard_by="source" the swap
+        happens inside a single shard and is atomic for concurrent searches.
+
+        :return: Number of chunks removed.
+        """
+        with self._lock:
+            if self.shard_by == "source":
+                shard_index = self._shards_of_source(source_file)[0]
+                copies = [replace(doc) for doc in documents]
+                removed = self.shard(shard_index).replace_document(source_file, embeddings, copies)
+                for doc, copy in zip(documents, copies):
+                    doc.global_id = copy.global_id * self.num_shards + shard_index
+                return removed
+            removed = self.remove_document(source_file)
+            self.add(embeddings, documents)
+            return removed
+
+    def compact(self) -> int:
+        with self._lock:
+            return sum(self._map(lambda shard: shard.compact()))
+
+    def optimize(self, index_type: str = None, codec: str = None, seed: int = 0) -> bool:
+        """Convert every shard to the configured index type and codec (see FaissVectorStore.optimize)."""
+        with self._lock:
+            return any(self._map(lambda shard: shard.optimize(index_type=index_type, codec=codec, seed=seed)))
+
+    def set_uploaded_at(self, source_file: str, timestamp: float) -> None:
+        for shard_index in self._shards_of_source(source_file):
+            self.shard(shard_index).set_uploaded_at(source_file, timestamp)
+
+    @property
+    def source_uploaded_at(self) -> Dict[str, float]:
+        merged: Dict[str, float] = {}
+        for shard in self.shards:
+            merged.update(shard.source_uploaded_at)
+        return merged
+
+    @property
+    def sources(self) -> List[str]:
+        return list(dict.fromkeys(source for shard in self.shards for source in shard.sources))
+
+    @property
+    def documents(self) -> ShardedChunks:
+        return ShardedChunks(self)
+
+    def _merge(self, per_shard: List[List[List[Tuple[ChunkDocument, float]]]], k: int) -> List[List[Tuple[ChunkDocument, float]]]:
+        # per_shard[shard][query] is sorted best first: a k-way heap merge keeps the global top k
+        merged = []
+        for query_results in zip(*per_shard):
+            tagged = [[(doc, score, shard_index) for doc, score in results] for shard_index, results in enumerate(query_results)]
+            best = itertools.islice(heapq.merge(*tagged, key=lambda item: -item[1]), k)
+            merged.append([(self._to_global(doc, shard_index), score) for doc, score, shard_index in best])
+        return merged
+
+    def search(self, query_vector: List[float], k: int = 5, filters: SearchFilter = None, **search_kwargs: Any) -> List[Tuple[ChunkDocument, float]]:
+        return self.search_batch(np.asarray([query_vector], dtype="float32"), k, filters=filters, **search_kwargs)[0]
+
+    def search_batch(self, query_matrix: np.ndarray, k: int = 5, filters: SearchFilter = None, **search_kwargs: Any) -> List[List[Tuple[ChunkDocument, float]]]:
+        """
+        Search every shard in parallel and merge their top k by similarity.
+
+        :param query_matrix: (n, d) matrix of query embeddings.
+        :param k: Number of results per query.
+        :param filters: Metadata filters, applied inside every shard.
+        :param search_kwargs: Passed to FaissVectorStore.search_batch (nprobe, ef_search).
+        """
+        per_shard = self._map(lambda shard: shard.search_batch(query_matrix, k, filters=filters, **search_kwargs))
+        return self._merge(per_shard, k)
+
+    def keyword_search_batch(self, queries: List[str], k: int = 5, filters: SearchFilter = None) -> List[List[Tuple[ChunkDocument, float]]]:
+        """BM25 search of every shard in parallel; scores use each shard's own term statistics."""
+        per_shard = self._map(lambda shard: shard.keyword_search_batch(queries, k, filters=filters))
+        return self._merge(per_shard, k)
+
+    def hybrid_search(self, query_vector: List[float], query: str, k: int = 5, filters: SearchFilter = None,
+                      **search_kwargs: Any) -> List[Tuple[ChunkDocument, float]]:
+        return self.hybrid_search_batch(np.asarray([query_vector], dtype="float32"), [query], k, filters=filters, **search_kwargs)[0]
+
+    def hybrid_search_batch(self, query_matrix: np.ndarray, queries: List[str], k: int = 5, filters: SearchFilter = None,
+                            **search_kwargs: Any) -> List[List[Tuple[ChunkDocument, float]]]:
+        """Dense and BM25 search of every shard in parallel, merged per list and then fused by reciprocal rank."""
+        per_shard = self._map(lambda shard: (shard.search_batch(query_matrix, k, filters=filters, **search_kwargs),
+                                             shard.keyword_search_batch(queries, k, filters=filters)))
+        dense = self._merge([dense_results for dense_results, _ in per_shard], k)
+        sparse = self._merge([sparse_results for _, sparse_results in per_shard], k)
+        return [fuse_dense_and_keyword(dense_results, sparse_results, top_n=k)
+                for dense_results, sparse_results in zip(dense, sparse)]
+
+    def save(self, index_path: str) -> None:
+        try:
+            Path(index_path).mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                shard_paths = [os.path.join(index_path, f"shard_{i:03d}") for i in range(self.num_shards)]
+                futures = [self._pool.submit(lambda i=i: self.shard(i).save(shard_paths[i])) for i in range(self.num_shards)]
+                for future in futures:
+                    future.result()
+                self._shard_paths = shard_paths
+                self._shard_sizes = [len(self.shard(i).documents) for i in range(self.num_shards)]
+                config = {
+                    'embedding_dim': self.embedding_dim,
+                    'num_shards': self.num_shards,
+                    'shard_by': self.shard_by,
+                    'shard_sizes': self._shard_sizes
+                }
+                with open(os.path.join(index_path, "shards.pkl"), 'wb') as f:
+                    pickle.dump(config, f)
+            print(f"✅ Sharded index saved successfully to {index_path} ({self.num_shards} shards)")
+        except Exception as e:
+            print(f"❌ Error saving sharded index: {e}")
+            raise
+
+    def load(self, index_path: str) -> bool:
+        """Read the shard layout; the shards themselves are loaded on first use."""
+        try:
+            if not self.exists(index_path):
+                return False
+            with open(os.path.join(index_path, "shards.pkl"), 'rb') as f:
+                config = pickle.load(f)
+            if config['embedding_dim'] != self.embedding_dim:
+                print(f"⚠️ Embedding dimension mismatch: expected {self.embedding_dim}, got {config['embedding_dim']}")
+                return False
+            with self._lock:
+                if config['num_shards'] != self.num_shards:
+                    self._pool.shutdown(wait=False)
+                    self._pool = ThreadPoolExecutor(max_workers=self._max_workers or config['num_shards'], thread_name_prefix="shard")
+                    self._shard_locks = [threading.Lock() for _ in range(config['num_shards'])]
+                self.num_shards = config['num_shards']
+                self.shard_by = config['shard_by']
+                self._shards = [None] * self.num_shards
+                self._shard_paths = [os.path.join(index_path, f"shard_{i:03d}") for i in range(self.num_shards)]
+                # Manifests written before chunk counts were recorded fall back to loading the shard
+                self._shard_sizes = config.get('shard_sizes') or [None] * self.num_shards
+            print(f"✅ Sharded index found at {index_path} ({self.num_shards} shards, loaded on first use)")
+            return True
+        except Exception as e:
+            print(f"❌ Error loading sharded index: {e}")
+            return False
+
+    def exists(self, index_path: str) -> bool:
+        config_path = os.path.join(index_path, "shards.pkl")
+        if not os.path.exists(config_path):
+            return False
+        with open(config_path, 'rb') as f:
+            num_shards = pickle.load(f)['num_shards']
+        probe = FaissVectorStore(embedding_dim=self.embedding_dim)
+        return all(probe.exists(os.path.join(index_path, f"shard_{i:03d}")) for i in range(num_shards))
@@ -0,0 +1,86 @@
+import numpy as np
+import os
+from typing import List
+
+class VectorFile:
+    def __init__(self, embedding_dim: int):
+        """
+        Full-precision copies of the indexed vectors, addressed by global chunk ID (row i
+        holds the vector of chunk i; rows of removed chunks are left as zeros). Saved as a
+        .npy file and memory-mapped on load, so exact re-scoring only pages in the rows of
+        the candidates it looks at. Vectors added after opening are appended in memory
+        until the file is written again.
+
+        :param embedding_dim: The dimension of the embeddings.
+        """
+        self.embedding_dim = embedding_dim
+        self._base = np.zeros((0, embedding_dim), dtype="float32")
+        self._tail: List[np.ndarray] = []
+        self._tail_rows = 0
+
+    @classmethod
+    def from_vectors(cls, ids: np.ndarray, vectors: np.ndarray, num_rows: int) -> "VectorFile":
+        """
+        :param ids: Global IDs of the vectors.
+        :param vectors: Vectors to store, one row per ID.
+        :param num_rows: Number of rows to allocate (the store's next global ID).
+        """
+        vector_file = cls(vectors.shape[1])
+        vector_file._base = np.zeros((num_rows, vectors.shape[1]), dtype="float32")
+        vector_file._base[ids] = vectors
+        return vector_file
+
+    def __len__(self) -> int:
+        return len(self._base) + self._tail_rows
+
+    def append(self, first_id: int, vectors: np.ndarray) -> None:
+        """Store vectors for the consecutive IDs starting at first_id."""
+        if first_id < len(self):
+            raise ValueError(f"Vector IDs must grow: got {first_id}, expected at least {len(self)}")
+        if first_id > len(self):
+            # IDs skipped by the store (e.g. added while the file did not exist) stay zero
+            self._tail.append(np.zeros((first_id - len(self), self.embedding_dim), dtype="float32"))
+            self._tail_rows = first_id - len(self._base)
+        self._tail.append(np.asarray(vectors, dtype="float32"))
+        self._tail_rows += len(vectors)
+
+    def _compact_tail(self) -> np.ndarray:
+        if len(self._tail) != 1:
+            self._tail = [np.concatenate(self._tail) if self._tail else np.zeros((0, self.embedding_dim), dtype="float32")]
+        return self._tail[0]
+
+    def take(self, ids: np.ndarray) -> np.ndarray:
+        """
+        :param ids: Global IDs.
+        :return: The full-precision vectors of the given IDs.
+        """
+        ids = np.asarray(ids, dtype="int64")
+        in_base = ids < len(self._base)
+        if in_base.all():
+            return np.asarray(self._base[ids])
+        result = np.empty((len(ids), self.embedding_dim), dtype="float32")
+        result[in_base] = self._base[ids[in_base]]
+        result[~in_base] = self._compact_tail()[ids[~in_base] - len(self._base)]
+        return result
+
+    def write(self, path: str) -> None:
+        """Write every row, including vectors appended since opening, to a .npy file."""
+        if len(self) == 0:
+            np.save(path, np.zeros((0, self.embedding_dim), dtype="float32"))
+            return
+        out = np.lib.format.open_memmap(path, mode="w+", dtype="float32", shape=(len(self), self.embedding_dim))
+        step = 65536
+        for start in range(0, len(self._base), step):
+            end = min(start + step, len(self._base))
+            out[start:end] = self._base[start:end]
+        if self._tail_rows:
+            out[len(self._base):] = self._compact_tail()
+        out.flush()
+        del out
+
+    @classmethod
+    def open(cls, path: str, embedding_dim: int, mmap: bool = True) -> "VectorFile":
+        vector_file = cls(embedding_dim)
+        if os.path.getsize(path) > 0:
+            vector_file._base = np.load(path, mmap_mode="r" if mmap else None)
+        return vector_file